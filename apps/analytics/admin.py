@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Attempt
+from .models import Attempt, DailyActivity, MasteryRecord, ProgressSnapshot
 
 @admin.register(Attempt)
 class AttemptAdmin(admin.ModelAdmin):
@@ -15,3 +15,33 @@ class AttemptAdmin(admin.ModelAdmin):
     def question_short(self, obj):
         return (obj.question.question_text[:50] + '...') if len(obj.question.question_text) > 50 else obj.question.question_text
     question_short.short_description = "Question"
+
+
+@admin.register(MasteryRecord)
+class MasteryRecordAdmin(admin.ModelAdmin):
+    list_display = ('student', 'scope', 'target', 'total', 'correct', 'level', 'last_attempt_at')
+    list_filter = ('scope', 'level')
+    search_fields = ('student__username',)
+    list_select_related = ('student', 'topic', 'kompetensi_dasar', 'tag')
+    readonly_fields = ('student', 'scope', 'topic', 'kompetensi_dasar', 'tag', 'total', 'correct', 'points', 'last_attempt_at', 'level', 'updated_at')
+    
+    def target(self, obj):
+        return obj.topic or obj.kompetensi_dasar or obj.tag
+    target.short_description = "Target"
+
+
+@admin.register(ProgressSnapshot)
+class ProgressSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('student', 'period_start', 'academic_year', 'total_attempts', 'accuracy', 'total_points', 'quizzes_taken', 'avg_score')
+    list_filter = ('academic_year', 'period_start')
+    search_fields = ('student__username',)
+    list_select_related = ('student', 'academic_year')
+    date_hierarchy = 'period_start'
+
+
+@admin.register(DailyActivity)
+class DailyActivityAdmin(admin.ModelAdmin):
+    list_display = ('student', 'date', 'attempts', 'correct', 'points', 'time_spent')
+    search_fields = ('student__username',)
+    list_select_related = ('student',)
+    date_hierarchy = 'date'
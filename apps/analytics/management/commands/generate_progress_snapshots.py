@@ -0,0 +1,48 @@
+"""
+Management command to write weekly ProgressSnapshot rows.
+Fallback for deployments that do not run Celery beat, and for backfills.
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.analytics.snapshots import generate_progress_snapshots, last_complete_week, week_start
+
+
+class Command(BaseCommand):
+    help = "Generate weekly progress snapshots for all active students"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--week',
+            help='Any date (YYYY-MM-DD) in the week to snapshot; defaults to last week',
+        )
+        parser.add_argument(
+            '--weeks',
+            type=int,
+            default=1,
+            help='Number of weeks to generate, going back from --week',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of students computed per chunk',
+        )
+
+    def handle(self, *args, **options):
+        if options['week']:
+            try:
+                start = week_start(date.fromisoformat(options['week']))
+            except ValueError:
+                raise CommandError("--week must be a date in YYYY-MM-DD format.")
+        else:
+            start = last_complete_week()
+
+        written = 0
+        for offset in range(options['weeks']):
+            written += generate_progress_snapshots(
+                period_start=start - timedelta(weeks=offset),
+                batch_size=options['batch_size'],
+            )
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} progress snapshots."))
@@ -0,0 +1,33 @@
+"""
+Management command to rebuild the DailyActivity rollup from attempts.
+Used for the initial backfill and to repair drift after manual data fixes.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.analytics.rollups import rebuild_daily_activity
+
+
+class Command(BaseCommand):
+    help = "Recompute per-student daily activity rows from attempts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--student',
+            type=int,
+            action='append',
+            dest='students',
+            help='Only rebuild this student ID (repeatable)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Number of students rebuilt per grouped query',
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_daily_activity(
+            student_ids=options['students'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} daily activity rows."))
@@ -0,0 +1,33 @@
+"""
+Management command to rebuild MasteryRecord rows from the Attempt history.
+Used for the initial backfill and to repair drift after manual data fixes.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.analytics.mastery import rebuild_mastery
+
+
+class Command(BaseCommand):
+    help = "Recompute per-student mastery records from attempts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--student',
+            type=int,
+            action='append',
+            dest='students',
+            help='Only rebuild this student ID (repeatable)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Number of students rebuilt per transaction',
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_mastery(
+            student_ids=options['students'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} mastery records."))
@@ -0,0 +1,188 @@
+"""
+Incremental maintenance of MasteryRecord rows.
+
+grade_session() hands every graded attempt of a session to record_attempts(),
+which folds them into the student's per-topic, per-KD and per-tag totals
+with a fixed number of queries. rebuild_mastery() recomputes the table from
+the Attempt history for backfills (see the rebuild_mastery command).
+
+Only attempts that are final count: those of completed sessions and
+practice attempts without a session. Placeholder attempts of sessions that
+are still open are picked up when the session is graded.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+from apps.analytics.metrics import classify_mastery
+from apps.analytics.metrics_cache import bump_global_version
+from apps.analytics.models import Attempt, MasteryRecord
+from apps.questions.models import Question
+
+Scope = MasteryRecord.Scope
+
+# MasteryRecord column and Attempt lookup path per scope
+SCOPE_FIELDS = {
+    Scope.TOPIC: ("topic_id", "question__topic"),
+    Scope.KD: ("kompetensi_dasar_id", "question__kompetensi_dasar"),
+    Scope.TAG: ("tag_id", "question__tags"),
+}
+
+
+def _question_targets(question_ids, topics=None):
+    """
+    Return `{question_id: [(scope, target_id), ...]}`.
+
+    `topics` (`{question_id: topic_id}`) can be passed by callers that
+    already loaded the questions, saving the topic lookup.
+    """
+    targets = defaultdict(list)
+    if topics is None:
+        topics = dict(
+            Question.objects.filter(pk__in=question_ids).values_list("pk", "topic_id")
+        )
+    for question_id, topic_id in topics.items():
+        targets[question_id].append((Scope.TOPIC, topic_id))
+
+    kd_rows = Question.kompetensi_dasar.through.objects.filter(
+        question_id__in=question_ids
+    ).values_list("question_id", "kompetensidasar_id")
+    for question_id, kd_id in kd_rows:
+        targets[question_id].append((Scope.KD, kd_id))
+
+    tag_rows = Question.tags.through.objects.filter(
+        question_id__in=question_ids
+    ).values_list("question_id", "tag_id")
+    for question_id, tag_id in tag_rows:
+        targets[question_id].append((Scope.TAG, tag_id))
+    return targets
+
+
+def _new_record(student_id, scope, target_id):
+    field, _ = SCOPE_FIELDS[scope]
+    return MasteryRecord(student_id=student_id, scope=scope, **{field: target_id})
+
+
+def record_attempts(attempts, topics=None):
+    """
+    Add graded attempts to their students' mastery records.
+
+    Missing records are inserted first (conflicts ignored), then all
+    affected records are locked, incremented in memory and written back
+    with one bulk_update, so concurrent gradings for the same student
+    never lose an increment.
+    """
+    attempts = list(attempts)
+    if not attempts:
+        return
+    question_ids = {attempt.question_id for attempt in attempts}
+    targets = _question_targets(question_ids, topics)
+
+    # (student_id, scope, target_id) -> [total, correct, points, last_attempt_at]
+    deltas = {}
+    for attempt in attempts:
+        for scope, target_id in targets.get(attempt.question_id, ()):
+            delta = deltas.setdefault(
+                (attempt.student_id, scope, target_id), [0, 0, 0, None]
+            )
+            delta[0] += 1
+            delta[1] += int(attempt.is_correct)
+            delta[2] += attempt.points_earned
+            if attempt.created_at and (delta[3] is None or attempt.created_at > delta[3]):
+                delta[3] = attempt.created_at
+    if not deltas:
+        return
+
+    student_ids = {key[0] for key in deltas}
+    lookup = Q(pk__in=[])
+    for scope, (field, _) in SCOPE_FIELDS.items():
+        target_ids = {key[2] for key in deltas if key[1] == scope}
+        if target_ids:
+            lookup |= Q(scope=scope, **{f"{field}__in": target_ids})
+
+    now = timezone.now()
+    # No savepoint when nested (grade_session): the caller's transaction
+    # already rolls the whole grading back on error.
+    with transaction.atomic(savepoint=False):
+        MasteryRecord.objects.bulk_create(
+            [_new_record(*key) for key in deltas], ignore_conflicts=True
+        )
+        records = []
+        for record in MasteryRecord.objects.select_for_update().filter(
+            lookup, student_id__in=student_ids
+        ):
+            delta = deltas.get((record.student_id, record.scope, record.target_id))
+            if delta is None:
+                continue
+            total, correct, points, last_attempt_at = delta
+            record.total += total
+            record.correct += correct
+            record.points += points
+            if last_attempt_at and (
+                record.last_attempt_at is None or last_attempt_at > record.last_attempt_at
+            ):
+                record.last_attempt_at = last_attempt_at
+            record.level = classify_mastery(record.total, round(record.accuracy, 1))
+            record.updated_at = now
+            records.append(record)
+        MasteryRecord.objects.bulk_update(
+            records,
+            ["total", "correct", "points", "last_attempt_at", "level", "updated_at"],
+        )
+
+
+def final_attempts():
+    """Attempts that count towards mastery (see module docstring)."""
+    return Attempt.objects.filter(
+        Q(quiz_session__isnull=True) | Q(quiz_session__completed_at__isnull=False)
+    )
+
+
+def rebuild_mastery(student_ids=None, batch_size=200):
+    """
+    Recompute mastery records from the Attempt history.
+
+    Works in chunks of `batch_size` students; each chunk is replaced in
+    its own transaction with three grouped queries (topic, KD, tag).
+    Returns the number of records written.
+    """
+    if student_ids is None:
+        student_ids = (
+            Attempt.objects.order_by().values_list("student_id", flat=True).distinct()
+        )
+    student_ids = sorted(student_ids)
+
+    written = 0
+    for start in range(0, len(student_ids), batch_size):
+        chunk = student_ids[start:start + batch_size]
+        records = []
+        for scope, (field, path) in SCOPE_FIELDS.items():
+            rows = (
+                final_attempts()
+                .filter(student_id__in=chunk, **{f"{path}__isnull": False})
+                .values("student_id", path)
+                .annotate(
+                    total=Count("id"),
+                    correct=Count("id", filter=Q(is_correct=True)),
+                    points=Sum("points_earned"),
+                    last_attempt_at=Max("created_at"),
+                )
+                .order_by()
+            )
+            for row in rows:
+                record = _new_record(row["student_id"], scope, row[path])
+                record.total = row["total"]
+                record.correct = row["correct"]
+                record.points = row["points"] or 0
+                record.last_attempt_at = row["last_attempt_at"]
+                record.level = classify_mastery(record.total, round(record.accuracy, 1))
+                records.append(record)
+
+        with transaction.atomic():
+            MasteryRecord.objects.filter(student_id__in=chunk).delete()
+            MasteryRecord.objects.bulk_create(records, batch_size=500)
+        written += len(records)
+    bump_global_version()
+    return written
@@ -1,19 +1,27 @@
-from django.db.models import Count, Avg, Sum, Q, F
-from django.db.models.functions import TruncDate
+from django.db.models import Avg, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from datetime import timedelta
 
-from apps.analytics.models import Attempt
+from apps.analytics.models import Attempt, DailyActivity, MasteryRecord, ProgressSnapshot
 from apps.quizzes.models import QuizSession
 
 
 class StudentMetrics:
-    """Calculate various metrics for a student."""
+    """
+    Calculate various metrics for a student.
+    
+    Totals and topic/subject/KD/tag breakdowns read the MasteryRecord table
+    and daily figures the DailyActivity rollup (both maintained by grading,
+    see mastery.py and rollups.py) instead of scanning attempts.
+    """
     
     def __init__(self, student):
         self.student = student
         self._attempts = None
         self._quiz_sessions = None
+        self._topic_performance = None
+        self._totals = None
     
     @property
     def attempts(self):
@@ -21,19 +29,35 @@ class StudentMetrics:
             self._attempts = Attempt.objects.filter(student=self.student)
         return self._attempts
     
+    @property
+    def mastery(self):
+        return MasteryRecord.objects.filter(student=self.student)
+    
     @property
     def quiz_sessions(self):
         if self._quiz_sessions is None:
             self._quiz_sessions = QuizSession.objects.filter(student=self.student)
         return self._quiz_sessions
     
+    def _get_totals(self):
+        """Attempt, correct and point totals (every attempt has one topic)."""
+        if self._totals is None:
+            self._totals = self.mastery.filter(
+                scope=MasteryRecord.Scope.TOPIC
+            ).aggregate(
+                total=Coalesce(Sum('total'), 0),
+                correct=Coalesce(Sum('correct'), 0),
+                points=Coalesce(Sum('points'), 0),
+            )
+        return self._totals
+    
     def get_total_attempts(self):
         """Total number of question attempts."""
-        return self.attempts.count()
+        return self._get_totals()['total']
     
     def get_correct_attempts(self):
         """Number of correct attempts."""
-        return self.attempts.filter(is_correct=True).count()
+        return self._get_totals()['correct']
     
     def get_accuracy(self):
         """Overall accuracy percentage."""
@@ -45,7 +69,7 @@ class StudentMetrics:
     
     def get_total_points(self):
         """Total XP/points earned."""
-        return self.attempts.aggregate(total=Sum('points_earned'))['total'] or 0
+        return self._get_totals()['points']
     
     def get_total_xp(self):
         """Alias for get_total_points."""
@@ -61,18 +85,30 @@ class StudentMetrics:
         }
     
     def get_subject_performance(self):
-        """Performance breakdown by subject."""
+        """
+        Performance breakdown by subject.
+        
+        One grouped query sums the topic mastery records per subject; the
+        grade's subject list is merged in memory so untouched subjects still
+        appear.
+        """
         from apps.subjects.models import Subject
         
-        performance = []
-        subjects = Subject.objects.filter(grade=self.student.grade)
+        stats = {
+            row['topic__subject']: row
+            for row in self.mastery.filter(
+                scope=MasteryRecord.Scope.TOPIC
+            ).values('topic__subject').annotate(
+                total=Sum('total'),
+                correct=Sum('correct')
+            ).order_by()
+        }
         
-        for subject in subjects:
-            subject_attempts = self.attempts.filter(
-                question__topic__subject=subject
-            )
-            total = subject_attempts.count()
-            correct = subject_attempts.filter(is_correct=True).count()
+        performance = []
+        for subject in Subject.objects.filter(grade=self.student.grade):
+            row = stats.get(subject.pk, {})
+            total = row.get('total', 0)
+            correct = row.get('correct', 0)
             accuracy = round((correct / total) * 100, 1) if total > 0 else 0
             
             performance.append({
@@ -84,101 +120,106 @@ class StudentMetrics:
         
         return performance
     
+    def _daily_activity(self, days):
+        """Rollup rows of the last `days` days, oldest first (O(days) rows)."""
+        since = timezone.localdate() - timedelta(days=days)
+        return DailyActivity.objects.filter(
+            student=self.student, date__gte=since
+        ).order_by('date')
+    
     def get_recent_activity(self, days=7):
         """Get recent attempts grouped by date."""
-        since = timezone.now() - timedelta(days=days)
-        return self.attempts.filter(
-            created_at__gte=since
-        ).annotate(
-            date=TruncDate('created_at')
-        ).values('date').annotate(
-            count=Count('id'),
-            correct=Count('id', filter=Q(is_correct=True))
-        ).order_by('-date')[:7]
+        rows = self._daily_activity(days).order_by('-date')[:7]
+        return [
+            {'date': row.date, 'count': row.attempts, 'correct': row.correct}
+            for row in rows
+        ]
     
     def get_accuracy_trend(self, days=30):
         """Accuracy over time for charting."""
-        since = timezone.now() - timedelta(days=days)
-        daily_stats = self.attempts.filter(
-            created_at__gte=since
-        ).annotate(
-            date=TruncDate('created_at')
-        ).values('date').annotate(
-            total=Count('id'),
-            correct=Count('id', filter=Q(is_correct=True))
-        ).order_by('date')
-        
         result = []
-        for stat in daily_stats:
-            accuracy = round((stat['correct'] / stat['total']) * 100, 1) if stat['total'] > 0 else 0
+        for row in self._daily_activity(days):
+            accuracy = round((row.correct / row.attempts) * 100, 1) if row.attempts > 0 else 0
             result.append({
-                'date': stat['date'].strftime('%Y-%m-%d'),
+                'date': row.date.strftime('%Y-%m-%d'),
                 'accuracy': accuracy,
-                'total': stat['total'],
+                'total': row.attempts,
             })
         return result
     
+    def get_topic_performance(self):
+        """
+        Accuracy per attempted topic, computed once per instance.
+        
+        Read from the topic mastery records in one query; strengths and
+        weaknesses are both derived from this result.
+        """
+        if self._topic_performance is None:
+            records = self.mastery.filter(
+                scope=MasteryRecord.Scope.TOPIC, total__gt=0
+            ).select_related('topic')
+            self._topic_performance = [
+                {
+                    'topic': record.topic,
+                    'total': record.total,
+                    'correct': record.correct,
+                    'accuracy': record.accuracy,
+                }
+                for record in records
+            ]
+        return self._topic_performance
+    
+    def get_progress_history(self, weeks=12):
+        """Weekly progress for history and trend charts, oldest week first."""
+        snapshots = ProgressSnapshot.objects.filter(
+            student=self.student
+        ).order_by('-period_start')[:weeks]
+        return [
+            {
+                'week': snapshot.period_start.strftime('%Y-%m-%d'),
+                'accuracy': snapshot.accuracy,
+                'total': snapshot.total_attempts,
+                'points': snapshot.total_points,
+                'quizzes_taken': snapshot.quizzes_taken,
+                'avg_score': snapshot.avg_score,
+                'consistency': snapshot.score_stddev,
+            }
+            for snapshot in reversed(list(snapshots))
+        ]
+    
     def get_strengths(self, min_attempts=3, threshold=80):
         """Topics where student performs well."""
-        from apps.subjects.models import Topic
-        
-        topic_stats = self.attempts.values(
-            'question__topic'
-        ).annotate(
-            total=Count('id'),
-            correct=Count('id', filter=Q(is_correct=True))
-        ).filter(total__gte=min_attempts)
-        
-        strengths = []
-        for stat in topic_stats:
-            accuracy = (stat['correct'] / stat['total']) * 100
-            if accuracy >= threshold:
-                topic = Topic.objects.get(pk=stat['question__topic'])
-                strengths.append({
-                    'topic': topic,
-                    'accuracy': round(accuracy, 1),
-                    'attempts': stat['total'],
-                })
-        
+        strengths = [
+            {
+                'topic': stat['topic'],
+                'accuracy': round(stat['accuracy'], 1),
+                'attempts': stat['total'],
+            }
+            for stat in self.get_topic_performance()
+            if stat['total'] >= min_attempts and stat['accuracy'] >= threshold
+        ]
         return sorted(strengths, key=lambda x: -x['accuracy'])
     
     def get_weaknesses(self, min_attempts=3, threshold=60):
         """Topics where student struggles."""
-        from apps.subjects.models import Topic
-        
-        topic_stats = self.attempts.values(
-            'question__topic'
-        ).annotate(
-            total=Count('id'),
-            correct=Count('id', filter=Q(is_correct=True))
-        ).filter(total__gte=min_attempts)
-        
-        weaknesses = []
-        for stat in topic_stats:
-            accuracy = (stat['correct'] / stat['total']) * 100
-            if accuracy < threshold:
-                topic = Topic.objects.get(pk=stat['question__topic'])
-                weaknesses.append({
-                    'topic': topic,
-                    'accuracy': round(accuracy, 1),
-                    'attempts': stat['total'],
-                })
-        
+        weaknesses = [
+            {
+                'topic': stat['topic'],
+                'accuracy': round(stat['accuracy'], 1),
+                'attempts': stat['total'],
+            }
+            for stat in self.get_topic_performance()
+            if stat['total'] >= min_attempts and stat['accuracy'] < threshold
+        ]
         return sorted(weaknesses, key=lambda x: x['accuracy'])
     
     def get_tag_performance(self):
         """Performance breakdown by tag (skill heatmap data)."""
         from apps.questions.models import Tag
         
-        tag_stats = self.attempts.filter(
-            question__tags__isnull=False
-        ).values(
-            'question__tags__id',
-            'question__tags__name'
-        ).annotate(
-            total=Count('id'),
-            correct=Count('id', filter=Q(is_correct=True))
-        ).filter(total__gte=1)
+        tag_stats = self.mastery.filter(
+            scope=MasteryRecord.Scope.TAG, total__gte=1
+        ).values('tag_id', 'tag__name', 'total', 'correct')
         
         performance = []
         for stat in tag_stats:
@@ -192,8 +233,8 @@ class StudentMetrics:
                 level = 'weakness'
             
             performance.append({
-                'tag_id': stat['question__tags__id'],
-                'tag_name': stat['question__tags__name'],
+                'tag_id': stat['tag_id'],
+                'tag_name': stat['tag__name'],
                 'total': stat['total'],
                 'correct': stat['correct'],
                 'accuracy': accuracy,
@@ -202,46 +243,83 @@ class StudentMetrics:
         
         return sorted(performance, key=lambda x: -x['accuracy'])
     
-    def get_kd_coverage(self):
-        """Kompetensi Dasar coverage and mastery."""
-        from apps.questions.models import KompetensiDasar
-        
-        # Get all KD for student's grade
-        all_kd = KompetensiDasar.objects.filter(grade=self.student.grade).select_related('subject')
-        
-        coverage = []
+    def get_kd_coverage(self, grades=None):
+        """Kompetensi Dasar coverage and mastery (student's grade by default)."""
+        return get_kd_coverage([self.student], grades=grades)[self.student.pk]
+
+
+def classify_mastery(total, accuracy):
+    """Mastery level of a KD from its attempt count and accuracy."""
+    if total == 0:
+        return 'not_started'
+    if accuracy >= 80:
+        return 'mastered'
+    if accuracy >= 60:
+        return 'developing'
+    return 'needs_work'
+
+
+def get_kd_coverage(students, grades=None):
+    """
+    KD coverage for several students at once, e.g. all children of a parent.
+    
+    Uses two queries however many KDs and students there are: the KD
+    catalogue for the requested grades and the students' KD mastery
+    records. Mastery is classified in memory.
+    
+    Args:
+        students: iterable of student users
+        grades: grades to report; defaults to each student's own grade
+    
+    Returns `{student_id: [coverage rows]}`.
+    """
+    from apps.questions.models import KompetensiDasar
+    
+    students = list(students)
+    wanted = {
+        student.pk: set(grades) if grades else {student.grade}
+        for student in students
+    }
+    all_grades = set().union(*wanted.values()) if wanted else set()
+    all_kd = list(
+        KompetensiDasar.objects.filter(grade__in=all_grades).select_related('subject')
+    )
+    
+    stats = {
+        (row['student_id'], row['kompetensi_dasar_id']): row
+        for row in MasteryRecord.objects.filter(
+            student__in=[student.pk for student in students],
+            scope=MasteryRecord.Scope.KD,
+            kompetensi_dasar__grade__in=all_grades,
+        ).values('student_id', 'kompetensi_dasar_id', 'total', 'correct')
+    }
+    
+    coverage = {}
+    for student in students:
+        rows = []
         for kd in all_kd:
-            kd_attempts = self.attempts.filter(
-                question__kompetensi_dasar=kd
-            )
-            total = kd_attempts.count()
-            correct = kd_attempts.filter(is_correct=True).count()
+            if kd.grade not in wanted[student.pk]:
+                continue
+            row = stats.get((student.pk, kd.pk), {})
+            total = row.get('total', 0)
+            correct = row.get('correct', 0)
             accuracy = round((correct / total) * 100, 1) if total > 0 else 0
-            
-            # Determine mastery level
-            if total == 0:
-                mastery = 'not_started'
-            elif accuracy >= 80:
-                mastery = 'mastered'
-            elif accuracy >= 60:
-                mastery = 'developing'
-            else:
-                mastery = 'needs_work'
-            
-            coverage.append({
+            rows.append({
                 'kd': kd,
                 'total': total,
                 'correct': correct,
                 'accuracy': accuracy,
-                'mastery': mastery,
+                'mastery': classify_mastery(total, accuracy),
             })
-        
-        return coverage
+        coverage[student.pk] = rows
+    return coverage
 
 
 def get_student_dashboard_context(student):
-    """Helper function to get all dashboard data for a student."""
-    metrics = StudentMetrics(student)
+    """Helper function to get all dashboard data for a student (cached)."""
+    from apps.analytics.metrics_cache import CachedStudentMetrics
+    
+    metrics = CachedStudentMetrics(student)
     
     return {
         'total_attempts': metrics.get_total_attempts(),
@@ -0,0 +1,140 @@
+"""
+Versioned cache for StudentMetrics results.
+
+Every student has an "attempt version" in the cache that only ever goes up.
+Cached metric results are keyed by that version, so bumping it (done by the
+grading and autosave paths whenever attempts change) makes every earlier
+entry unreachable without having to find and delete them; they simply
+expire. A global version, bumped by the rebuild and snapshot jobs, does the
+same for changes that touch many students at once.
+
+Only cache.get_many/add/incr are used, which behave the same on the
+local-memory cache (development) and Redis (production).
+
+Version bumps are cache writes, so they only reach the processes sharing
+the cache. With a per-process backend (LocMem, or dummy; production without
+REDIS_URL) the other workers never see them, so there both the versions
+and the cached results expire after LOCAL_CACHE_TIMEOUT instead: metrics
+and ETags are then at most that stale.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from apps.analytics.metrics import StudentMetrics
+
+METRICS_TIMEOUT = 60 * 60 * 24
+LOCAL_CACHE_TIMEOUT = 60
+PER_PROCESS_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+GLOBAL_VERSION_KEY = "metrics_version:global"
+
+_MISSING = object()
+
+
+def _version_key(student_id):
+    return f"metrics_version:{student_id}"
+
+
+def _initial_version():
+    # Start from the clock so a version key that was evicted and recreated
+    # still ends up above every value it had before.
+    return time.time_ns() // 1000
+
+
+def _timeouts():
+    """`(version_timeout, result_timeout)` for the configured cache backend."""
+    if settings.CACHES["default"]["BACKEND"] in PER_PROCESS_BACKENDS:
+        return LOCAL_CACHE_TIMEOUT, LOCAL_CACHE_TIMEOUT
+    return None, METRICS_TIMEOUT
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, _initial_version(), timeout=_timeouts()[0]):
+            cache.incr(key)
+
+
+def bump_attempt_version(*student_ids):
+    """Invalidate the cached metrics of these students."""
+    for student_id in set(student_ids):
+        _bump(_version_key(student_id))
+
+
+def bump_global_version():
+    """Invalidate the cached metrics of every student."""
+    _bump(GLOBAL_VERSION_KEY)
+
+
+def get_versions(student_id):
+    """Return `(student_version, global_version)` in one cache round trip."""
+    keys = [_version_key(student_id), GLOBAL_VERSION_KEY]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    initial = _initial_version() if missing else None
+    if missing:
+        for key in missing:
+            cache.add(key, initial, timeout=_timeouts()[0])
+        # Re-read: a concurrent request may have won the add (the dummy
+        # backend stores nothing, so fall back to the fresh value)
+        found.update(cache.get_many(missing))
+    return found.get(keys[0], initial), found.get(keys[1], initial)
+
+
+def metrics_etag(student_id, variant=""):
+    """
+    Strong ETag for a metrics response: changes whenever the cached metrics
+    would, so clients can revalidate without any query.
+    """
+    student_version, global_version = get_versions(student_id)
+    return f"{student_id}-{student_version}-{global_version}-{timezone.localdate()}-{variant}"
+
+
+class CachedStudentMetrics:
+    """
+    Drop-in replacement for StudentMetrics whose get_* results are cached
+    until the student's attempt version (or the global version) changes.
+    """
+
+    def __init__(self, student):
+        self.student = student
+        self.metrics = StudentMetrics(student)
+        self._versions = None
+
+    def _key(self, name, args, kwargs):
+        if self._versions is None:
+            self._versions = get_versions(self.student.pk)
+        student_version, global_version = self._versions
+        arguments = ",".join(
+            [repr(arg) for arg in args]
+            + [f"{key}={value!r}" for key, value in sorted(kwargs.items())]
+        )
+        # Day-relative windows (trend, recent activity) shift at midnight
+        return (
+            f"student_metrics:{self.student.pk}:{student_version}:"
+            f"{global_version}:{timezone.localdate()}:{name}({arguments})"
+        )
+
+    def __getattr__(self, name):
+        attr = getattr(self.metrics, name)
+        if not name.startswith("get_") or not callable(attr):
+            return attr
+
+        def cached(*args, **kwargs):
+            key = self._key(name, args, kwargs)
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = attr(*args, **kwargs)
+                if isinstance(value, QuerySet):
+                    value = list(value)
+                cache.set(key, value, _timeouts()[1])
+            return value
+
+        return cached
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.14 on 2026-10-17 11:21
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def dedupe_session_attempts(apps, schema_editor):
+    """Keep only the newest attempt per (quiz_session, question)."""
+    Attempt = apps.get_model("analytics", "Attempt")
+
+    duplicates = (
+        Attempt.objects.filter(quiz_session__isnull=False)
+        .values("quiz_session", "question")
+        .annotate(rows=Count("id"), keep_id=Max("id"))
+        .filter(rows__gt=1)
+    )
+    for row in duplicates:
+        Attempt.objects.filter(
+            quiz_session=row["quiz_session"], question=row["question"]
+        ).exclude(pk=row["keep_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analytics", "0003_update_quiz_logic"),
+        ("questions", "0002_kompetensidasar_grade_ref_kompetensidasar_topic"),
+        ("quizzes", "0007_quiz_grade_ref_quizsession_grade_ref"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_session_attempts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="attempt",
+            constraint=models.UniqueConstraint(
+                fields=("quiz_session", "question"),
+                name="uniq_attempt_session_question",
+            ),
+        ),
+    ]
@@ -0,0 +1,134 @@
+# Generated by Django 5.0.14 on 2026-10-17 11:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analytics", "0004_attempt_unique_session_question"),
+        ("questions", "0002_kompetensidasar_grade_ref_kompetensidasar_topic"),
+        ("subjects", "0002_subject_grade_ref"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MasteryRecord",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[
+                            ("topic", "Topic"),
+                            ("kd", "Kompetensi Dasar"),
+                            ("tag", "Tag"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("total", models.PositiveIntegerField(default=0)),
+                ("correct", models.PositiveIntegerField(default=0)),
+                ("points", models.PositiveIntegerField(default=0)),
+                ("last_attempt_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "level",
+                    models.CharField(
+                        choices=[
+                            ("not_started", "Not Started"),
+                            ("needs_work", "Needs Work"),
+                            ("developing", "Developing"),
+                            ("mastered", "Mastered"),
+                        ],
+                        default="not_started",
+                        max_length=20,
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "kompetensi_dasar",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="questions.kompetensidasar",
+                    ),
+                ),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="mastery_records",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "tag",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="questions.tag",
+                    ),
+                ),
+                (
+                    "topic",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="subjects.topic",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Mastery Record",
+                "verbose_name_plural": "Mastery Records",
+                "db_table": "mastery_records",
+                "indexes": [
+                    models.Index(
+                        fields=["student", "scope"],
+                        name="mastery_rec_student_ffbfca_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="masteryrecord",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("scope", "topic")),
+                fields=("student", "topic"),
+                name="uniq_mastery_student_topic",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="masteryrecord",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("scope", "kd")),
+                fields=("student", "kompetensi_dasar"),
+                name="uniq_mastery_student_kd",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="masteryrecord",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("scope", "tag")),
+                fields=("student", "tag"),
+                name="uniq_mastery_student_tag",
+            ),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.0.14 on 2026-10-17 12:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("academic", "0002_backfill"),
+        ("analytics", "0005_mastery_record"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProgressSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("period_start", models.DateField()),
+                ("period_end", models.DateField()),
+                ("total_attempts", models.PositiveIntegerField(default=0)),
+                ("correct_attempts", models.PositiveIntegerField(default=0)),
+                ("accuracy", models.FloatField(default=0)),
+                ("total_points", models.PositiveIntegerField(default=0)),
+                (
+                    "time_spent",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Time spent answering, in seconds"
+                    ),
+                ),
+                ("quizzes_taken", models.PositiveIntegerField(default=0)),
+                ("quizzes_passed", models.PositiveIntegerField(default=0)),
+                ("avg_score", models.FloatField(default=0)),
+                ("score_stddev", models.FloatField(default=0)),
+                ("subject_breakdown", models.JSONField(blank=True, default=dict)),
+                ("generated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "academic_year",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="progress_snapshots",
+                        to="academic.academicyear",
+                    ),
+                ),
+                (
+                    "student",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="progress_snapshots",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Progress Snapshot",
+                "verbose_name_plural": "Progress Snapshots",
+                "db_table": "progress_snapshots",
+                "ordering": ["-period_start"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="progresssnapshot",
+            constraint=models.UniqueConstraint(
+                fields=("student", "period_start"), name="uniq_snapshot_student_period"
+            ),
+        ),
+    ]
@@ -63,6 +63,14 @@ class Attempt(models.Model):
             models.Index(fields=["quiz_session"]),
             models.Index(fields=["is_correct"]),
         ]
+        constraints = [
+            # One attempt per question per quiz session (practice attempts
+            # have no session and are unaffected since NULLs never collide).
+            models.UniqueConstraint(
+                fields=["quiz_session", "question"],
+                name="uniq_attempt_session_question",
+            ),
+        ]
 
     def __str__(self):
         status = "✓" if self.is_correct else "✗"
@@ -76,3 +84,185 @@ class Attempt(models.Model):
         else:
             self.points_earned = 0
         super().save(*args, **kwargs)
+
+
+class MasteryRecord(models.Model):
+    """
+    Running mastery totals of a student per topic, Kompetensi Dasar or tag.
+    
+    Maintained incrementally when a quiz session is graded (see mastery.py)
+    so dashboards read one row per target instead of scanning attempts.
+    Exactly one of topic / kompetensi_dasar / tag is set, matching `scope`.
+    """
+    
+    class Scope(models.TextChoices):
+        TOPIC = "topic", _("Topic")
+        KD = "kd", _("Kompetensi Dasar")
+        TAG = "tag", _("Tag")
+    
+    class Level(models.TextChoices):
+        NOT_STARTED = "not_started", _("Not Started")
+        NEEDS_WORK = "needs_work", _("Needs Work")
+        DEVELOPING = "developing", _("Developing")
+        MASTERED = "mastered", _("Mastered")
+    
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="mastery_records",
+    )
+    scope = models.CharField(max_length=10, choices=Scope.choices)
+    topic = models.ForeignKey(
+        "subjects.Topic", null=True, blank=True,
+        on_delete=models.CASCADE, related_name="+",
+    )
+    kompetensi_dasar = models.ForeignKey(
+        "questions.KompetensiDasar", null=True, blank=True,
+        on_delete=models.CASCADE, related_name="+",
+    )
+    tag = models.ForeignKey(
+        "questions.Tag", null=True, blank=True,
+        on_delete=models.CASCADE, related_name="+",
+    )
+    
+    total = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    points = models.PositiveIntegerField(default=0)
+    last_attempt_at = models.DateTimeField(null=True, blank=True)
+    level = models.CharField(
+        max_length=20, choices=Level.choices, default=Level.NOT_STARTED
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = "mastery_records"
+        verbose_name = _("Mastery Record")
+        verbose_name_plural = _("Mastery Records")
+        indexes = [
+            models.Index(fields=["student", "scope"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "topic"],
+                condition=models.Q(scope="topic"),
+                name="uniq_mastery_student_topic",
+            ),
+            models.UniqueConstraint(
+                fields=["student", "kompetensi_dasar"],
+                condition=models.Q(scope="kd"),
+                name="uniq_mastery_student_kd",
+            ),
+            models.UniqueConstraint(
+                fields=["student", "tag"],
+                condition=models.Q(scope="tag"),
+                name="uniq_mastery_student_tag",
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.student_id} {self.scope}:{self.target_id} ({self.level})"
+    
+    @property
+    def target_id(self):
+        return {
+            self.Scope.TOPIC: self.topic_id,
+            self.Scope.KD: self.kompetensi_dasar_id,
+            self.Scope.TAG: self.tag_id,
+        }[self.scope]
+    
+    @property
+    def accuracy(self):
+        return (self.correct / self.total) * 100 if self.total else 0
+
+
+class ProgressSnapshot(models.Model):
+    """
+    Weekly record of a student's progress metrics.
+    
+    Produced by a background job (see snapshots.py) so trend and history
+    views read one row per week instead of recomputing from attempts.
+    Values cover the activity inside [period_start, period_end).
+    """
+    
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="progress_snapshots",
+    )
+    academic_year = models.ForeignKey(
+        "academic.AcademicYear", null=True, blank=True,
+        on_delete=models.SET_NULL, related_name="progress_snapshots",
+    )
+    period_start = models.DateField()
+    period_end = models.DateField()
+    
+    total_attempts = models.PositiveIntegerField(default=0)
+    correct_attempts = models.PositiveIntegerField(default=0)
+    accuracy = models.FloatField(default=0)
+    total_points = models.PositiveIntegerField(default=0)
+    time_spent = models.PositiveIntegerField(
+        default=0, help_text=_("Time spent answering, in seconds")
+    )
+    
+    quizzes_taken = models.PositiveIntegerField(default=0)
+    quizzes_passed = models.PositiveIntegerField(default=0)
+    avg_score = models.FloatField(default=0)
+    # Consistency: standard deviation of session scores (lower is steadier)
+    score_stddev = models.FloatField(default=0)
+    
+    # {subject_id: {"name", "total", "correct", "accuracy"}}
+    subject_breakdown = models.JSONField(default=dict, blank=True)
+    
+    generated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = "progress_snapshots"
+        verbose_name = _("Progress Snapshot")
+        verbose_name_plural = _("Progress Snapshots")
+        ordering = ["-period_start"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "period_start"],
+                name="uniq_snapshot_student_period",
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.student_id} @ {self.period_start}"
+
+
+class DailyActivity(models.Model):
+    """
+    Per-student, per-day rollup of graded attempts.
+    
+    Maintained incrementally by grading (see rollups.py); the accuracy
+    trend and recent activity read one row per day from here.
+    """
+    
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="daily_activity",
+    )
+    date = models.DateField()
+    attempts = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    points = models.PositiveIntegerField(default=0)
+    time_spent = models.PositiveIntegerField(
+        default=0, help_text=_("Time spent answering, in seconds")
+    )
+    
+    class Meta:
+        db_table = "daily_activity"
+        verbose_name = _("Daily Activity")
+        verbose_name_plural = _("Daily Activity")
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["student", "date"],
+                name="uniq_daily_activity_student_date",
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.student_id} @ {self.date}"
@@ -1,7 +1,8 @@
 import csv
-from io import StringIO
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.contrib.auth import get_user_model
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from datetime import datetime
 
 from apps.analytics.models import Attempt
@@ -9,31 +10,59 @@ from apps.quizzes.models import QuizSession
 
 User = get_user_model()
 
+# Rows fetched per database round trip while streaming detail sections
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    """Pseudo-buffer for csv.writer: write() hands the encoded row back."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows, filename):
+    """
+    Stream `rows` as a CSV download without building the file in memory.
+    Rows are produced lazily, so queries run while the response is sent.
+    """
+    writer = csv.writer(Echo())
+    response = StreamingHttpResponse(
+        (writer.writerow(row) for row in rows), content_type='text/csv'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
 
 def generate_student_report_csv(student, date_from=None, date_to=None):
     """
     Generate a CSV report for a student's performance.
-    Returns an HttpResponse with CSV content.
+    
+    Streamed row by row: the summary comes from SQL aggregates and the
+    detail section iterates attempts in chunks, so memory stays flat and
+    every attempt in the date range is listed.
     
     Args:
         student: User instance with role='student'
         date_from: Optional start date filter
         date_to: Optional end date filter
     """
-    output = StringIO()
-    writer = csv.writer(output)
-    
-    # Get student name
     student_name = student.get_full_name() or student.username
-    
+    filename = f'laporan_{student_name.replace(" ", "_")}_{datetime.now().strftime("%Y%m%d")}.csv'
+    return stream_csv(
+        _student_report_rows(student, student_name, date_from, date_to), filename
+    )
+
+
+def _student_report_rows(student, student_name, date_from, date_to):
     # Header
-    writer.writerow([f'Laporan Progress Siswa: {student_name}'])
-    writer.writerow([f'Kelas: {student.grade or "-"}'])
-    writer.writerow([f'Tanggal Laporan: {datetime.now().strftime("%d/%m/%Y %H:%M")}'])
-    writer.writerow([])  # Empty row
+    yield [f'Laporan Progress Siswa: {student_name}']
+    yield [f'Kelas: {student.grade or "-"}']
+    yield [f'Tanggal Laporan: {datetime.now().strftime("%d/%m/%Y %H:%M")}']
+    yield []  # Empty row
     
     # Summary section
-    writer.writerow(['=== RINGKASAN ==='])
+    yield ['=== RINGKASAN ===']
     
     attempts = Attempt.objects.filter(student=student)
     if date_from:
@@ -41,35 +70,51 @@ def generate_student_report_csv(student, date_from=None, date_to=None):
     if date_to:
         attempts = attempts.filter(created_at__lte=date_to)
     
-    total_attempts = attempts.count()
-    correct_attempts = attempts.filter(is_correct=True).count()
+    summary = attempts.aggregate(
+        total=Count('id'),
+        correct=Count('id', filter=Q(is_correct=True)),
+        points=Coalesce(Sum('points_earned'), 0),
+    )
+    total_attempts = summary['total']
+    correct_attempts = summary['correct']
     accuracy = round((correct_attempts / total_attempts) * 100, 1) if total_attempts > 0 else 0
-    total_points = sum(a.points_earned for a in attempts)
     
-    writer.writerow(['Total Soal Dikerjakan', total_attempts])
-    writer.writerow(['Jawaban Benar', correct_attempts])
-    writer.writerow(['Akurasi', f'{accuracy}%'])
-    writer.writerow(['Total Poin', total_points])
-    writer.writerow([])
+    yield ['Total Soal Dikerjakan', total_attempts]
+    yield ['Jawaban Benar', correct_attempts]
+    yield ['Akurasi', f'{accuracy}%']
+    yield ['Total Poin', summary['points']]
+    yield []
     
     # Quiz Summary
-    writer.writerow(['=== STATISTIK KUIS ==='])
+    yield ['=== STATISTIK KUIS ===']
     sessions = QuizSession.objects.filter(student=student, completed_at__isnull=False)
     if date_from:
         sessions = sessions.filter(started_at__gte=date_from)
     if date_to:
         sessions = sessions.filter(started_at__lte=date_to)
+    quiz_summary = sessions.aggregate(
+        taken=Count('id'),
+        passed=Count('id', filter=Q(passed=True)),
+    )
     
-    writer.writerow(['Kuis Dikerjakan', sessions.count()])
-    writer.writerow(['Kuis Lulus', sessions.filter(passed=True).count()])
-    writer.writerow([])
+    yield ['Kuis Dikerjakan', quiz_summary['taken']]
+    yield ['Kuis Lulus', quiz_summary['passed']]
+    yield []
     
     # Attempt Details
-    writer.writerow(['=== DETAIL JAWABAN ==='])
-    writer.writerow(['Tanggal', 'Mata Pelajaran', 'Topik', 'Soal', 'Jawaban', 'Benar/Salah', 'Poin'])
-    
-    for attempt in attempts.select_related('question', 'question__topic', 'question__topic__subject').order_by('-created_at')[:100]:
-        writer.writerow([
+    yield ['=== DETAIL JAWABAN ===']
+    yield ['Tanggal', 'Mata Pelajaran', 'Topik', 'Soal', 'Jawaban', 'Benar/Salah', 'Poin']
+    
+    details = attempts.select_related(
+        'question', 'question__topic', 'question__topic__subject'
+    ).only(
+        'created_at', 'answer_given', 'is_correct', 'points_earned',
+        'question__question_text', 'question__topic__name',
+        'question__topic__subject__name',
+    ).order_by('-created_at')
+    
+    for attempt in details.iterator(chunk_size=CHUNK_SIZE):
+        yield [
             attempt.created_at.strftime('%d/%m/%Y %H:%M'),
             attempt.question.topic.subject.name if attempt.question.topic else '-',
             attempt.question.topic.name if attempt.question.topic else '-',
@@ -77,60 +122,57 @@ def generate_student_report_csv(student, date_from=None, date_to=None):
             attempt.answer_given or '-',
             'Benar' if attempt.is_correct else 'Salah',
             attempt.points_earned,
-        ])
-    
-    # Create response
-    output.seek(0)
-    response = HttpResponse(output.read(), content_type='text/csv')
-    filename = f'laporan_{student_name.replace(" ", "_")}_{datetime.now().strftime("%Y%m%d")}.csv'
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    
-    return response
+        ]
 
 
 def generate_class_summary_csv(grade=None):
     """
     Generate a CSV summary of all students (optionally filtered by grade).
     Uses User model with role='student'.
-    """
-    output = StringIO()
-    writer = csv.writer(output)
-    
-    writer.writerow([f'Ringkasan Kelas{" - Kelas " + str(grade) if grade else ""}'])
-    writer.writerow([f'Tanggal: {datetime.now().strftime("%d/%m/%Y %H:%M")}'])
-    writer.writerow([])
     
-    writer.writerow(['Nama Siswa', 'Kelas', 'Total Soal', 'Benar', 'Akurasi', 'Total Poin', 'Kuis Lulus'])
+    Every figure comes from one annotated query (attempt counts and points
+    through a join, passed quizzes through a correlated subquery so the
+    join does not multiply them), streamed row by row.
+    """
+    filename = f'ringkasan_kelas_{datetime.now().strftime("%Y%m%d")}.csv'
+    return stream_csv(_class_summary_rows(grade), filename)
+
+
+def class_summary_queryset(grade=None):
+    """Students annotated with their attempt and passed-quiz totals."""
+    passed = QuizSession.objects.filter(
+        student=OuterRef('pk'), completed_at__isnull=False, passed=True
+    ).order_by().values('student').annotate(n=Count('pk')).values('n')
     
     students = User.objects.filter(role=User.Role.STUDENT)
     if grade:
         students = students.filter(grade=grade)
     
-    for student in students.order_by('grade', 'first_name'):
-        student_name = student.get_full_name() or student.username
-        attempts = Attempt.objects.filter(student=student)
-        total = attempts.count()
-        correct = attempts.filter(is_correct=True).count()
-        accuracy = round((correct / total) * 100, 1) if total > 0 else 0
-        points = sum(a.points_earned for a in attempts)
-        quizzes_passed = QuizSession.objects.filter(
-            student=student, 
-            completed_at__isnull=False, 
-            passed=True
-        ).count()
-        
-        writer.writerow([
-            student_name,
-            student.grade or '-',
-            total,
-            correct,
-            f'{accuracy}%',
-            points,
-            quizzes_passed,
-        ])
+    return students.only(
+        'username', 'first_name', 'last_name', 'grade'
+    ).annotate(
+        total=Count('attempts'),
+        correct=Count('attempts', filter=Q(attempts__is_correct=True)),
+        points=Coalesce(Sum('attempts__points_earned'), 0),
+        quizzes_passed=Coalesce(Subquery(passed), 0),
+    ).order_by('grade', 'first_name', 'pk')
+
+
+def _class_summary_rows(grade):
+    yield [f'Ringkasan Kelas{" - Kelas " + str(grade) if grade else ""}']
+    yield [f'Tanggal: {datetime.now().strftime("%d/%m/%Y %H:%M")}']
+    yield []
     
-    output.seek(0)
-    response = HttpResponse(output.read(), content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="ringkasan_kelas_{datetime.now().strftime("%Y%m%d")}.csv"'
+    yield ['Nama Siswa', 'Kelas', 'Total Soal', 'Benar', 'Akurasi', 'Total Poin', 'Kuis Lulus']
     
-    return response
+    for student in class_summary_queryset(grade).iterator(chunk_size=CHUNK_SIZE):
+        accuracy = round((student.correct / student.total) * 100, 1) if student.total > 0 else 0
+        yield [
+            student.get_full_name() or student.username,
+            student.grade or '-',
+            student.total,
+            student.correct,
+            f'{accuracy}%',
+            student.points,
+            student.quizzes_passed,
+        ]
@@ -0,0 +1,78 @@
+"""
+Per-student daily activity rollup (DailyActivity).
+
+grade_session() adds each graded session to the row of the day it was
+finished with record_daily_activity(): one conflict-ignoring INSERT to make
+sure the row exists and one UPDATE with F() increments, so concurrent
+gradings never lose counts. rebuild_daily_activity() recomputes the table
+from the Attempt history (see the rebuild_daily_activity command).
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+from apps.analytics.mastery import final_attempts
+from apps.analytics.metrics_cache import bump_global_version
+from apps.analytics.models import DailyActivity
+
+
+def record_daily_activity(student_id, day, attempts):
+    """Add graded attempts of one student to the rollup row of `day`."""
+    attempts = list(attempts)
+    if not attempts:
+        return
+    DailyActivity.objects.bulk_create(
+        [DailyActivity(student_id=student_id, date=day)], ignore_conflicts=True
+    )
+    DailyActivity.objects.filter(student_id=student_id, date=day).update(
+        attempts=F("attempts") + len(attempts),
+        correct=F("correct") + sum(1 for attempt in attempts if attempt.is_correct),
+        points=F("points") + sum(attempt.points_earned for attempt in attempts),
+        time_spent=F("time_spent") + sum(attempt.time_taken for attempt in attempts),
+    )
+
+
+def rebuild_daily_activity(student_ids=None, batch_size=200):
+    """
+    Recompute the rollup from the Attempt history, `batch_size` students
+    per grouped query. A session's attempts count on the day it was
+    completed, practice attempts on the day they were made.
+    Returns the number of rows written.
+    """
+    attempts = final_attempts()
+    if student_ids is None:
+        student_ids = attempts.order_by().values_list("student_id", flat=True).distinct()
+    student_ids = sorted(student_ids)
+
+    written = 0
+    for start in range(0, len(student_ids), batch_size):
+        chunk = student_ids[start:start + batch_size]
+        rows = (
+            attempts.filter(student_id__in=chunk)
+            .annotate(day=TruncDate(Coalesce("quiz_session__completed_at", "created_at")))
+            .values("student_id", "day")
+            .annotate(
+                total=Count("id"),
+                correct=Count("id", filter=Q(is_correct=True)),
+                points=Sum("points_earned"),
+                seconds=Sum("time_taken"),
+            )
+            .order_by()
+        )
+        records = [
+            DailyActivity(
+                student_id=row["student_id"],
+                date=row["day"],
+                attempts=row["total"],
+                correct=row["correct"],
+                points=row["points"] or 0,
+                time_spent=row["seconds"] or 0,
+            )
+            for row in rows
+        ]
+        with transaction.atomic():
+            DailyActivity.objects.filter(student_id__in=chunk).delete()
+            DailyActivity.objects.bulk_create(records, batch_size=500)
+        written += len(records)
+    bump_global_version()
+    return written
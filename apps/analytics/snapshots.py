@@ -0,0 +1,161 @@
+"""
+Weekly ProgressSnapshot generation.
+
+generate_progress_snapshots() writes one row per active student for a
+week, in chunks of students. Each chunk costs a fixed number of grouped
+queries (attempt totals, subject breakdown, quiz stats) plus one upsert,
+so the job scales with the number of chunks rather than students.
+
+Runs from Celery beat (apps.analytics.tasks) or the
+generate_progress_snapshots management command. Re-running a week
+overwrites its rows.
+"""
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Avg, Count, Q, StdDev, Sum
+from django.utils import timezone
+
+from apps.academic.models import AcademicYear
+from apps.analytics.metrics_cache import bump_global_version
+from apps.analytics.models import Attempt, ProgressSnapshot
+from apps.quizzes.models import QuizSession
+
+SNAPSHOT_FIELDS = [
+    "academic_year", "period_end", "total_attempts", "correct_attempts",
+    "accuracy", "total_points", "time_spent", "quizzes_taken",
+    "quizzes_passed", "avg_score", "score_stddev", "subject_breakdown",
+    "generated_at",
+]
+
+
+def week_start(day):
+    """Monday of the week containing `day`."""
+    return day - timedelta(days=day.weekday())
+
+
+def last_complete_week(today=None):
+    today = today or timezone.localdate()
+    return week_start(today) - timedelta(days=7)
+
+
+def _academic_year_for(day):
+    year = AcademicYear.objects.filter(
+        start_date__lte=day, end_date__gte=day
+    ).first()
+    return year or AcademicYear.objects.filter(is_active=True).first()
+
+
+def _period_attempts(student_ids, start, end):
+    """Final attempts of the period: graded sessions and practice answers."""
+    return Attempt.objects.filter(student_id__in=student_ids).filter(
+        Q(quiz_session__completed_at__gte=start, quiz_session__completed_at__lt=end)
+        | Q(quiz_session__isnull=True, created_at__gte=start, created_at__lt=end)
+    )
+
+
+def _accuracy(correct, total):
+    return round((correct / total) * 100, 1) if total else 0
+
+
+def build_snapshots(student_ids, period_start, academic_year=None):
+    """Compute unsaved snapshots for `student_ids` with three grouped queries."""
+    period_end = period_start + timedelta(days=7)
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(period_start, time.min), tz)
+    end = timezone.make_aware(datetime.combine(period_end, time.min), tz)
+
+    totals = {
+        row["student_id"]: row
+        for row in _period_attempts(student_ids, start, end)
+        .values("student_id")
+        .annotate(
+            total=Count("id"),
+            correct=Count("id", filter=Q(is_correct=True)),
+            points=Sum("points_earned"),
+            seconds=Sum("time_taken"),
+        )
+        .order_by()
+    }
+
+    subjects = {}
+    subject_rows = (
+        _period_attempts(student_ids, start, end)
+        .values("student_id", "question__topic__subject", "question__topic__subject__name")
+        .annotate(total=Count("id"), correct=Count("id", filter=Q(is_correct=True)))
+        .order_by()
+    )
+    for row in subject_rows:
+        subjects.setdefault(row["student_id"], {})[str(row["question__topic__subject"])] = {
+            "name": row["question__topic__subject__name"],
+            "total": row["total"],
+            "correct": row["correct"],
+            "accuracy": _accuracy(row["correct"], row["total"]),
+        }
+
+    quizzes = {
+        row["student_id"]: row
+        for row in QuizSession.objects.filter(
+            student_id__in=student_ids, completed_at__gte=start, completed_at__lt=end
+        )
+        .values("student_id")
+        .annotate(
+            taken=Count("id"),
+            passed=Count("id", filter=Q(passed=True)),
+            avg_score=Avg("score"),
+            stddev=StdDev("score"),
+        )
+        .order_by()
+    }
+
+    snapshots = []
+    for student_id in student_ids:
+        total = totals.get(student_id, {})
+        quiz = quizzes.get(student_id, {})
+        snapshots.append(ProgressSnapshot(
+            student_id=student_id,
+            academic_year=academic_year,
+            period_start=period_start,
+            period_end=period_end,
+            total_attempts=total.get("total", 0),
+            correct_attempts=total.get("correct", 0),
+            accuracy=_accuracy(total.get("correct", 0), total.get("total", 0)),
+            total_points=total.get("points") or 0,
+            time_spent=total.get("seconds") or 0,
+            quizzes_taken=quiz.get("taken", 0),
+            quizzes_passed=quiz.get("passed", 0),
+            avg_score=round(quiz.get("avg_score") or 0, 1),
+            score_stddev=round(quiz.get("stddev") or 0, 1),
+            subject_breakdown=subjects.get(student_id, {}),
+        ))
+    return snapshots
+
+
+def generate_progress_snapshots(period_start=None, batch_size=500):
+    """
+    Write the snapshots of one week (the last complete week by default)
+    for every active student. Returns the number of rows written.
+    """
+    User = get_user_model()
+    period_start = week_start(period_start or last_complete_week())
+    academic_year = _academic_year_for(period_start)
+
+    student_ids = list(
+        User.objects.filter(role=User.Role.STUDENT, is_active=True)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    written = 0
+    for index in range(0, len(student_ids), batch_size):
+        snapshots = build_snapshots(
+            student_ids[index:index + batch_size], period_start, academic_year
+        )
+        ProgressSnapshot.objects.bulk_create(
+            snapshots,
+            update_conflicts=True,
+            unique_fields=["student", "period_start"],
+            update_fields=SNAPSHOT_FIELDS,
+        )
+        written += len(snapshots)
+    bump_global_version()
+    return written
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from apps.analytics.snapshots import generate_progress_snapshots as _generate_progress_snapshots
+
+
+@shared_task
+def generate_progress_snapshots():
+    """Snapshot last week's progress of every student (see CELERY_BEAT_SCHEDULE)."""
+    return _generate_progress_snapshots()
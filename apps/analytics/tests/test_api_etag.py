@@ -0,0 +1,54 @@
+"""
+Tests for conditional GET (ETag) support on the analytics JSON APIs.
+"""
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from apps.analytics.metrics_cache import bump_attempt_version
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def student_client(client, student_user):
+    client.force_login(student_user)
+    return client
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', ['analytics:api-accuracy-trend', 'analytics:api-progress-history'])
+class TestMetricsETag:
+
+    def test_unchanged_metrics_return_304_without_aggregating(self, student_client, url_name, django_assert_max_num_queries):
+        url = reverse(url_name)
+        first = student_client.get(url)
+        assert first.status_code == 200
+        assert 'private' in first['Cache-Control']
+
+        # Only the auth session and user lookups reach the database
+        with django_assert_max_num_queries(2):
+            again = student_client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        assert again.status_code == 304
+        assert again['ETag'] == first['ETag']
+
+    def test_new_attempts_change_the_etag(self, student_client, student_user, url_name):
+        url = reverse(url_name)
+        etag = student_client.get(url)['ETag']
+
+        bump_attempt_version(student_user.pk)
+        response = student_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    def test_query_is_part_of_the_etag(self, student_client, url_name):
+        url = reverse(url_name)
+
+        assert student_client.get(url, {'days': 7, 'weeks': 4})['ETag'] != student_client.get(url)['ETag']
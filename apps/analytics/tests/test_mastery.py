@@ -0,0 +1,111 @@
+"""
+Tests for the incrementally maintained MasteryRecord table.
+"""
+import pytest
+from django.core.management import call_command
+
+from apps.analytics.mastery import rebuild_mastery
+from apps.analytics.metrics import StudentMetrics
+from apps.analytics.models import Attempt, MasteryRecord
+from apps.questions.models import Question
+from apps.quizzes.models import Quiz, QuizSession
+from apps.quizzes.services import grade_session
+
+
+@pytest.fixture
+def tagged_quiz(topic, tag, kompetensi_dasar, admin_user):
+    questions = []
+    for i in range(4):
+        question = Question.objects.create(
+            topic=topic,
+            question_text=f'Soal {i}',
+            question_type='pilgan',
+            difficulty='mudah',
+            options=['A', 'B', 'C', 'D'],
+            answer_key='A',
+            points=10,
+        )
+        question.tags.add(tag)
+        question.kompetensi_dasar.add(kompetensi_dasar)
+        questions.append(question)
+    quiz = Quiz.objects.create(
+        title='Kuis Mastery',
+        subject=topic.subject,
+        grade=4,
+        quiz_type=Quiz.QuizType.CUSTOM,
+        created_by=admin_user,
+    )
+    quiz.questions.set(questions)
+    return quiz
+
+
+def _finish(quiz, student, correct):
+    session = QuizSession.objects.create(student=student, quiz=quiz, grade=4)
+    ids = sorted(session.session_questions.values_list('pk', flat=True))
+    grade_session(session, {qid: 'A' if i < correct else 'B' for i, qid in enumerate(ids)})
+    return session
+
+
+def _snapshot(student):
+    return {
+        (record.scope, record.target_id): (record.total, record.correct, record.points, record.level)
+        for record in MasteryRecord.objects.filter(student=student)
+    }
+
+
+@pytest.mark.django_db
+class TestMasteryRecords:
+
+    def test_grading_updates_every_scope(self, tagged_quiz, student_user, topic, tag, kompetensi_dasar):
+        _finish(tagged_quiz, student_user, correct=3)
+
+        assert _snapshot(student_user) == {
+            ('topic', topic.pk): (4, 3, 30, 'developing'),
+            ('kd', kompetensi_dasar.pk): (4, 3, 30, 'developing'),
+            ('tag', tag.pk): (4, 3, 30, 'developing'),
+        }
+
+    def test_sessions_accumulate_and_regrading_is_a_noop(self, tagged_quiz, student_user, topic):
+        first = _finish(tagged_quiz, student_user, correct=4)
+        _finish(tagged_quiz, student_user, correct=4)
+        grade_session(first)
+
+        record = MasteryRecord.objects.get(student=student_user, topic=topic)
+        assert (record.total, record.correct, record.level) == (8, 8, 'mastered')
+        assert record.last_attempt_at is not None
+
+    def test_open_session_placeholders_do_not_count(self, tagged_quiz, student_user):
+        QuizSession.objects.create(student=student_user, quiz=tagged_quiz, grade=4)
+
+        assert Attempt.objects.filter(student=student_user).count() == 4
+        assert not MasteryRecord.objects.filter(student=student_user).exists()
+        assert StudentMetrics(student_user).get_total_attempts() == 0
+
+    def test_rebuild_matches_incremental(self, tagged_quiz, student_user):
+        _finish(tagged_quiz, student_user, correct=1)
+        _finish(tagged_quiz, student_user, correct=4)
+        QuizSession.objects.create(student=student_user, quiz=tagged_quiz, grade=4)
+        incremental = _snapshot(student_user)
+
+        MasteryRecord.objects.update(total=0, correct=0)
+        assert rebuild_mastery() == 3
+
+        assert _snapshot(student_user) == incremental
+
+    def test_rebuild_command(self, tagged_quiz, student_user):
+        _finish(tagged_quiz, student_user, correct=2)
+        MasteryRecord.objects.all().delete()
+
+        call_command('rebuild_mastery', '--student', str(student_user.pk))
+
+        assert MasteryRecord.objects.filter(student=student_user).count() == 3
+
+    def test_metrics_read_from_mastery(self, tagged_quiz, student_user, django_assert_num_queries):
+        _finish(tagged_quiz, student_user, correct=3)
+        metrics = StudentMetrics(student_user)
+
+        with django_assert_num_queries(1):
+            assert metrics.get_accuracy() == 75.0
+            assert metrics.get_total_points() == 30
+        assert metrics.get_tag_performance()[0]['level'] == 'neutral'
+        assert metrics.get_kd_coverage()[0]['mastery'] == 'developing'
@@ -0,0 +1,164 @@
+"""
+Tests for StudentMetrics aggregations.
+"""
+import pytest
+
+from apps.accounts.models import User
+from apps.analytics.mastery import record_attempts
+from apps.analytics.metrics import StudentMetrics, get_kd_coverage
+from apps.analytics.models import Attempt
+from apps.questions.models import KompetensiDasar, Question
+from apps.subjects.models import Subject, Topic
+
+
+def _make_subject(name, grade=4):
+    subject = Subject.objects.create(name=name, grade=grade)
+    topic = Topic.objects.create(subject=subject, name=f'{name} Topik')
+    return subject, topic
+
+
+def _answer(student, topic, correct, wrong, kd=None):
+    attempts = []
+    for i, is_correct in enumerate([True] * correct + [False] * wrong):
+        question = Question.objects.create(
+            topic=topic,
+            question_text=f'{topic.name} {i}',
+            question_type='pilgan',
+            difficulty='mudah',
+            options=['A', 'B'],
+            answer_key='A',
+            points=10,
+        )
+        if kd is not None:
+            question.kompetensi_dasar.add(kd)
+        attempts.append(Attempt.objects.create(
+            student=student,
+            question=question,
+            answer_given='A' if is_correct else 'B',
+            is_correct=is_correct,
+        ))
+    record_attempts(attempts)
+
+
+@pytest.mark.django_db
+class TestSubjectPerformance:
+
+    def test_counts_per_subject_including_untouched(self, student_user):
+        math, math_topic = _make_subject('Matematika')
+        science, science_topic = _make_subject('IPA')
+        history, _ = _make_subject('IPS')
+        _make_subject('Kelas 5 saja', grade=5)
+        _answer(student_user, math_topic, correct=3, wrong=1)
+        _answer(student_user, science_topic, correct=0, wrong=2)
+
+        performance = {
+            row['subject']: row
+            for row in StudentMetrics(student_user).get_subject_performance()
+        }
+
+        assert set(performance) == {math, science, history}
+        assert (performance[math]['total'], performance[math]['correct']) == (4, 3)
+        assert performance[math]['accuracy'] == 75.0
+        assert performance[science]['accuracy'] == 0
+        assert (performance[history]['total'], performance[history]['accuracy']) == (0, 0)
+
+    def test_other_students_are_ignored(self, student_user, parent_user):
+        math, math_topic = _make_subject('Matematika')
+        _answer(parent_user, math_topic, correct=2, wrong=0)
+
+        performance = StudentMetrics(student_user).get_subject_performance()
+
+        assert performance[0]['total'] == 0
+
+    def test_query_count_independent_of_subjects(self, student_user, django_assert_num_queries):
+        for i in range(10):
+            _, topic = _make_subject(f'Mapel {i}')
+            _answer(student_user, topic, correct=1, wrong=1)
+
+        with django_assert_num_queries(2):
+            performance = StudentMetrics(student_user).get_subject_performance()
+
+        assert len(performance) == 10
+
+
+@pytest.mark.django_db
+class TestKDCoverage:
+
+    @pytest.fixture
+    def catalogue(self):
+        subject, topic = _make_subject('Matematika')
+        kds = [
+            KompetensiDasar.objects.create(
+                code=f'3.{i}', description=f'KD {i}', grade=4, subject=subject
+            )
+            for i in range(1, 5)
+        ]
+        return topic, kds
+
+    def test_mastery_levels(self, student_user, catalogue):
+        topic, kds = catalogue
+        _answer(student_user, topic, correct=4, wrong=1, kd=kds[0])
+        _answer(student_user, topic, correct=2, wrong=1, kd=kds[1])
+        _answer(student_user, topic, correct=1, wrong=3, kd=kds[2])
+
+        coverage = StudentMetrics(student_user).get_kd_coverage()
+
+        assert [row['mastery'] for row in coverage] == [
+            'mastered', 'developing', 'needs_work', 'not_started'
+        ]
+        assert (coverage[0]['total'], coverage[0]['correct'], coverage[0]['accuracy']) == (5, 4, 80.0)
+
+    def test_many_students_and_grades_in_two_queries(self, student_user, catalogue, django_assert_num_queries):
+        topic, kds = catalogue
+        subject_5, _ = _make_subject('Matematika 5', grade=5)
+        KompetensiDasar.objects.create(code='3.1', description='KD 5', grade=5, subject=subject_5)
+        sibling = User.objects.create_user(
+            username='sibling', password='x', role=User.Role.STUDENT, grade=5
+        )
+        _answer(student_user, topic, correct=1, wrong=0, kd=kds[0])
+        _answer(sibling, topic, correct=0, wrong=2, kd=kds[0])
+
+        with django_assert_num_queries(2):
+            coverage = get_kd_coverage([student_user, sibling])
+        assert len(coverage[student_user.pk]) == 4
+        assert [row['kd'].grade for row in coverage[sibling.pk]] == [5]
+
+        with django_assert_num_queries(2):
+            coverage = get_kd_coverage([student_user, sibling], grades=[4, 5])
+        sibling_rows = {row['kd'].pk: row for row in coverage[sibling.pk]}
+        assert len(sibling_rows) == 5
+        assert sibling_rows[kds[0].pk]['mastery'] == 'needs_work'
+        assert coverage[student_user.pk][0]['mastery'] == 'mastered'
+
+
+@pytest.mark.django_db
+class TestTopicPerformance:
+
+    def test_strengths_and_weaknesses_share_one_query(self, student_user, django_assert_num_queries):
+        _, strong = _make_subject('Matematika')
+        _, weak = _make_subject('IPA')
+        _, middle = _make_subject('IPS')
+        _answer(student_user, strong, correct=4, wrong=0)
+        _answer(student_user, weak, correct=1, wrong=3)
+        _answer(student_user, middle, correct=7, wrong=3)
+        metrics = StudentMetrics(student_user)
+
+        with django_assert_num_queries(1):
+            strengths = metrics.get_strengths(min_attempts=1)
+            weaknesses = metrics.get_weaknesses(min_attempts=1)
+            topics = metrics.get_topic_performance()
+            names = [row['topic'].name for row in strengths + weaknesses]
+
+        assert names == [strong.name, weak.name]
+        assert strengths[0] == {'topic': strong, 'accuracy': 100.0, 'attempts': 4}
+        assert weaknesses[0]['accuracy'] == 25.0
+        assert len(topics) == 3
+
+    def test_min_attempts_filter(self, student_user):
+        _, topic = _make_subject('Matematika')
+        _answer(student_user, topic, correct=2, wrong=0)
+
+        metrics = StudentMetrics(student_user)
+
+        assert metrics.get_strengths() == []
+        assert len(metrics.get_strengths(min_attempts=2)) == 1
@@ -0,0 +1,119 @@
+"""
+Tests for the versioned per-student metrics cache.
+"""
+import time
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from apps.analytics.metrics_cache import (
+    CachedStudentMetrics,
+    bump_attempt_version,
+    bump_global_version,
+    LOCAL_CACHE_TIMEOUT,
+    get_versions,
+    metrics_etag,
+)
+from apps.quizzes.models import QuizSession
+from apps.quizzes.services import grade_session, save_answers
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def open_session(quiz, question, student_user):
+    quiz.questions.add(question)
+    return QuizSession.objects.create(student=student_user, quiz=quiz, grade=4)
+
+
+@pytest.mark.django_db
+class TestVersions:
+
+    def test_versions_only_increase(self, student_user):
+        before, global_before = get_versions(student_user.pk)
+
+        bump_attempt_version(student_user.pk)
+        after, global_after = get_versions(student_user.pk)
+
+        assert after > before
+        assert global_after == global_before
+
+        bump_global_version()
+        assert get_versions(student_user.pk)[1] > global_after
+
+    def test_evicted_version_restarts_higher(self, student_user):
+        before, _ = get_versions(student_user.pk)
+        cache.delete(f'metrics_version:{student_user.pk}')
+
+        bump_attempt_version(student_user.pk)
+
+        assert get_versions(student_user.pk)[0] > before
+
+    def test_per_process_cache_expires_versions(self, student_user, monkeypatch):
+        """LocMem bumps never reach other workers, so nothing outlives the short TTL."""
+        etag = metrics_etag(student_user.pk)
+        assert metrics_etag(student_user.pk) == etag
+
+        later = time.time() + LOCAL_CACHE_TIMEOUT + 1
+        monkeypatch.setattr(time, "time", lambda: later)
+
+        assert metrics_etag(student_user.pk) != etag
+
+    def test_dummy_cache_still_returns_versions(self, student_user, settings):
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+        student_version, global_version = get_versions(student_user.pk)
+
+        assert student_version and global_version
+
+
+@pytest.mark.django_db
+class TestCachedStudentMetrics:
+
+    def test_cached_until_version_changes(self, student_user, django_assert_num_queries):
+        CachedStudentMetrics(student_user).get_quiz_stats()
+
+        with django_assert_num_queries(0):
+            CachedStudentMetrics(student_user).get_quiz_stats()
+
+        bump_attempt_version(student_user.pk)
+        with django_assert_num_queries(3):
+            CachedStudentMetrics(student_user).get_quiz_stats()
+
+    def test_arguments_are_part_of_the_key(self, student_user):
+        metrics = CachedStudentMetrics(student_user)
+
+        assert metrics._key('get_strengths', (), {'min_attempts': 1}) != metrics._key('get_strengths', (), {})
+        assert metrics.student == student_user
+
+    def test_grading_invalidates(self, open_session, question, student_user, django_capture_on_commit_callbacks):
+        assert CachedStudentMetrics(student_user).get_total_attempts() == 0
+
+        with django_capture_on_commit_callbacks(execute=True):
+            grade_session(open_session, {question.pk: 'B'})
+
+        assert CachedStudentMetrics(student_user).get_total_attempts() == 1
+
+    def test_autosave_bumps_version(self, open_session, question, student_user, django_capture_on_commit_callbacks):
+        before, _ = get_versions(student_user.pk)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            save_answers(open_session, {question.pk: 'A'})
+
+        assert get_versions(student_user.pk)[0] > before
+
+    def test_progress_page_served_from_cache(self, client, student_user, django_assert_max_num_queries):
+        client.force_login(student_user)
+        url = reverse('analytics:progress')
+        client.get(url)
+
+        # Only the auth session and user lookups reach the database
+        with django_assert_max_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == 200
@@ -0,0 +1,182 @@
+"""
+Tests for the streamed CSV reports.
+"""
+import csv
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.analytics.models import Attempt
+from apps.analytics.reports import generate_class_summary_csv, generate_student_report_csv
+from apps.questions.models import Question
+from apps.quizzes.models import QuizSession
+
+User = get_user_model()
+
+
+def _attempts(student, topic, count, correct=0, days_ago=0):
+    questions = Question.objects.bulk_create([
+        Question(
+            topic=topic,
+            question_text=f'Soal laporan {i+1}',
+            question_type='pilgan',
+            difficulty='mudah',
+            options=['A', 'B', 'C', 'D'],
+            answer_key='A',
+            points=10
+        )
+        for i in range(count)
+    ])
+    attempts = Attempt.objects.bulk_create([
+        Attempt(
+            student=student,
+            question=question,
+            answer_given='A' if i < correct else 'B',
+            is_correct=i < correct,
+            points_earned=10 if i < correct else 0,
+        )
+        for i, question in enumerate(questions)
+    ])
+    if days_ago:
+        Attempt.objects.filter(pk__in=[a.pk for a in attempts]).update(
+            created_at=timezone.now() - timedelta(days=days_ago)
+        )
+    return attempts
+
+
+def _rows(response):
+    content = b''.join(response.streaming_content).decode()
+    return list(csv.reader(content.splitlines()))
+
+
+def _section(rows, title):
+    start = rows.index([title]) + 1
+    return rows[start:]
+
+
+@pytest.mark.django_db
+class TestStudentReportCsv:
+    """Test the streamed per-student report."""
+
+    def test_streams_csv_download(self, student_user):
+        response = generate_student_report_csv(student_user)
+
+        assert isinstance(response, StreamingHttpResponse)
+        assert response['Content-Type'] == 'text/csv'
+        assert response['Content-Disposition'].startswith('attachment; filename="laporan_')
+
+    def test_summary_from_aggregates(self, student_user, topic):
+        _attempts(student_user, topic, 4, correct=3)
+
+        rows = _rows(generate_student_report_csv(student_user))
+
+        summary = _section(rows, '=== RINGKASAN ===')
+        assert summary[:4] == [
+            ['Total Soal Dikerjakan', '4'],
+            ['Jawaban Benar', '3'],
+            ['Akurasi', '75.0%'],
+            ['Total Poin', '30'],
+        ]
+
+    def test_detail_section_is_not_capped(self, student_user, topic):
+        _attempts(student_user, topic, 150)
+
+        rows = _rows(generate_student_report_csv(student_user))
+
+        details = _section(rows, '=== DETAIL JAWABAN ===')
+        assert len(details) == 1 + 150
+
+    def test_date_range_filters_summary_and_details(self, student_user, topic):
+        _attempts(student_user, topic, 2, correct=2, days_ago=40)
+        _attempts(student_user, topic, 3, correct=1)
+
+        rows = _rows(generate_student_report_csv(
+            student_user, date_from=timezone.now() - timedelta(days=7)
+        ))
+
+        assert ['Total Soal Dikerjakan', '3'] in rows
+        assert len(_section(rows, '=== DETAIL JAWABAN ===')) == 1 + 3
+
+    def test_query_count_independent_of_attempt_count(self, student_user, topic, parent_user):
+        counts = []
+        for student, size in ((student_user, 5), (parent_user, 300)):
+            _attempts(student, topic, size)
+            with CaptureQueriesContext(connection) as ctx:
+                _rows(generate_student_report_csv(student))
+            counts.append(len(ctx.captured_queries))
+
+        assert counts[0] == counts[1]
+
+
+def _students(count, grade=4):
+    return User.objects.bulk_create([
+        User(
+            username=f'siswa_{grade}_{i}',
+            first_name=f'Siswa {i:05d}',
+            role=User.Role.STUDENT,
+            grade=grade,
+        )
+        for i in range(count)
+    ])
+
+
+def _passed_sessions(student, quiz, count):
+    QuizSession.objects.bulk_create([
+        QuizSession(
+            student=student, quiz=quiz, grade=student.grade,
+            score=100, passed=True, completed_at=timezone.now()
+        )
+        for _ in range(count)
+    ])
+
+
+@pytest.mark.django_db
+class TestClassSummaryCsv:
+    """Test the set-based class summary."""
+
+    def test_row_per_student_with_totals(self, student_user, topic, quiz):
+        _attempts(student_user, topic, 4, correct=3)
+        _passed_sessions(student_user, quiz, 2)
+        QuizSession.objects.bulk_create([
+            QuizSession(student=student_user, quiz=quiz, grade=4, passed=False,
+                        completed_at=timezone.now()),
+            QuizSession(student=student_user, quiz=quiz, grade=4, passed=True),
+        ])
+
+        rows = _rows(generate_class_summary_csv())
+
+        # Passed sessions are not multiplied by the attempt join
+        assert ['Student User', '4', '4', '3', '75.0%', '30', '2'] in rows
+
+    def test_student_without_activity(self, student_user):
+        rows = _rows(generate_class_summary_csv())
+
+        assert ['Student User', '4', '0', '0', '0%', '0', '0'] in rows
+
+    def test_grade_filter_and_roles(self, student_user, parent_user):
+        _students(3, grade=5)
+
+        rows = _rows(generate_class_summary_csv(grade=5))
+
+        names = [row[0] for row in rows[4:]]
+        assert names == ['Siswa 00000', 'Siswa 00001', 'Siswa 00002']
+        assert rows[0] == ['Ringkasan Kelas - Kelas 5']
+
+    def test_benchmark_10k_students(self, topic, quiz):
+        """10,000 students export in a fixed number of queries."""
+        students = _students(10_000)
+        for student in students[:50]:
+            _attempts(student, topic, 2, correct=1)
+            _passed_sessions(student, quiz, 1)
+
+        with CaptureQueriesContext(connection) as ctx:
+            rows = _rows(generate_class_summary_csv())
+
+        assert len(rows) == 4 + 10_000
+        assert len(ctx.captured_queries) <= 2
+        assert rows[4] == ['Siswa 00000', '4', '2', '1', '50.0%', '10', '1']
@@ -0,0 +1,105 @@
+"""
+Tests for the DailyActivity rollup and the trend metrics that read it.
+"""
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.analytics.metrics import StudentMetrics
+from apps.analytics.models import DailyActivity
+from apps.analytics.rollups import rebuild_daily_activity
+from apps.quizzes.models import QuizSession
+from apps.quizzes.services import grade_session
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def quiz_with_question(quiz, question):
+    quiz.questions.add(question)
+    return quiz
+
+
+def _finish(quiz, student, question, answer):
+    session = QuizSession.objects.create(student=student, quiz=quiz, grade=4)
+    grade_session(session, {question.pk: answer})
+    return session
+
+
+@pytest.mark.django_db
+class TestDailyActivity:
+
+    def test_grading_accumulates_into_today(self, quiz_with_question, student_user, question):
+        _finish(quiz_with_question, student_user, question, 'B')
+        _finish(quiz_with_question, student_user, question, 'A')
+
+        row = DailyActivity.objects.get(student=student_user)
+        assert row.date == timezone.localdate()
+        assert (row.attempts, row.correct, row.points) == (2, 1, 10)
+
+    def test_rebuild_matches_incremental(self, quiz_with_question, student_user, question):
+        _finish(quiz_with_question, student_user, question, 'B')
+        QuizSession.objects.create(student=student_user, quiz=quiz_with_question, grade=4)
+        incremental = list(DailyActivity.objects.values('date', 'attempts', 'correct', 'points'))
+
+        DailyActivity.objects.all().delete()
+        call_command('rebuild_daily_activity')
+
+        assert list(DailyActivity.objects.values('date', 'attempts', 'correct', 'points')) == incremental
+
+    def test_rebuild_uses_completion_day(self, quiz_with_question, student_user, question):
+        session = _finish(quiz_with_question, student_user, question, 'B')
+        QuizSession.objects.filter(pk=session.pk).update(
+            completed_at=session.completed_at - timedelta(days=3)
+        )
+
+        assert rebuild_daily_activity() == 1
+        assert DailyActivity.objects.get().date == timezone.localdate() - timedelta(days=3)
+
+
+@pytest.mark.django_db
+class TestTrendMetrics:
+
+    @pytest.fixture
+    def history(self, student_user):
+        today = timezone.localdate()
+        DailyActivity.objects.bulk_create([
+            DailyActivity(student=student_user, date=today - timedelta(days=offset), attempts=4, correct=offset % 5)
+            for offset in range(0, 400, 2)
+        ])
+        return today
+
+    def test_trend_reads_one_row_per_day(self, student_user, history, django_assert_num_queries):
+        metrics = StudentMetrics(student_user)
+
+        with django_assert_num_queries(1):
+            short = metrics.get_accuracy_trend(days=7)
+        with django_assert_num_queries(1):
+            long = metrics.get_accuracy_trend(days=365)
+
+        assert [row['date'] for row in short][-1] == history.strftime('%Y-%m-%d')
+        assert len(short) == 4
+        assert len(long) == 183
+        assert short[-1] == {'date': history.strftime('%Y-%m-%d'), 'accuracy': 0, 'total': 4}
+
+    def test_recent_activity_newest_first(self, student_user, history):
+        activity = StudentMetrics(student_user).get_recent_activity(days=7)
+
+        assert [row['date'] for row in activity] == [history - timedelta(days=d) for d in (0, 2, 4, 6)]
+        assert activity[1]['correct'] == 2
+
+    def test_api_caps_days(self, client, student_user, history):
+        client.force_login(student_user)
+
+        response = client.get(reverse('analytics:api-accuracy-trend'), {'days': 100000})
+
+        assert len(response.json()['labels']) == 184
@@ -0,0 +1,114 @@
+"""
+Tests for weekly ProgressSnapshot generation.
+"""
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.academic.models import AcademicYear
+from apps.accounts.models import User
+from apps.analytics.models import Attempt, ProgressSnapshot
+from apps.analytics.snapshots import generate_progress_snapshots, week_start
+from apps.quizzes.models import QuizSession
+from apps.quizzes.services import grade_session
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def this_week():
+    return week_start(timezone.localdate())
+
+
+@pytest.fixture
+def graded_quiz(quiz, question, student_user):
+    quiz.questions.add(question)
+    session = QuizSession.objects.create(student=student_user, quiz=quiz, grade=4)
+    grade_session(session, {question.pk: 'B'})
+    return quiz
+
+
+def _students(count, prefix='siswa'):
+    return [
+        User.objects.create_user(
+            username=f'{prefix}{i}', password='x', role=User.Role.STUDENT, grade=4
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db
+class TestProgressSnapshots:
+
+    def test_week_metrics(self, graded_quiz, student_user, question, this_week):
+        Attempt.objects.create(
+            student=student_user, question=question, answer_given='A', time_taken=20
+        )
+        year = AcademicYear.objects.create(name='2026/2027', is_active=True)
+
+        generate_progress_snapshots(this_week)
+
+        snapshot = ProgressSnapshot.objects.get(student=student_user)
+        assert snapshot.academic_year == year
+        assert (snapshot.total_attempts, snapshot.correct_attempts) == (2, 1)
+        assert snapshot.accuracy == 50.0
+        assert snapshot.total_points == 10
+        assert snapshot.time_spent == 20
+        assert (snapshot.quizzes_taken, snapshot.quizzes_passed, snapshot.avg_score) == (1, 1, 100.0)
+        assert snapshot.subject_breakdown[str(question.topic.subject_id)]['total'] == 2
+
+    def test_idle_students_get_empty_rows_and_rerun_overwrites(self, graded_quiz, student_user, parent_user, this_week):
+        idle, = _students(1)
+
+        assert generate_progress_snapshots(this_week) == 2
+        assert ProgressSnapshot.objects.get(student=idle).total_attempts == 0
+        assert not ProgressSnapshot.objects.filter(student=parent_user).exists()
+
+        ProgressSnapshot.objects.update(total_attempts=99)
+        generate_progress_snapshots(this_week)
+        assert ProgressSnapshot.objects.get(student=student_user).total_attempts == 1
+        assert ProgressSnapshot.objects.count() == 2
+
+    def test_other_weeks_are_excluded(self, graded_quiz, student_user, this_week):
+        generate_progress_snapshots(this_week.replace(year=this_week.year - 1))
+
+        assert ProgressSnapshot.objects.get(student=student_user).total_attempts == 0
+
+    def test_query_count_independent_of_students(self, graded_quiz, this_week):
+        counts = []
+        for prefix, extra in (('a', 1), ('b', 20)):
+            _students(extra, prefix)
+            with CaptureQueriesContext(connection) as ctx:
+                generate_progress_snapshots(this_week)
+            counts.append(len(ctx.captured_queries))
+
+        assert counts[0] == counts[1]
+
+    def test_command_backfills_weeks(self, student_user, this_week):
+        call_command('generate_progress_snapshots', '--week', this_week.isoformat(), '--weeks', '3')
+
+        assert ProgressSnapshot.objects.filter(student=student_user).count() == 3
+
+
+@pytest.mark.django_db
+def test_history_api_reads_snapshots(client, graded_quiz, student_user, this_week):
+    generate_progress_snapshots(this_week)
+    client.force_login(student_user)
+
+    response = client.get(reverse('analytics:api-progress-history'), {'weeks': 500})
+
+    assert response.json() == {
+        'labels': [this_week.strftime('%Y-%m-%d')],
+        'values': [100.0],
+        'points': [10],
+    }
+    assert client.get(reverse('analytics:progress')).context['progress_history'][0]['total'] == 1
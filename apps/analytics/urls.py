@@ -2,6 +2,7 @@ from django.urls import path
 from .views import (
     StudentProgressView,
     AccuracyTrendAPIView,
+    ProgressHistoryAPIView,
 )
 
 app_name = "analytics"
@@ -12,4 +13,5 @@ urlpatterns = [
 
     # API (powers student progress charts)
     path("api/accuracy-trend/", AccuracyTrendAPIView.as_view(), name="api-accuracy-trend"),
+    path("api/progress-history/", ProgressHistoryAPIView.as_view(), name="api-progress-history"),
 ]
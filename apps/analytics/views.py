@@ -1,12 +1,28 @@
 from django.views.generic import TemplateView
 from django.http import JsonResponse
 from django.contrib.auth import get_user_model
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 
 from apps.accounts.mixins import StudentRequiredMixin
-from .metrics import StudentMetrics
+from .metrics_cache import CachedStudentMetrics, metrics_etag
 
 User = get_user_model()
 
+
+def _request_etag(request, *args, **kwargs):
+    """The student's metrics version plus the query (it selects the window)."""
+    return metrics_etag(request.user.pk, request.GET.urlencode())
+
+
+# Conditional GET for the JSON APIs: a matching If-None-Match gets a 304
+# before the view runs. Browsers must revalidate, but only privately.
+metrics_api = [
+    cache_control(private=True, no_cache=True),
+    condition(etag_func=_request_etag),
+]
+
 # NOTE: System/admin analytics views (admin dashboard, tag heatmap, KD coverage,
 # student history, CSV exports) were removed in U0. Those functions move to
 # Django Admin (/admin/) in U1. Only student-facing progress remains here.
@@ -21,7 +37,7 @@ class StudentProgressView(StudentRequiredMixin, TemplateView):
         student = self.request.user
 
         if student and student.role == User.Role.STUDENT:
-            metrics = StudentMetrics(student)
+            metrics = CachedStudentMetrics(student)
             context['student'] = student
             context['total_attempts'] = metrics.get_total_attempts()
             context['accuracy'] = metrics.get_accuracy()
@@ -31,23 +47,53 @@ class StudentProgressView(StudentRequiredMixin, TemplateView):
             context['strengths'] = metrics.get_strengths()
             context['weaknesses'] = metrics.get_weaknesses()
             context['accuracy_trend'] = metrics.get_accuracy_trend()
+            context['progress_history'] = metrics.get_progress_history()
 
         return context
 
 
+@method_decorator(metrics_api, name='get')
 class AccuracyTrendAPIView(StudentRequiredMixin, TemplateView):
     """Return accuracy trend data as JSON for charts."""
 
+    MAX_DAYS = 366
+
     def get(self, request, *args, **kwargs):
         student = request.user
         if not student or student.role != User.Role.STUDENT:
             return JsonResponse({'error': 'No student profile'}, status=400)
 
-        days = int(request.GET.get('days', 30))
-        metrics = StudentMetrics(student)
+        try:
+            days = int(request.GET.get('days', 30))
+        except ValueError:
+            days = 30
+        days = max(1, min(days, self.MAX_DAYS))
+        metrics = CachedStudentMetrics(student)
         data = metrics.get_accuracy_trend(days=days)
 
         return JsonResponse({
             'labels': [d['date'] for d in data],
             'values': [d['accuracy'] for d in data],
         })
+
+
+@method_decorator(metrics_api, name='get')
+class ProgressHistoryAPIView(StudentRequiredMixin, TemplateView):
+    """Return weekly progress snapshots as JSON for charts."""
+
+    MAX_WEEKS = 104
+
+    def get(self, request, *args, **kwargs):
+        try:
+            weeks = int(request.GET.get('weeks', 12))
+        except ValueError:
+            weeks = 12
+        weeks = max(1, min(weeks, self.MAX_WEEKS))
+
+        data = CachedStudentMetrics(request.user).get_progress_history(weeks=weeks)
+
+        return JsonResponse({
+            'labels': [d['week'] for d in data],
+            'values': [d['accuracy'] for d in data],
+            'points': [d['points'] for d in data],
+        })
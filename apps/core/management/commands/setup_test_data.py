@@ -7,6 +7,8 @@ from apps.accounts.models import ParentStudent
 from apps.subjects.models import Subject, Topic
 from apps.questions.models import Question, Tag, KompetensiDasar
 from apps.quizzes.models import Quiz, QuizSession
+from apps.analytics.mastery import rebuild_mastery
+from apps.analytics.rollups import rebuild_daily_activity
 from apps.analytics.models import Attempt
 
 User = get_user_model()
@@ -37,6 +39,11 @@ class Command(BaseCommand):
         self.stdout.write('Creating Quizzes & Analytics...')
         self.create_quizzes_and_history()
 
+        # History is written directly, so derive the mastery and daily
+        # activity tables from it
+        rebuild_mastery()
+        rebuild_daily_activity()
+
         self.stdout.write(self.style.SUCCESS('Successfully populated database!'))
 
     def create_users(self):
@@ -186,17 +193,19 @@ class Command(BaseCommand):
                     completed_at=timezone.now() - timedelta(days=random.randint(1, 7)) + timedelta(minutes=25)
                 )
                 
-                # Create Attempts for this session
+                # Fill in the Attempts pre-generated for this session
                 for q in questions:
                     is_correct = True if passed else random.choice([True, False])
-                    Attempt.objects.create(
+                    Attempt.objects.update_or_create(
                         quiz_session=session,
                         student=student,
                         question=q,
-                        answer_given=q.answer_key if is_correct else 'B',
-                        is_correct=is_correct,
-                        points_earned=q.points if is_correct else 0,
-                        time_taken=random.randint(30, 120)
+                        defaults={
+                            'answer_given': q.answer_key if is_correct else 'B',
+                            'is_correct': is_correct,
+                            'points_earned': q.points if is_correct else 0,
+                            'time_taken': random.randint(30, 120),
+                        }
                     )
 
         # Create Active Proxy Quiz Session (In Progress)
@@ -1,13 +1,12 @@
-import json
-
 from django.contrib import admin, messages
 from django.shortcuts import redirect, render
 from django.urls import path
 from django.utils.html import format_html
 
 from .forms import QuestionImportForm
-from .models import Question, Tag, KompetensiDasar
-from .services import import_questions_from_json
+from .models import ImportBatch, Question, Tag, KompetensiDasar
+from .importing import import_question_stream, rollback_batch, validate_question_stream
+from .search import search_questions
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
@@ -30,17 +29,49 @@ class KDAdmin(admin.ModelAdmin):
         return (obj.description[:75] + '...') if len(obj.description) > 75 else obj.description
     short_desc.short_description = "Description"
 
+@admin.register(ImportBatch)
+class ImportBatchAdmin(admin.ModelAdmin):
+    list_display = ('id', 'source_name', 'status', 'rows_total', 'rows_created', 'rows_failed', 'duration', 'created_by', 'started_at')
+    list_filter = ('status', 'started_at')
+    search_fields = ('source_name', 'file_hash')
+    readonly_fields = [field.name for field in ImportBatch._meta.fields]
+    actions = ['rollback_batches']
+
+    def has_add_permission(self, request):
+        return False
+
+    def rollback_batches(self, request, queryset):
+        for batch in queryset:
+            try:
+                deleted = rollback_batch(batch)
+            except ValueError as e:
+                messages.error(request, str(e))
+            else:
+                messages.success(request, f"Batch #{batch.pk}: deleted {deleted} questions.")
+    rollback_batches.short_description = "Roll back selected imports"
+
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
     list_display = ('id', 'short_text', 'question_type', 'difficulty', 'subject_display', 'topic_display', 'points', 'created_at')
     list_filter = ('question_type', 'difficulty', 'topic__subject__grade', 'topic__subject', 'has_math', 'has_image', 'created_at')
-    search_fields = ('question_text', 'topic__name', 'topic__subject__name', 'answer_key')
+    # Searched through the full-text index, see get_search_results
+    search_fields = ('question_text', 'explanation', 'topic__name', 'topic__subject__name')
+    search_help_text = "Matches question text, explanation, topic and subject; a number also matches the ID."
     filter_horizontal = ('tags', 'kompetensi_dasar')
     autocomplete_fields = ['topic']
-    readonly_fields = ('created_by', 'created_at', 'updated_at', 'question_preview')
+    readonly_fields = ('created_by', 'import_batch', 'created_at', 'updated_at', 'question_preview')
     list_per_page = 25
     change_list_template = "admin/questions/question_changelist.html"
 
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        results = search_questions(queryset, search_term)
+        if search_term.isdigit():
+            results = results | queryset.filter(pk=int(search_term))
+        return results, False
+
     def get_urls(self):
         urls = super().get_urls()
         custom = [
@@ -56,14 +87,28 @@ class QuestionAdmin(admin.ModelAdmin):
         if request.method == "POST":
             form = QuestionImportForm(request.POST, request.FILES)
             if form.is_valid():
+                upload = request.FILES["file"]
+                if form.cleaned_data["dry_run"]:
+                    return self.import_report_view(request, form, upload)
+                # Parsed as it is read, so large banks never sit in memory
                 try:
-                    data = json.load(request.FILES["file"])
-                except json.JSONDecodeError:
-                    messages.error(request, "File is not valid JSON.")
+                    # In-process validation: no process pool inside a web worker
+                    batch, skipped = import_question_stream(
+                        upload, upload.name, user=request.user, workers=1
+                    )
+                except ValueError as e:
+                    # Raised by the validation pass, before anything is written
+                    messages.error(request, f"File is not valid JSON ({e}); nothing was imported.")
+                    return redirect("admin:questions_question_changelist")
+                if skipped:
+                    messages.warning(
+                        request,
+                        f"This file was already imported as batch #{batch.pk}; skipped.",
+                    )
                     return redirect("admin:questions_question_changelist")
-                count, errors = import_questions_from_json(data, user=request.user)
+                count, errors = batch.rows_created, batch.errors
                 if count:
-                    messages.success(request, f"Imported {count} questions.")
+                    messages.success(request, f"Imported {count} questions (batch #{batch.pk}).")
                 for err in errors[:20]:
                     messages.warning(request, err)
                 if not count and not errors:
@@ -79,6 +124,25 @@ class QuestionAdmin(admin.ModelAdmin):
         }
         return render(request, "admin/questions/question_import.html", context)
 
+    def import_report_view(self, request, form, upload):
+        """Validate an upload without saving and summarise what would happen."""
+        try:
+            report, duplicate = validate_question_stream(upload, upload.name, workers=1)
+        except ValueError as e:
+            messages.error(request, f"File is not valid JSON ({e}).")
+            return redirect("admin:questions_question_import_json")
+        context = {
+            **self.admin_site.each_context(request),
+            "form": form,
+            "report": report,
+            "errors": report.messages[:200],
+            "duplicate": duplicate,
+            "file_name": upload.name,
+            "title": "Import Questions (JSON): dry run",
+            "opts": self.model._meta,
+        }
+        return render(request, "admin/questions/question_import_report.html", context)
+
     fieldsets = (
         ('Content', {
             'fields': ('topic', 'question_text', 'question_type', 'difficulty', 'points')
@@ -94,7 +158,7 @@ class QuestionAdmin(admin.ModelAdmin):
             'fields': ('tags', 'kompetensi_dasar', 'estimated_time', 'order')
         }),
         ('Audit', {
-            'fields': ('created_by', 'created_at', 'updated_at', 'question_preview'),
+            'fields': ('created_by', 'import_batch', 'created_at', 'updated_at', 'question_preview'),
             'classes': ('collapse',)
         })
     )
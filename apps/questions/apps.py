@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class QuestionsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.questions"
+
+    def ready(self):
+        from apps.questions import signals  # noqa: F401
@@ -82,6 +82,12 @@ class QuestionForm(forms.ModelForm):
 class QuestionImportForm(forms.Form):
     file = forms.FileField(
         label="JSON File", 
-        help_text="Upload .json file containing list of questions.",
+        help_text="Upload a .json file containing a list of questions, or a .jsonl file with one question per line.",
         widget=forms.FileInput(attrs={'class': 'block w-full text-sm text-gray-900 border border-gray-300 rounded-lg cursor-pointer bg-gray-50 dark:text-gray-400 focus:outline-none dark:bg-gray-700 dark:border-gray-600 dark:placeholder-gray-400'})
     )
+    dry_run = forms.BooleanField(
+        label="Dry run",
+        required=False,
+        initial=True,
+        help_text="Only validate the file and show a summary; nothing is saved.",
+    )
@@ -0,0 +1,615 @@
+"""
+Bulk question import engine.
+
+Rows use the JSON upload format (grade, subject, topic, text, answer, ...).
+Each chunk of rows is validated in memory, its subjects, topics and tags are
+resolved through lookup maps that persist across chunks, and the questions
+and tag links are written with bulk_create in one transaction per chunk.
+
+bulk_create skips model signals, so the question ID pools are invalidated
+once at the end instead of per row (see sampling.py), and search documents
+(search.py) are written alongside the questions in the same transaction. New questions are not
+in any quiz yet, so quiz totals need no refresh.
+
+Files are read incrementally (iter_json_array / iter_json_lines), so memory
+stays flat however large the bank is. Files are validated in full first
+(validate_rows; only the import_questions command spreads big files over
+worker processes), so the error report exists before anything is written
+and the write pass only builds rows that passed. A file import is recorded
+as an ImportBatch whose row offset is committed together with each chunk, so a
+crashed run can resume, an identical file is skipped by hash, and
+rollback_batch removes everything the batch created.
+"""
+import codecs
+import hashlib
+import io
+import json
+import os
+import multiprocessing
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from apps.questions.models import ImportBatch, Question, QuestionSearchIndex, Tag
+from apps.questions.sampling import invalidate_question_pools
+from apps.questions.search import question_document
+from apps.questions.validation import ImportRowError, clean_row, validate_chunk
+from apps.subjects.models import Subject, Topic
+
+DEFAULT_CHUNK_SIZE = 500
+# Rows per validation task sent to a worker process
+VALIDATION_CHUNK_SIZE = 1000
+QUESTION_TYPES = tuple(Question.Type.values)
+DIFFICULTIES = tuple(Question.Difficulty.values)
+
+READ_BUFFER_SIZE = 64 * 1024
+# A single row larger than this means a broken file, not a big question
+MAX_ROW_SIZE = 16 * 1024 * 1024
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+
+
+def chunked(rows, size):
+    """Yield lists of up to `size` items from any iterable."""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class QuestionImporter:
+    """
+    Import question rows in chunks.
+
+    Errors are collected per row in the same "Row N: ..." format as before;
+    a bad row never stops the rest of the file.
+
+    Given a `batch`, questions are stamped with it and the batch counters
+    and error list are saved in the same transaction as each chunk.
+
+    Usage:
+        importer = QuestionImporter(user=request.user)
+        created, errors = importer.run(rows)
+    """
+
+    def __init__(self, user=None, chunk_size=DEFAULT_CHUNK_SIZE, batch=None):
+        self.user = user
+        self.chunk_size = chunk_size
+        self.batch = batch
+        self.created = 0
+        self.errors = []
+        self.rows = 0
+        self.elapsed = 0.0
+        # (grade, lowercased name) -> Subject
+        self._subjects = {}
+        # subject_id -> name, for search documents
+        self._subject_names = {}
+        self._loaded_grades = set()
+        # (subject_id, lowercased name) -> Topic
+        self._topics = {}
+        self._loaded_subjects = set()
+        # name -> Tag
+        self._tags = {}
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def run(self, rows, start=0, rejected=None):
+        """
+        Import an iterable of rows; `start` is the 0-based index of the first
+        row, so error messages keep file row numbers when resuming.
+        `rejected` maps row indexes that failed pre-validation to their
+        messages; those rows are reported and never built.
+
+        Returns (created_count, errors_list).
+        """
+        began = time.monotonic()
+        try:
+            for chunk in chunked(rows, self.chunk_size):
+                chunk_began = time.monotonic()
+                with transaction.atomic():
+                    reported = len(self.errors)
+                    created = self.import_chunk(chunk, start, rejected)
+                    if self.batch:
+                        self._record_chunk(
+                            len(chunk), created, self.errors[reported:],
+                            time.monotonic() - chunk_began,
+                        )
+                start += len(chunk)
+        finally:
+            self.elapsed += time.monotonic() - began
+            if self.created:
+                invalidate_question_pools()
+        return self.created, self.errors
+
+    def import_chunk(self, chunk, start=0, rejected=None):
+        """Validate and write one chunk; returns the number of questions created."""
+        self.rows += len(chunk)
+        errors = []
+        pending = []
+        self._load_subjects(chunk)
+        for index, item in enumerate(chunk, start=start):
+            if rejected and index in rejected:
+                errors.append((index, rejected[index]))
+                continue
+            try:
+                pending.append((index, *self._build(index, item)))
+            except ImportRowError as e:
+                errors.append((index, str(e)))
+            except Exception as e:
+                errors.append((index, f"Row {index+1}: Error - {str(e)}"))
+
+        created = 0
+        if pending:
+            self._resolve_topics(pending)
+            self._resolve_tags(pending)
+            try:
+                with transaction.atomic():
+                    created = self._write(pending)
+            except DatabaseError:
+                # Something only the database rejects; find the rows row by row
+                for row in pending:
+                    row[1].pk = None
+                    try:
+                        with transaction.atomic():
+                            created += self._write([row])
+                    except DatabaseError as e:
+                        errors.append((row[0], f"Row {row[0]+1}: Error - {str(e)}"))
+
+        self.created += created
+        self.errors.extend(message for _, message in sorted(errors, key=lambda e: e[0]))
+        return created
+
+    def _record_chunk(self, rows, created, errors, elapsed):
+        batch = self.batch
+        batch.rows_total += rows
+        batch.rows_created += created
+        batch.rows_failed += len(errors)
+        batch.errors.extend(errors)
+        batch.duration += elapsed
+        batch.save(update_fields=[
+            "rows_total", "rows_created", "rows_failed", "errors", "duration",
+        ])
+
+    def _build(self, index, item):
+        """Validate a row; returns (question, topic_key, topic_name, tag_names)."""
+        # Subjects must already exist; topics are created when missing
+        row = clean_row(index, item, QUESTION_TYPES, DIFFICULTIES, self._subjects)
+        subject = self._subjects[row["subject_key"]]
+
+        question = Question(
+            question_text=row["text"],
+            question_type=row["type"],
+            difficulty=row["difficulty"],
+            options=row["options"],
+            answer_key=row["answer"],
+            explanation=row["explanation"],
+            created_by=self.user,
+            import_batch=self.batch,
+            points=row["points"],
+            estimated_time=row["estimated_time"],
+        )
+        # Same checks Question.save() runs (bulk_create does not call save)
+        question.clean()
+
+        topic_name = row["topic"]
+        return question, (subject.pk, topic_name.lower()), topic_name, row["tags"]
+
+    def _load_subjects(self, chunk):
+        grades = {
+            _as_int(item.get("grade")) for item in chunk if isinstance(item, dict)
+        } - self._loaded_grades - {None}
+        if not grades:
+            return
+        # Model ordering, so the first match wins like .first() did
+        for subject in Subject.objects.filter(grade__in=grades):
+            self._subjects.setdefault((subject.grade, subject.name.lower()), subject)
+            self._subject_names[subject.pk] = subject.name
+        self._loaded_grades |= grades
+
+    def _resolve_topics(self, pending):
+        subject_ids = {key[0] for _, _, key, _, _ in pending} - self._loaded_subjects
+        if subject_ids:
+            for topic in Topic.objects.filter(subject_id__in=subject_ids):
+                self._topics.setdefault((topic.subject_id, topic.name.lower()), topic)
+            self._loaded_subjects |= subject_ids
+
+        missing = {}
+        for _, _, key, name, _ in pending:
+            if key not in self._topics and key not in missing:
+                missing[key] = Topic(
+                    subject_id=key[0], name=name,
+                    description=f"Imported topic {name}",
+                )
+        if missing:
+            Topic.objects.bulk_create(missing.values())
+            self._topics.update(missing)
+
+        for _, question, key, _, _ in pending:
+            question.topic = self._topics[key]
+
+    def _resolve_tags(self, pending):
+        names = {name for *_, tags in pending for name in tags} - set(self._tags)
+        if not names:
+            return
+        for tag in Tag.objects.filter(name__in=names):
+            self._tags[tag.name] = tag
+        missing = names - set(self._tags)
+        if missing:
+            # ignore_conflicts does not set primary keys, so read them back
+            Tag.objects.bulk_create([Tag(name=name) for name in missing], ignore_conflicts=True)
+            for tag in Tag.objects.filter(name__in=missing):
+                self._tags[tag.name] = tag
+
+    def _write(self, pending):
+        questions = Question.objects.bulk_create([row[1] for row in pending])
+        Through = Question.tags.through
+        Through.objects.bulk_create(
+            [
+                Through(question_id=question.pk, tag_id=self._tags[name].pk)
+                for question, (*_, tags) in zip(questions, pending)
+                for name in tags
+            ],
+            ignore_conflicts=True,
+        )
+        QuestionSearchIndex.objects.bulk_create([
+            QuestionSearchIndex(
+                question_id=question.pk,
+                document=question_document(
+                    question,
+                    question.topic.name,
+                    self._subject_names[question.topic.subject_id],
+                ),
+            )
+            for question in questions
+        ])
+        return len(questions)
+
+
+class _ArrayReader:
+    """Buffered reader that decodes one JSON value at a time."""
+
+    _non_space = re.compile(r"\S")
+
+    def __init__(self, fp, buffer_size):
+        self.fp = fp
+        self.buffer_size = buffer_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        data = self.fp.read(self.buffer_size)
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        self.eof = not data
+        return bool(data)
+
+    def peek(self):
+        """Next non-whitespace character, or "" at the end of the input."""
+        while True:
+            match = self._non_space.search(self.buf, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buf[self.pos]
+            self.pos = len(self.buf)
+            if not self._fill():
+                return ""
+
+    def decode(self):
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Usually a value cut off at the end of the buffer
+                if self.eof or len(self.buf) - self.pos > MAX_ROW_SIZE:
+                    raise
+                self._fill()
+                continue
+            if not self.eof and (
+                end == len(self.buf)
+                or isinstance(value, (int, float)) and self.buf[end] in "+-.0123456789eE"
+            ):
+                # A number cut off by the buffer ("2." of "2.5") may continue
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+
+def _text_stream(fp):
+    if isinstance(fp, io.TextIOBase):
+        return fp
+    return codecs.getreader("utf-8-sig")(fp)
+
+
+def iter_json_array(fp, buffer_size=READ_BUFFER_SIZE):
+    """
+    Yield the items of a top-level JSON array one at a time.
+
+    Only the current item and one read buffer are held in memory. Raises
+    ValueError (json.JSONDecodeError for syntax errors) when the input is not
+    a JSON array; items before the error have already been yielded.
+    """
+    reader = _ArrayReader(_text_stream(fp), buffer_size)
+    if reader.peek() != "[":
+        raise ValueError("JSON root must be a list of objects.")
+    reader.pos += 1
+    if reader.peek() == "]":
+        return
+    while True:
+        yield reader.decode()
+        char = reader.peek()
+        if char == ",":
+            reader.pos += 1
+            reader.peek()
+        elif char == "]":
+            return
+        else:
+            raise json.JSONDecodeError("Expecting ',' delimiter", reader.buf, reader.pos)
+
+
+def iter_json_lines(fp):
+    """Yield one row per non-blank line of a JSON Lines file."""
+    for line in _text_stream(fp):
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_question_rows(fp, jsonl=False):
+    """Rows of a question file, JSON array or JSON Lines."""
+    return iter_json_lines(fp) if jsonl else iter_json_array(fp)
+
+
+def is_jsonl(name):
+    return name.lower().endswith(JSONL_EXTENSIONS)
+
+
+class ValidationReport:
+    """Outcome of validating a whole file before anything is written."""
+
+    def __init__(self):
+        self.rows = 0
+        # row index -> "Row N: ..." message
+        self.errors = {}
+
+    @property
+    def valid(self):
+        return self.rows - len(self.errors)
+
+    @property
+    def messages(self):
+        return [self.errors[index] for index in sorted(self.errors)]
+
+
+def import_workers():
+    """Worker processes for command-line imports (QUESTION_IMPORT_WORKERS, 0 = CPUs)."""
+    return getattr(settings, "QUESTION_IMPORT_WORKERS", 0) or os.cpu_count() or 1
+
+
+def _validated_chunks(tasks, workers):
+    """
+    Run validate_chunk over (start, rows) tasks, yielding results in order.
+
+    A file of a single chunk is validated in-process; otherwise chunks go to
+    a process pool with a bounded number in flight, so memory stays flat.
+    """
+    tasks = iter(tasks)
+    head = list(islice(tasks, 2))
+    if workers <= 1 or len(head) < 2:
+        for start, rows, *context in chain(head, tasks):
+            yield validate_chunk(start, rows, *context)
+        return
+
+    # spawn: workers never inherit the parent's database connections
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        in_flight = deque()
+        for task in chain(head, tasks):
+            in_flight.append(pool.submit(validate_chunk, *task))
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def validate_rows(rows, workers=1, chunk_size=VALIDATION_CHUNK_SIZE):
+    """
+    Check every row (schema, option counts, answer keys, enums, subjects)
+    without writing anything.
+
+    Args:
+        rows: iterable of parsed rows (e.g. iter_question_rows(fp))
+        workers: worker processes; 1 (the default) validates in-process.
+            Only the import_questions command fans out (see import_workers);
+            web requests must not start process pools.
+
+    Returns a ValidationReport.
+    """
+    subjects = frozenset(
+        (grade, name.lower())
+        for grade, name in Subject.objects.values_list("grade", "name")
+    )
+    report = ValidationReport()
+
+    def tasks():
+        start = 0
+        for chunk in chunked(rows, chunk_size):
+            report.rows += len(chunk)
+            yield start, chunk, QUESTION_TYPES, DIFFICULTIES, subjects
+            start += len(chunk)
+
+    for errors in _validated_chunks(tasks(), workers):
+        report.errors.update(errors)
+    return report
+
+
+def validate_question_stream(fp, source_name, workers=1):
+    """
+    Dry run of import_question_stream: the validation report for a binary
+    file object, plus the completed batch of an identical file, if any.
+
+    Returns (report, duplicate_batch).
+    """
+    duplicate = ImportBatch.objects.filter(
+        file_hash=hash_stream(fp), status=ImportBatch.Status.COMPLETED
+    ).first()
+    report = validate_rows(iter_question_rows(fp, jsonl=is_jsonl(source_name)), workers)
+    return report, duplicate
+
+
+def hash_stream(fp):
+    """SHA-256 hex digest of a binary file object, read in blocks; rewinds it."""
+    digest = hashlib.sha256()
+    for block in iter(lambda: fp.read(READ_BUFFER_SIZE), b""):
+        digest.update(block)
+    fp.seek(0)
+    return digest.hexdigest()
+
+
+def import_question_stream(fp, source_name, user=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                           resume=False, workers=1):
+    """
+    Import a binary .json (array) or .jsonl file object as an ImportBatch.
+
+    A file whose SHA-256 matches a completed batch is not read again; that
+    batch is returned with skipped=True. Otherwise the whole file is
+    validated first (a JSON syntax error raises before any write) and then
+    read again to write the rows that passed. With `resume=True` an
+    interrupted batch of the same file continues after its last committed
+    chunk.
+
+    Returns (batch, skipped).
+    """
+    file_hash = hash_stream(fp)
+    earlier = ImportBatch.objects.filter(file_hash=file_hash).exclude(
+        status=ImportBatch.Status.ROLLED_BACK
+    )
+    done = earlier.filter(status=ImportBatch.Status.COMPLETED).first()
+    if done:
+        return done, True
+
+    jsonl = is_jsonl(source_name)
+    report = validate_rows(iter_question_rows(fp, jsonl=jsonl), workers)
+    fp.seek(0)
+
+    batch = resume and earlier.filter(
+        status__in=[ImportBatch.Status.RUNNING, ImportBatch.Status.FAILED]
+    ).first()
+    if batch:
+        batch.status = ImportBatch.Status.RUNNING
+        batch.finished_at = None
+        batch.save(update_fields=["status", "finished_at"])
+    else:
+        batch = ImportBatch.objects.create(
+            source_name=source_name, file_hash=file_hash, created_by=user
+        )
+
+    start = batch.rows_total
+    importer = QuestionImporter(user=user, chunk_size=chunk_size, batch=batch)
+    rows = islice(iter_question_rows(fp, jsonl=jsonl), start, None)
+    try:
+        importer.run(rows, start=start, rejected=report.errors)
+    except Exception as e:
+        # Counters as committed, not as left by the rolled back chunk
+        batch.refresh_from_db()
+        batch.errors.append(f"Import stopped after row {batch.rows_total}: {e}")
+        _finish(batch, ImportBatch.Status.FAILED)
+        raise
+    _finish(batch, ImportBatch.Status.COMPLETED)
+    return batch, False
+
+
+def import_question_file(path, user=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                         resume=False, workers=1):
+    """Import a question file from disk; see import_question_stream."""
+    with open(path, "rb") as f:
+        return import_question_stream(
+            f, os.path.basename(path), user=user, chunk_size=chunk_size,
+            resume=resume, workers=workers,
+        )
+
+
+def _finish(batch, status):
+    batch.status = status
+    batch.finished_at = timezone.now()
+    batch.save(update_fields=["status", "finished_at", "errors"])
+
+
+def rollback_batch(batch):
+    """
+    Delete every question created by `batch` in set-based statements.
+
+    Refused (ValueError) once students have answered any of them, since
+    their attempts and mastery would go too. Topics and tags created by the
+    import are kept; other questions may use them by now.
+
+    A queryset delete() would collect every question and send its delete
+    signals one by one (see the receivers in questions/ and quizzes/
+    signals.py). Instead each table referencing the questions is cleared
+    with one statement and the signals' effects (quiz and session totals,
+    ID pools, session payloads) are applied once, so the cost does not
+    grow with the batch size.
+
+    Returns the number of questions deleted.
+    """
+    from apps.analytics.models import Attempt
+    from apps.quizzes.models import Quiz, QuizSession
+    from apps.quizzes.payload import invalidate_session_payload
+
+    if batch.status == ImportBatch.Status.ROLLED_BACK:
+        return 0
+
+    with transaction.atomic():
+        if Attempt.objects.filter(question__import_batch=batch).exists():
+            raise ValueError(
+                f"Batch #{batch.pk} cannot be rolled back: students have already "
+                f"answered some of its questions."
+            )
+        quiz_links = Quiz.questions.through.objects.filter(question__import_batch=batch)
+        session_links = QuizSession.session_questions.through.objects.filter(
+            question__import_batch=batch
+        )
+        quiz_ids = set(quiz_links.values_list("quiz_id", flat=True))
+        session_ids = set(session_links.values_list("quizsession_id", flat=True))
+        # Every relation to Question (attempts are excluded above); none has
+        # signals or dependents, so each delete() is a single statement
+        for links in (
+            quiz_links,
+            session_links,
+            Question.tags.through.objects.filter(question__import_batch=batch),
+            Question.kompetensi_dasar.through.objects.filter(question__import_batch=batch),
+            QuestionSearchIndex.objects.filter(question__import_batch=batch),
+        ):
+            links.delete()
+
+        # Nothing references the questions any more
+        questions = Question.objects.filter(import_batch=batch)
+        deleted = questions._raw_delete(questions.db)
+
+        Quiz.refresh_totals(quiz_ids)
+        QuizSession.refresh_totals(session_ids)
+        batch.status = ImportBatch.Status.ROLLED_BACK
+        batch.rolled_back_at = timezone.now()
+        batch.save(update_fields=["status", "rolled_back_at"])
+
+    invalidate_question_pools()
+    if session_ids:
+        invalidate_session_payload(*session_ids)
+    return deleted
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -1,17 +1,35 @@
 from django.core.management.base import BaseCommand, CommandError
 import json
 import os
-from apps.questions.services import import_questions_from_json
+from apps.questions.importing import (
+    DEFAULT_CHUNK_SIZE, import_question_file, import_workers, validate_question_stream,
+)
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
 class Command(BaseCommand):
-    help = "Import questions from a JSON file"
+    help = "Import questions from a JSON (array) or JSON Lines file, streamed in chunks"
 
     def add_arguments(self, parser):
-        parser.add_argument('file_path', type=str, help='Path to the JSON file')
+        parser.add_argument('file_path', type=str, help='Path to the .json or .jsonl file')
         parser.add_argument('--username', type=str, help='Username to assign as creator (optional)')
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Questions written per bulk insert/transaction'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Continue an interrupted import of the same file after its last committed chunk'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only validate the file and report errors; nothing is saved'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Processes used to validate the file (default: QUESTION_IMPORT_WORKERS)'
+        )
 
     def handle(self, *args, **options):
         file_path = options['file_path']
@@ -32,25 +50,60 @@ class Command(BaseCommand):
             if not user:
                  self.stdout.write(self.style.WARNING("No user assigned (no superuser found)."))
 
+        workers = options['workers'] or import_workers()
+        if options['dry_run']:
+            return self.dry_run(file_path, workers)
+
+        self.stdout.write(f"Importing questions from {file_path}...")
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            self.stdout.write(f"Importing questions from {file_path}...")
-            count, errors = import_questions_from_json(data, user=user)
-
-            if count > 0:
-                self.stdout.write(self.style.SUCCESS(f"Successfully imported {count} questions."))
-            
-            if errors:
-                self.stdout.write(self.style.WARNING(f"Encountered {len(errors)} errors:"))
-                for err in errors:
-                    self.stdout.write(self.style.ERROR(f"- {err}"))
-            
-            if count == 0 and not errors:
-                 self.stdout.write(self.style.WARNING("No questions imported."))
-
-        except json.JSONDecodeError:
-            raise CommandError(f'File "{file_path}" is not valid JSON')
+            batch, skipped = import_question_file(
+                file_path, user=user, chunk_size=options['chunk_size'],
+                resume=options['resume'], workers=workers,
+            )
+        except json.JSONDecodeError as e:
+            raise CommandError(f'File "{file_path}" is not valid JSON ({e}); nothing was imported')
         except Exception as e:
             raise CommandError(f'Error importing: {str(e)}')
+
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f"Identical file already imported as batch #{batch.pk} "
+                f"on {batch.started_at:%Y-%m-%d %H:%M}; skipped."
+            ))
+            return
+
+        count, errors = batch.rows_created, batch.errors
+        if count > 0:
+            self.stdout.write(self.style.SUCCESS(
+                f"Successfully imported {count} questions as batch #{batch.pk} "
+                f"({batch.rows_per_second:.0f} rows/s)."
+            ))
+        
+        if errors:
+            self.stdout.write(self.style.WARNING(f"Encountered {len(errors)} errors:"))
+            for err in errors:
+                self.stdout.write(self.style.ERROR(f"- {err}"))
+        
+        if count == 0 and not errors:
+             self.stdout.write(self.style.WARNING("No questions imported."))
+
+    def dry_run(self, file_path, workers):
+        self.stdout.write(f"Validating {file_path} (dry run)...")
+        try:
+            with open(file_path, 'rb') as f:
+                report, duplicate = validate_question_stream(
+                    f, os.path.basename(file_path), workers=workers
+                )
+        except ValueError as e:
+            raise CommandError(f'File "{file_path}" is not valid JSON ({e})')
+
+        if duplicate:
+            self.stdout.write(self.style.WARNING(
+                f"Identical file already imported as batch #{duplicate.pk}."
+            ))
+        for err in report.messages:
+            self.stdout.write(self.style.ERROR(f"- {err}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"{report.rows} rows: {report.valid} valid, {len(report.errors)} with errors. "
+            f"Nothing was saved."
+        ))
@@ -0,0 +1,22 @@
+"""
+Management command to rewrite the full-text search document of every
+question (see questions/search.py), e.g. after changing the analyzer or
+after loading data with signals disabled.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.questions.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the question full-text search index"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Questions indexed per query (default 1000)',
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_search_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} questions."))
@@ -0,0 +1,30 @@
+"""
+Management command to undo a question import: deletes every question
+created by one ImportBatch (see importing.rollback_batch).
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.questions.importing import rollback_batch
+from apps.questions.models import ImportBatch
+
+
+class Command(BaseCommand):
+    help = "Roll back a question import batch"
+
+    def add_arguments(self, parser):
+        parser.add_argument('batch_id', type=int, help='ImportBatch id')
+
+    def handle(self, *args, **options):
+        try:
+            batch = ImportBatch.objects.get(pk=options['batch_id'])
+        except ImportBatch.DoesNotExist:
+            raise CommandError(f'Import batch {options["batch_id"]} does not exist')
+
+        try:
+            deleted = rollback_batch(batch)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled back batch #{batch.pk}: deleted {deleted} questions."
+        ))
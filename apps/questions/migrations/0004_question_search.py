@@ -0,0 +1,174 @@
+# Generated by Django 5.0.14 on 2026-10-17 12:51
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of the analyzer in apps/questions/search.py as of this
+# migration, so later changes there cannot alter this backfill. Documents
+# written with an older analyzer are refreshed by rebuild_search_index.
+STOPWORDS = frozenset("""
+    ada adalah agar akan antara apa apakah atau bagaimana bahwa banyak
+    begitu berapa bila bisa dalam dan dapat dari dengan di dia hanya harus
+    ini itu jadi jika juga kami kamu ke kepada ketika kita lagi lain
+    maka mana masih mereka oleh pada para saat saja sangat sebagai sebuah
+    sedang sejak seperti setelah sudah supaya tentang tersebut tetapi
+    tidak untuk yaitu yakni yang
+""".split())
+PARTICLES = ("kah", "lah", "tah", "pun")
+POSSESSIVES = ("nya", "ku", "mu")
+PREFIXES = ("meng", "meny", "men", "mem", "me", "peng", "peny", "pen", "pem",
+            "di", "ter", "ke")
+SECOND_PREFIXES = ("ber", "bel", "be", "per", "pel", "pe")
+SUFFIXES = ("kan", "an", "i")
+MIN_STEM = 4
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def _strip(word, affixes, suffix=True):
+    for affix in affixes:
+        if suffix and word.endswith(affix) and len(word) - len(affix) >= MIN_STEM:
+            return word[:-len(affix)], True
+        if not suffix and word.startswith(affix) and len(word) - len(affix) >= MIN_STEM:
+            return word[len(affix):], True
+    return word, False
+
+
+def stem(word):
+    if word.isdigit() or len(word) <= MIN_STEM:
+        return word
+    word, _ = _strip(word, PARTICLES)
+    word, _ = _strip(word, POSSESSIVES)
+    if word in STOPWORDS:
+        return ""
+    for prefix in ("meny", "peny"):
+        if word.startswith(prefix) and len(word) - len(prefix) >= MIN_STEM - 1:
+            word = "s" + word[len(prefix):]
+            break
+    else:
+        word, stripped = _strip(word, PREFIXES, suffix=False)
+        if not stripped:
+            word, _ = _strip(word, SECOND_PREFIXES, suffix=False)
+    word, _ = _strip(word, SUFFIXES)
+    return word
+
+
+def build_document(*texts):
+    terms = []
+    for text in texts:
+        if not text:
+            continue
+        text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode()
+        for word in WORD.findall(text.lower()):
+            if word in STOPWORDS:
+                continue
+            root = stem(word)
+            if root:
+                terms.append(root)
+                if root != word:
+                    terms.append(word)
+    return " ".join(terms)
+
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE question_search ADD COLUMN vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', document)) STORED",
+    "CREATE INDEX question_search_vector_idx ON question_search USING GIN (vector)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS question_search_vector_idx",
+    "ALTER TABLE question_search DROP COLUMN IF EXISTS vector",
+]
+# A standalone FTS5 table whose rowid is the question id, kept in step with
+# question_search by triggers.
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE question_search_fts USING fts5(document)",
+    "CREATE TRIGGER question_search_ai AFTER INSERT ON question_search BEGIN "
+    "INSERT INTO question_search_fts(rowid, document) VALUES (new.question_id, new.document); "
+    "END",
+    "CREATE TRIGGER question_search_ad AFTER DELETE ON question_search BEGIN "
+    "DELETE FROM question_search_fts WHERE rowid = old.question_id; "
+    "END",
+    "CREATE TRIGGER question_search_au AFTER UPDATE ON question_search BEGIN "
+    "DELETE FROM question_search_fts WHERE rowid = old.question_id; "
+    "INSERT INTO question_search_fts(rowid, document) VALUES (new.question_id, new.document); "
+    "END",
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS question_search_au",
+    "DROP TRIGGER IF EXISTS question_search_ad",
+    "DROP TRIGGER IF EXISTS question_search_ai",
+    "DROP TABLE IF EXISTS question_search_fts",
+]
+
+
+def _execute(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        _execute(schema_editor, POSTGRES_FORWARD)
+    elif vendor == "sqlite":
+        _execute(schema_editor, SQLITE_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        _execute(schema_editor, POSTGRES_REVERSE)
+    elif vendor == "sqlite":
+        _execute(schema_editor, SQLITE_REVERSE)
+
+
+def index_existing_questions(apps, schema_editor):
+    Question = apps.get_model("questions", "Question")
+    QuestionSearchIndex = apps.get_model("questions", "QuestionSearchIndex")
+    db = schema_editor.connection.alias
+    questions = Question.objects.using(db).values_list(
+        "pk", "question_text", "explanation", "topic__name", "topic__subject__name"
+    ).order_by("pk")
+    batch = []
+    for pk, *texts in questions.iterator(chunk_size=1000):
+        batch.append(QuestionSearchIndex(question_id=pk, document=build_document(*texts)))
+        if len(batch) == 1000:
+            QuestionSearchIndex.objects.using(db).bulk_create(batch)
+            batch = []
+    QuestionSearchIndex.objects.using(db).bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("questions", "0003_import_batches"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuestionSearchIndex",
+            fields=[
+                (
+                    "question",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_index",
+                        serialize=False,
+                        to="questions.question",
+                    ),
+                ),
+                ("document", models.TextField(blank=True)),
+            ],
+            options={
+                "verbose_name": "Question Search Index",
+                "verbose_name_plural": "Question Search Index",
+                "db_table": "question_search",
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(index_existing_questions, migrations.RunPython.noop),
+    ]
@@ -67,6 +67,60 @@ class Tag(models.Model):
         return self.name
 
 
+class ImportBatch(models.Model):
+    """
+    One run of the bulk question import (see importing.py).
+    
+    Every question it creates points back to the batch, so an upload can be
+    audited and rolled back as a whole. `file_hash` (SHA-256 of the source
+    file) lets an identical re-upload be recognised and skipped.
+    `rows_total` is also the resume offset: it is updated in the same
+    transaction as each chunk.
+    """
+    
+    class Status(models.TextChoices):
+        RUNNING = "running", _("Running")
+        COMPLETED = "completed", _("Completed")
+        FAILED = "failed", _("Failed")
+        ROLLED_BACK = "rolled_back", _("Rolled back")
+    
+    source_name = models.CharField(max_length=255)
+    file_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.RUNNING
+    )
+    
+    rows_total = models.PositiveIntegerField(default=0)
+    rows_created = models.PositiveIntegerField(default=0)
+    rows_failed = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="question_imports",
+    )
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration = models.FloatField(default=0, help_text=_("Time spent importing, in seconds"))
+    rolled_back_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "question_import_batches"
+        verbose_name = _("Import Batch")
+        verbose_name_plural = _("Import Batches")
+        ordering = ["-started_at"]
+
+    def __str__(self):
+        return f"#{self.pk} {self.source_name} ({self.get_status_display()})"
+
+    @property
+    def rows_per_second(self):
+        return self.rows_total / self.duration if self.duration else 0.0
+
+
 class Question(models.Model):
     class Type(models.TextChoices):
         PILGAN = "pilgan", _("Pilihan Ganda")
@@ -112,6 +166,13 @@ class Question(models.Model):
         null=True,
         related_name="created_questions",
     )
+    import_batch = models.ForeignKey(
+        ImportBatch,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="questions",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -154,3 +215,30 @@ class Question(models.Model):
     
     def get_subject(self):
         return self.topic.subject
+
+
+class QuestionSearchIndex(models.Model):
+    """
+    Full-text search document of a question (see search.py).
+    
+    `document` holds the analysed words of the question text, explanation,
+    topic and subject. The database-specific index over it (a tsvector
+    column on PostgreSQL, an FTS5 table on SQLite) is created by migration
+    0004_question_search rather than declared here.
+    """
+    
+    question = models.OneToOneField(
+        Question,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_index",
+    )
+    document = models.TextField(blank=True)
+
+    class Meta:
+        db_table = "question_search"
+        verbose_name = _("Question Search Index")
+        verbose_name_plural = _("Question Search Index")
+
+    def __str__(self):
+        return f"Search index for question #{self.question_id}"
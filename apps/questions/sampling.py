@@ -0,0 +1,94 @@
+"""
+Random question sampling for subject-based quizzes.
+
+Draws question IDs from a cached per-(subject, grade) ID pool so starting a
+quiz never loads full question rows (text, options, explanations) just to
+pick a random subset. Pools are invalidated by bumping a single version key
+whenever questions, topics or subjects change (see signals.py).
+
+A per-process cache (LocMem) only sees invalidations made in its own
+process, so a pool can still list deleted questions. Session bootstrap uses
+sample_live_question_ids, which checks the sample against the table.
+"""
+import random
+
+from django.core.cache import cache
+
+from apps.questions.models import Question
+
+POOL_VERSION_KEY = "question_pool:version"
+POOL_CACHE_TIMEOUT = 60 * 60  # 1 hour
+
+
+def _new_version():
+    # Random rather than incremented, so an evicted version key can never
+    # resurrect pools cached under an older generation.
+    return random.getrandbits(32)
+
+
+def _pool_version():
+    return cache.get_or_set(POOL_VERSION_KEY, _new_version, None)
+
+
+def _pool_cache_key(subject_id, grade):
+    return f"question_pool:v{_pool_version()}:{subject_id}:{grade}"
+
+
+def invalidate_question_pools():
+    """Drop every cached ID pool by moving to a new version."""
+    cache.set(POOL_VERSION_KEY, _new_version(), None)
+
+
+def get_question_id_pool(subject_id, grade):
+    """Return the list of question IDs for a subject and grade (cached)."""
+    key = _pool_cache_key(subject_id, grade)
+    pool = cache.get(key)
+    if pool is None:
+        pool = list(
+            Question.objects.filter(
+                topic__subject_id=subject_id,
+                topic__subject__grade=grade,
+            ).order_by("pk").values_list("pk", flat=True)
+        )
+        cache.set(key, pool, POOL_CACHE_TIMEOUT)
+    return pool
+
+
+def sample_question_ids(subject_id, grade, count, rng=None):
+    """
+    Uniformly sample up to `count` question IDs without loading rows.
+
+    Args:
+        subject_id: Subject primary key
+        grade: Grade number the subject belongs to
+        count: Number of IDs wanted (capped at the pool size)
+        rng: Optional random.Random instance (for reproducible tests)
+    """
+    pool = get_question_id_pool(subject_id, grade)
+    count = min(count, len(pool))
+    return (rng or random).sample(pool, count)
+
+
+def sample_live_question_ids(subject_id, grade, count, rng=None):
+    """
+    Like sample_question_ids, but only returns IDs that still exist.
+
+    Costs one extra ``pk__in`` query. When the cached pool turned out to be
+    stale, it is dropped and the missing IDs are topped up from a fresh one.
+    """
+    rng = rng or random
+    chosen = sample_question_ids(subject_id, grade, count, rng=rng)
+    live = set(Question.objects.filter(pk__in=chosen).values_list("pk", flat=True))
+    if len(live) == len(chosen):
+        return chosen
+
+    invalidate_question_pools()
+    kept = [pk for pk in chosen if pk in live]
+    others = [pk for pk in get_question_id_pool(subject_id, grade) if pk not in live]
+    return kept + rng.sample(others, min(count - len(kept), len(others)))
+
+
+def sample_questions(subject_id, grade, count, rng=None):
+    """Sample questions and fetch only the chosen rows."""
+    ids = sample_question_ids(subject_id, grade, count, rng=rng)
+    return Question.objects.filter(pk__in=ids)
@@ -0,0 +1,205 @@
+"""
+Full-text search over the question bank.
+
+Each question has a QuestionSearchIndex row whose `document` holds the
+analysed words of its text, explanation, topic and subject. The database
+indexes that column (see migration 0004_question_search):
+
+- PostgreSQL: a generated tsvector column with a GIN index, queried with
+  to_tsquery('simple', ...).
+- SQLite: an FTS5 table kept in step by triggers, queried with MATCH.
+
+Other backends fall back to substring matching on `document`.
+
+Words are analysed the same way on both sides: lowercased, accents
+dropped, Indonesian stopwords removed and a light rule-based stemmer
+applied (particles, possessives, common prefixes and suffixes), so
+"penjumlahan", "menjumlahkan" and "jumlah" all match each other. Query
+words match as prefixes, so a partly typed word still finds results, and
+documents also keep each word as written (see build_document).
+
+Documents are written on Question save, when a topic or subject is
+renamed (signals.py) and by the bulk importer; rebuild_search_index
+rebuilds them all.
+"""
+import re
+import unicodedata
+
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+from apps.questions.models import Question, QuestionSearchIndex
+from apps.subjects.models import Topic
+
+STOPWORDS = frozenset("""
+    ada adalah agar akan antara apa apakah atau bagaimana bahwa banyak
+    begitu berapa bila bisa dalam dan dapat dari dengan di dia hanya harus
+    ini itu jadi jika juga kami kamu ke kepada ketika kita lagi lain
+    maka mana masih mereka oleh pada para saat saja sangat sebagai sebuah
+    sedang sejak seperti setelah sudah supaya tentang tersebut tetapi
+    tidak untuk yaitu yakni yang
+""".split())
+
+PARTICLES = ("kah", "lah", "tah", "pun")
+POSSESSIVES = ("nya", "ku", "mu")
+# First-order prefixes, longest first; "meny"/"peny" drop an initial s
+PREFIXES = ("meng", "meny", "men", "mem", "me", "peng", "peny", "pen", "pem",
+            "di", "ter", "ke")
+SECOND_PREFIXES = ("ber", "bel", "be", "per", "pel", "pe")
+SUFFIXES = ("kan", "an", "i")
+MIN_STEM = 4
+
+_word = re.compile(r"[a-z0-9]+")
+
+
+def _strip(word, affixes, suffix=True):
+    for affix in affixes:
+        if suffix and word.endswith(affix) and len(word) - len(affix) >= MIN_STEM:
+            return word[:-len(affix)], True
+        if not suffix and word.startswith(affix) and len(word) - len(affix) >= MIN_STEM:
+            return word[len(affix):], True
+    return word, False
+
+
+def stem(word):
+    """Reduce an Indonesian word to an approximate root ("" for a stopword)."""
+    if word.isdigit() or len(word) <= MIN_STEM:
+        return word
+    word, _ = _strip(word, PARTICLES)
+    word, _ = _strip(word, POSSESSIVES)
+    if word in STOPWORDS:
+        return ""
+    for prefix in ("meny", "peny"):
+        if word.startswith(prefix) and len(word) - len(prefix) >= MIN_STEM - 1:
+            word = "s" + word[len(prefix):]
+            break
+    else:
+        word, stripped = _strip(word, PREFIXES, suffix=False)
+        if not stripped:
+            word, _ = _strip(word, SECOND_PREFIXES, suffix=False)
+    word, _ = _strip(word, SUFFIXES)
+    return word
+
+
+def _words(text):
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode()
+    return [word for word in _word.findall(text.lower()) if word not in STOPWORDS]
+
+
+def analyze(text):
+    """Stemmed search terms of a piece of text, in order."""
+    return [term for term in map(stem, _words(text)) if term]
+
+
+def build_document(*texts):
+    """
+    Index text for the given fields.
+
+    Each word is stored stemmed and, when stemming changed it, as written
+    too, so a typed prefix of the full word ("pecah" for "pecahan") still
+    matches when the stemmer over-strips.
+    """
+    terms = []
+    for text in texts:
+        for word in _words(text):
+            root = stem(word)
+            if root:
+                terms.append(root)
+                if root != word:
+                    terms.append(word)
+    return " ".join(terms)
+
+
+def question_document(question, topic_name, subject_name):
+    return build_document(
+        question.question_text, question.explanation, topic_name, subject_name
+    )
+
+
+def save_documents(documents):
+    """Upsert QuestionSearchIndex rows in one statement."""
+    QuestionSearchIndex.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=["question"],
+        update_fields=["document"],
+    )
+
+
+def index_question(question):
+    """Write the search document of a single saved question."""
+    topic_name, subject_name = Topic.objects.filter(pk=question.topic_id).values_list(
+        "name", "subject__name"
+    ).get()
+    save_documents([
+        QuestionSearchIndex(
+            question_id=question.pk,
+            document=question_document(question, topic_name, subject_name),
+        )
+    ])
+
+
+def index_questions(question_ids):
+    """(Re)write the search documents of the given questions."""
+    question_ids = list(question_ids)
+    if not question_ids:
+        return
+    questions = Question.objects.filter(pk__in=question_ids).select_related(
+        "topic__subject"
+    ).only("question_text", "explanation", "topic__name", "topic__subject__name")
+    save_documents([
+        QuestionSearchIndex(
+            question_id=question.pk,
+            document=question_document(
+                question, question.topic.name, question.topic.subject.name
+            ),
+        )
+        for question in questions
+    ])
+
+
+def rebuild_search_index(batch_size=1000):
+    """Rewrite every question's search document; returns the count."""
+    ids = list(Question.objects.order_by("pk").values_list("pk", flat=True))
+    for offset in range(0, len(ids), batch_size):
+        index_questions(ids[offset:offset + batch_size])
+    return len(ids)
+
+
+def matching_ids(terms, using="default"):
+    """Subquery of the question ids whose document matches every term."""
+    vendor = connections[using].vendor
+    if vendor == "postgresql":
+        # Terms are [a-z0-9]+ only, so they are safe inside a tsquery
+        return RawSQL(
+            "SELECT question_id FROM question_search "
+            "WHERE vector @@ to_tsquery('simple', %s)",
+            [" & ".join(f"{term}:*" for term in terms)],
+        )
+    if vendor == "sqlite":
+        return RawSQL(
+            "SELECT rowid FROM question_search_fts WHERE question_search_fts MATCH %s",
+            [" ".join(f'"{term}"*' for term in terms)],
+        )
+    documents = QuestionSearchIndex.objects.using(using)
+    for term in terms:
+        documents = documents.filter(document__contains=term)
+    return documents.values("question_id")
+
+
+def search_questions(queryset, query):
+    """
+    Narrow a Question queryset to the questions matching `query`.
+
+    A query made only of stopwords falls back to a plain substring match on
+    the question text.
+    """
+    query = (query or "").strip()
+    if not query:
+        return queryset
+    terms = analyze(query)
+    if not terms:
+        return queryset.filter(question_text__icontains=query)
+    return queryset.filter(pk__in=matching_ids(terms, using=queryset.db))
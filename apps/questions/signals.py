@@ -0,0 +1,44 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.questions.models import Question
+from apps.questions.sampling import invalidate_question_pools
+from apps.questions.search import index_question, index_questions
+from apps.subjects.models import Subject, Topic
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def invalidate_pools_on_bank_change(sender, **kwargs):
+    """Any change to the question bank can move IDs between pools."""
+    invalidate_question_pools()
+
+
+@receiver(post_save, sender=Question)
+def index_question_on_save(sender, instance, raw=False, **kwargs):
+    """Keep the question's search document in step with its text."""
+    if raw:
+        return
+    index_question(instance)
+
+
+@receiver(post_save, sender=Topic)
+def reindex_topic_questions(sender, instance, created, raw=False, **kwargs):
+    """Topic names are part of their questions' search documents."""
+    if created or raw:
+        return
+    index_questions(instance.questions.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Subject)
+def reindex_subject_questions(sender, instance, created, raw=False, **kwargs):
+    """Subject names are part of their questions' search documents."""
+    if created or raw:
+        return
+    index_questions(
+        Question.objects.filter(topic__subject=instance).values_list("pk", flat=True)
+    )
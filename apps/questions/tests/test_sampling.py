@@ -0,0 +1,79 @@
+import random
+from collections import Counter
+
+import pytest
+from django.core.cache import cache
+
+from apps.questions.models import Question
+from apps.questions.sampling import (
+    get_question_id_pool,
+    sample_question_ids,
+    sample_questions,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def bank(topic):
+    return Question.objects.bulk_create([
+        Question(
+            topic=topic, question_text=f"Soal {i}", question_type="essay",
+            difficulty="mudah", answer_key="x",
+        )
+        for i in range(20)
+    ])
+
+
+def test_pool_is_cached_after_first_read(bank, subject, django_assert_num_queries):
+    get_question_id_pool(subject.pk, subject.grade)
+    with django_assert_num_queries(0):
+        pool = get_question_id_pool(subject.pk, subject.grade)
+    assert sorted(pool) == sorted(q.pk for q in bank)
+
+
+def test_pool_invalidated_when_question_saved(bank, subject, topic):
+    get_question_id_pool(subject.pk, subject.grade)
+    new = Question.objects.create(
+        topic=topic, question_text="Baru", question_type="essay",
+        difficulty="mudah", answer_key="x",
+    )
+    assert new.pk in get_question_id_pool(subject.pk, subject.grade)
+
+    new.delete()
+    assert new.pk not in get_question_id_pool(subject.pk, subject.grade)
+
+
+def test_sample_fetches_only_chosen_rows(bank, subject, django_assert_num_queries):
+    get_question_id_pool(subject.pk, subject.grade)
+    with django_assert_num_queries(1):
+        chosen = list(sample_questions(subject.pk, subject.grade, 5))
+    assert len(chosen) == 5
+
+
+def test_sample_capped_at_pool_size(bank, subject):
+    ids = sample_question_ids(subject.pk, subject.grade, 50)
+    assert sorted(ids) == sorted(q.pk for q in bank)
+
+
+def test_sample_distribution_is_uniform(bank, subject):
+    """Chi-square goodness of fit over 4000 draws of 5 from 20."""
+    rng = random.Random(2026)
+    trials, k = 4000, 5
+    counts = Counter()
+    for _ in range(trials):
+        ids = sample_question_ids(subject.pk, subject.grade, k, rng=rng)
+        assert len(set(ids)) == k
+        counts.update(ids)
+
+    expected = trials * k / len(bank)
+    chi_square = sum((counts[q.pk] - expected) ** 2 / expected for q in bank)
+    # Critical value for df=19 at p=0.001
+    assert chi_square < 43.82
@@ -0,0 +1,133 @@
+"""
+Tests for the question full-text search (apps.questions.search).
+"""
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from apps.questions.importing import QuestionImporter, rollback_batch
+from apps.questions.models import ImportBatch, Question, QuestionSearchIndex
+from apps.questions.search import analyze, build_document, search_questions, stem
+from apps.subjects.models import Subject, Topic
+
+
+class TestAnalyzer:
+    """Test the Indonesian analyzer (no database needed)."""
+
+    @pytest.mark.parametrize("words, root", [
+        (("jumlah", "penjumlahan", "menjumlahkan"), "jumlah"),
+        (("bagi", "membagi", "pembagian", "dibagi"), "bagi"),
+        (("kali", "dikali", "perkalian"), "kali"),
+        (("ajar", "belajar", "pelajaran"), "ajar"),
+        (("buku", "bukunya"), "buku"),
+        (("baca", "bacalah"), "baca"),
+    ])
+    def test_stems_to_shared_root(self, words, root):
+        assert {stem(word) for word in words} == {root}
+
+    def test_drops_stopwords_case_and_accents(self):
+        assert analyze("Berapakah hasil DARI 12 + 5?") == ["hasil", "12", "5"]
+        assert analyze("Café") == ["cafe"]
+        assert analyze("yang dan di") == []
+
+    def test_document_keeps_surface_form_of_stemmed_words(self):
+        assert build_document("Pecahan", "bagi") == "cahan pecahan bagi"
+
+
+@pytest.mark.django_db
+class TestSearchQuestions:
+    """Test matching and keeping the index in step with the bank."""
+
+    @pytest.fixture
+    def bank(self, topic):
+        other = Topic.objects.create(
+            subject=Subject.objects.create(name="IPA", grade=4), name="Tumbuhan"
+        )
+        return {
+            "fractions": Question.objects.create(
+                topic=topic, question_text="Berapa hasil penjumlahan 1/2 + 1/4?",
+                question_type="isian", difficulty="mudah", answer_key="3/4",
+            ),
+            "division": Question.objects.create(
+                topic=topic, question_text="12 dibagi 3 sama dengan?",
+                question_type="isian", difficulty="mudah", answer_key="4",
+                explanation="Pembagian adalah pengurangan berulang.",
+            ),
+            "plants": Question.objects.create(
+                topic=other, question_text="Bagian tumbuhan yang menyerap air?",
+                question_type="isian", difficulty="sedang", answer_key="Akar",
+            ),
+        }
+
+    def _search(self, query):
+        return set(search_questions(Question.objects.all(), query))
+
+    def test_matches_stemmed_words_in_text_and_explanation(self, bank):
+        assert self._search("menjumlahkan") == {bank["fractions"]}
+        assert self._search("mengurangi") == {bank["division"]}
+
+    def test_matches_topic_and_subject_names(self, bank):
+        assert self._search("pecahan") == {bank["fractions"], bank["division"]}
+        assert self._search("ipa") == {bank["plants"]}
+        assert self._search("matematika dibagi") == {bank["division"]}
+
+    def test_prefix_and_stopword_only_queries(self, bank):
+        assert self._search("tumbuh") == {bank["plants"]}
+        assert self._search("yang") == {bank["plants"]}
+
+    def test_index_follows_saves_renames_and_deletes(self, bank, subject):
+        question = bank["fractions"]
+        question.question_text = "Sederhanakan 2/4"
+        question.save()
+        assert self._search("penjumlahan") == set()
+        assert self._search("sederhana") == {question}
+
+        subject.name = "Berhitung"
+        subject.save()
+        assert self._search("hitung") == {question, bank["division"]}
+
+        question.delete()
+        assert not QuestionSearchIndex.objects.filter(question_id=question.pk).exists()
+        assert self._search("hitung") == {bank["division"]}
+
+    def test_bulk_import_indexes_and_rollback_removes(self, subject, topic):
+        batch = ImportBatch.objects.create(source_name="bank.json")
+        rows = [{
+            "grade": 4, "subject": "Matematika", "topic": "Desimal",
+            "text": f"Tuliskan {i}/10 sebagai desimal", "type": "isian", "answer": "0",
+        } for i in range(5)]
+
+        QuestionImporter(batch=batch).run(rows)
+        assert len(self._search("desimal")) == 5
+        assert len(self._search("tulis matematika")) == 5
+
+        rollback_batch(batch)
+        assert self._search("desimal") == set()
+        assert not QuestionSearchIndex.objects.exists()
+
+    def test_rebuild_command(self, bank, capsys):
+        QuestionSearchIndex.objects.all().delete()
+        assert self._search("tumbuhan") == set()
+
+        call_command("rebuild_search_index")
+
+        assert "Indexed 3 questions." in capsys.readouterr().out
+        assert self._search("tumbuhan") == {bank["plants"]}
+
+    def test_custom_quiz_picker_uses_index(self, bank, admin_client):
+        response = admin_client.get(
+            reverse("quizzes:create_custom_quiz"), {"search": "pengurangan berulang"}
+        )
+
+        assert list(response.context["questions"]) == [bank["division"]]
+
+    def test_admin_search_uses_index(self, bank, client, django_user_model):
+        client.force_login(django_user_model.objects.create_superuser("root", "root@test.com", "pw"))
+        url = reverse("admin:questions_question_changelist")
+
+        response = client.get(url, {"q": "akar tumbuhan"})
+        assert set(response.context["cl"].result_list) == set()
+        response = client.get(url, {"q": "menyerap tumbuhan"})
+        assert set(response.context["cl"].result_list) == {bank["plants"]}
+        response = client.get(url, {"q": str(bank["division"].pk)})
+        assert bank["division"] in response.context["cl"].result_list
@@ -0,0 +1,184 @@
+"""
+Tests for import pre-validation (apps.questions.validation / validate_rows).
+"""
+import io
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+
+from apps.questions import importing
+from apps.questions.importing import (
+    DIFFICULTIES, QUESTION_TYPES, QuestionImporter, import_question_stream, validate_rows,
+)
+from apps.questions.models import ImportBatch, Question
+from apps.questions.validation import ImportRowError, clean_row
+from apps.subjects.models import Subject
+
+SUBJECTS = {(3, "matematika")}
+
+
+def _row(**overrides):
+    row = {
+        "grade": 3, "subject": "Matematika", "topic": "Penjumlahan",
+        "text": "1+1?", "type": "pilgan", "answer": "b",
+        "options": ["1", "2", "3", "4"],
+    }
+    row.update(overrides)
+    return row
+
+
+def _clean(row):
+    return clean_row(0, row, QUESTION_TYPES, DIFFICULTIES, SUBJECTS)
+
+
+def _error(row):
+    with pytest.raises(ImportRowError) as excinfo:
+        _clean(row)
+    return str(excinfo.value)
+
+
+class TestCleanRow:
+    """Test single-row checks (no database needed)."""
+
+    def test_normalises_valid_row(self):
+        row = _clean(_row(points="20", tags="hitung"))
+
+        assert row["answer"] == "B"
+        assert row["subject_key"] == (3, "matematika")
+        assert (row["points"], row["estimated_time"]) == (20, 60)
+        assert row["tags"] == ["hitung"]
+
+    def test_answer_given_as_option_text(self):
+        assert _clean(_row(answer="3"))["answer"] == "C"
+
+    def test_answer_must_resolve_against_options(self):
+        assert _error(_row(answer="D", options=["1", "2", "3"])) == (
+            "Row 1: Answer 'D' does not match any of the 3 answerable options."
+        )
+        assert "does not match" in _error(_row(answer="lima"))
+
+    def test_enums(self):
+        assert _error(_row(type="benar-salah")).startswith(
+            "Row 1: Unknown question type 'benar-salah'"
+        )
+        assert _error(_row(difficulty="ekstrem")).startswith(
+            "Row 1: Unknown difficulty 'ekstrem'"
+        )
+
+    def test_schema(self):
+        assert _error("teks") == "Row 1: Each row must be a JSON object."
+        assert _error(_row(options=["1"])) == "Row 1: Pilgan must have at least 2 options list."
+        assert _error(_row(options=["1", ""])) == "Row 1: Options must be non-empty text."
+        assert _error(_row(points="banyak")) == "Row 1: 'points' must be a whole number."
+        assert _error(_row(tags=[1])) == "Row 1: Tags must be a list of names."
+
+    def test_unknown_subject(self):
+        assert _error(_row(subject="IPA")) == "Row 1: Subject 'IPA' for Grade 3 not found."
+
+    def test_essay_answer_is_free_text(self):
+        row = _clean(_row(type="essay", answer="Dua", options=None))
+
+        assert (row["answer"], row["options"]) == ("Dua", None)
+
+
+@pytest.mark.django_db
+class TestValidateRows:
+    """Test the whole-file validation pass."""
+
+    @pytest.fixture(autouse=True)
+    def subject(self):
+        return Subject.objects.create(name="Matematika", grade=3)
+
+    def _rows(self, count):
+        rows = [_row(text=f"{i}+1?") for i in range(count)]
+        for i in range(7, count, 50):
+            rows[i] = _row(answer="Z")
+        return rows
+
+    def test_reports_every_error_before_writing(self):
+        report = validate_rows(self._rows(120), workers=1, chunk_size=25)
+
+        assert report.rows == 120
+        assert sorted(report.errors) == [7, 57, 107]
+        assert report.valid == 117
+        assert report.messages[0].startswith("Row 8: Answer 'Z'")
+        assert not Question.objects.exists()
+
+    def test_process_pool_matches_in_process(self):
+        rows = self._rows(300)
+
+        serial = validate_rows(rows, workers=1, chunk_size=40)
+        parallel = validate_rows(rows, workers=2, chunk_size=40)
+
+        assert parallel.errors == serial.errors
+        assert parallel.rows == serial.rows == 300
+
+    def test_write_pass_only_builds_clean_rows(self, monkeypatch):
+        rows = self._rows(60)
+        built = []
+        original = QuestionImporter._build
+
+        def build(self, index, item):
+            built.append(index)
+            return original(self, index, item)
+
+        monkeypatch.setattr(QuestionImporter, "_build", build)
+        stream = io.BytesIO(json.dumps(rows).encode())
+        batch, _ = import_question_stream(stream, "bank.json", workers=1)
+
+        assert 7 not in built and 57 not in built
+        assert (batch.rows_created, batch.rows_failed) == (58, 2)
+        assert batch.errors[0].startswith("Row 8: Answer 'Z'")
+
+    def test_syntax_error_writes_nothing(self):
+        stream = io.BytesIO((json.dumps(self._rows(10))[:-1] + ",").encode())
+
+        with pytest.raises(ValueError):
+            import_question_stream(stream, "bank.json", workers=1)
+
+        assert not Question.objects.exists()
+        assert not ImportBatch.objects.exists()
+
+    def test_admin_dry_run_renders_summary(self, client, django_user_model):
+        client.force_login(django_user_model.objects.create_superuser("root", "root@test.com", "pw"))
+        upload = SimpleUploadedFile("bank.json", json.dumps(self._rows(10)).encode())
+
+        response = client.post(
+            reverse("admin:questions_question_import_json"),
+            {"file": upload, "dry_run": "on"},
+        )
+
+        assert response.status_code == 200
+        assert (response.context["report"].rows, response.context["report"].valid) == (10, 9)
+        assert "Row 8: Answer &#x27;Z&#x27;" in response.content.decode()
+        assert not Question.objects.exists()
+
+    def test_admin_upload_validates_in_process(self, client, django_user_model, monkeypatch, settings):
+        settings.QUESTION_IMPORT_WORKERS = 4
+        used = []
+        original = importing._validated_chunks
+
+        def validated_chunks(tasks, workers):
+            used.append(workers)
+            return original(tasks, workers)
+
+        monkeypatch.setattr(importing, "_validated_chunks", validated_chunks)
+        client.force_login(django_user_model.objects.create_superuser("root", "root@test.com", "pw"))
+        for dry_run in ({"dry_run": "on"}, {}):
+            upload = SimpleUploadedFile("bank.json", json.dumps(self._rows(10)).encode())
+            client.post(reverse("admin:questions_question_import_json"), {"file": upload, **dry_run})
+
+        assert used == [1, 1]
+        assert Question.objects.count() == 9
+
+    def test_command_dry_run(self, tmp_path, capsys):
+        path = tmp_path / "bank.json"
+        path.write_text(json.dumps(self._rows(10)))
+
+        call_command("import_questions", str(path), "--dry-run", "--workers", "1")
+
+        assert "10 rows: 9 valid, 1 with errors" in capsys.readouterr().out
+        assert not Question.objects.exists()
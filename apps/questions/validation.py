@@ -0,0 +1,135 @@
+"""
+Row validation for question imports.
+
+Pure Python with no Django or database access, so importing.validate_rows
+can fan chunks of rows out to worker processes. The allowed question types,
+difficulties and known subjects are passed in by the caller.
+"""
+
+REQUIRED_FIELDS = ("grade", "subject", "topic", "text", "answer")
+ANSWER_LETTERS = "ABCD"
+
+
+class ImportRowError(Exception):
+    """A row that cannot be imported; the message is reported as-is."""
+
+
+def _whole_number(index, item, field, default):
+    value = item.get(field, default)
+    if isinstance(value, bool):
+        raise ImportRowError(f"Row {index+1}: '{field}' must be a whole number.")
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ImportRowError(f"Row {index+1}: '{field}' must be a whole number.")
+    if number != value and str(number) != str(value).strip():
+        raise ImportRowError(f"Row {index+1}: '{field}' must be a whole number.")
+    return number
+
+
+def _resolve_answer(index, answer, options):
+    """Answer letter for a multiple choice row, given as a letter or option text."""
+    answer = str(answer).strip()
+    letter = answer.upper()
+    if len(letter) == 1 and letter in ANSWER_LETTERS:
+        if ANSWER_LETTERS.index(letter) < len(options):
+            return letter
+    else:
+        texts = [str(option).strip() for option in options]
+        if answer in texts and texts.index(answer) < len(ANSWER_LETTERS):
+            return ANSWER_LETTERS[texts.index(answer)]
+    raise ImportRowError(
+        f"Row {index+1}: Answer '{answer}' does not match any of the "
+        f"{min(len(options), len(ANSWER_LETTERS))} answerable options."
+    )
+
+
+def clean_row(index, item, types, difficulties, subjects=None):
+    """
+    Check one import row and return its normalised values.
+
+    Args:
+        index: 0-based row number in the file (used in messages)
+        item: the parsed row
+        types, difficulties: allowed question type / difficulty values
+        subjects: optional set of known (grade, lowercased name) pairs
+
+    Raises ImportRowError with a "Row N: ..." message.
+    """
+    if not isinstance(item, dict):
+        raise ImportRowError(f"Row {index+1}: Each row must be a JSON object.")
+
+    if not all(item.get(field) for field in REQUIRED_FIELDS):
+        raise ImportRowError(
+            f"Row {index+1}: Missing required fields (grade, subject, topic, text, answer)."
+        )
+
+    grade = item["grade"]
+    subject_name = item["subject"]
+    try:
+        subject_key = (int(grade), str(subject_name).lower())
+    except (TypeError, ValueError):
+        subject_key = None
+    if subject_key is None or (subjects is not None and subject_key not in subjects):
+        raise ImportRowError(
+            f"Row {index+1}: Subject '{subject_name}' for Grade {grade} not found."
+        )
+
+    q_type = item.get("type", "pilgan")
+    if q_type not in types:
+        raise ImportRowError(
+            f"Row {index+1}: Unknown question type '{q_type}' "
+            f"(expected {', '.join(types)})."
+        )
+    difficulty = item.get("difficulty", "sedang")
+    if difficulty not in difficulties:
+        raise ImportRowError(
+            f"Row {index+1}: Unknown difficulty '{difficulty}' "
+            f"(expected {', '.join(difficulties)})."
+        )
+
+    options = None
+    answer = item["answer"]
+    if q_type == "pilgan":
+        options = item.get("options", [])
+        if not isinstance(options, list) or len(options) < 2:
+            raise ImportRowError(
+                f"Row {index+1}: Pilgan must have at least 2 options list."
+            )
+        if not all(isinstance(option, (str, int, float)) and str(option).strip()
+                   for option in options):
+            raise ImportRowError(f"Row {index+1}: Options must be non-empty text.")
+        answer = _resolve_answer(index, answer, options)
+
+    tags = item.get("tags") or []
+    if isinstance(tags, str):
+        tags = [tags]
+    if not isinstance(tags, list) or not all(isinstance(tag, str) and tag for tag in tags):
+        raise ImportRowError(f"Row {index+1}: Tags must be a list of names.")
+
+    return {
+        "subject_key": subject_key,
+        "topic": str(item["topic"]),
+        "text": item["text"],
+        "type": q_type,
+        "difficulty": difficulty,
+        "options": options,
+        "answer": answer,
+        "explanation": item.get("explanation") or "",
+        "points": _whole_number(index, item, "points", 10),
+        "estimated_time": _whole_number(index, item, "estimated_time", 60),
+        "tags": tags,
+    }
+
+
+def validate_chunk(start, rows, types, difficulties, subjects):
+    """Validate rows numbered from `start`; returns [(index, message)] for bad rows."""
+    errors = []
+    for index, item in enumerate(rows, start=start):
+        try:
+            clean_row(index, item, types, difficulties, subjects)
+        except ImportRowError as e:
+            errors.append((index, str(e)))
+        except Exception as e:
+            errors.append((index, f"Row {index+1}: Error - {str(e)}"))
+    return errors
@@ -16,8 +16,9 @@ class QuizAdmin(admin.ModelAdmin):
     list_display = ('title', 'quiz_type_badge', 'subject', 'grade', 'question_count_display', 'time_limit_minutes', 'is_active', 'created_at')
     list_filter = ('is_active', 'quiz_type', 'grade', 'subject', 'created_at')
     search_fields = ('title', 'description')
-    filter_horizontal = ('questions',)
-    autocomplete_fields = ['subject']
+    # Questions are picked through QuestionAdmin's full-text search
+    autocomplete_fields = ['subject', 'questions']
+    list_select_related = ('subject',)
     readonly_fields = ('created_by', 'created_at', 'updated_at', 'total_points')
     
     fieldsets = (
@@ -58,7 +59,7 @@ class QuizAdmin(admin.ModelAdmin):
     def question_count_display(self, obj):
         if obj.quiz_type == 'subject_based':
             return f"{obj.question_count} (random)"
-        return obj.questions.count()
+        return obj.total_questions
     question_count_display.short_description = "Questions"
 
 @admin.register(QuizSession)
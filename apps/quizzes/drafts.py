@@ -0,0 +1,87 @@
+"""
+Write-behind store for autosaved quiz answers.
+
+When settings.QUIZ_AUTOSAVE_WRITE_BEHIND is on, SaveAnswerView records draft
+answers in the Django cache instead of touching Attempt rows. Drafts are
+flushed to the database in one batch when the quiz is graded or by the
+periodic flush job (see services.flush_session_drafts).
+
+Each answer lives under its own key so concurrent autosaves for different
+questions of one session never overwrite each other.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+DRAFT_TIMEOUT = 60 * 60 * 24  # keep drafts for a day at most
+META_TIMEOUT = 60 * 60 * 6
+
+
+def write_behind_enabled():
+    return getattr(settings, "QUIZ_AUTOSAVE_WRITE_BEHIND", False)
+
+
+def _draft_key(session_id, question_id):
+    return f"quiz_draft:{session_id}:{question_id}"
+
+
+def _meta_key(session_id):
+    return f"quiz_session_meta:{session_id}"
+
+
+def save_draft(session_id, question_id, answer):
+    cache.set(_draft_key(session_id, question_id), answer, DRAFT_TIMEOUT)
+
+
+def save_drafts(session_id, answers):
+    """Store many `{question_id: answer}` drafts in one round trip."""
+    cache.set_many(
+        {_draft_key(session_id, qid): answer for qid, answer in answers.items()},
+        DRAFT_TIMEOUT,
+    )
+
+
+def get_drafts(session_id, question_ids):
+    """Return `{question_id: answer}` for the questions that have a draft."""
+    keys = {_draft_key(session_id, qid): qid for qid in question_ids}
+    found = cache.get_many(keys.keys())
+    return {keys[key]: answer for key, answer in found.items()}
+
+
+def clear_drafts(session_id, question_ids):
+    cache.delete_many([_draft_key(session_id, qid) for qid in question_ids])
+
+
+def cache_session_meta(session, question_ids):
+    """Remember what autosave needs to validate a request without queries."""
+    meta = {
+        "student_id": session.student_id,
+        "is_proxy_mode": session.is_proxy_mode,
+        "proxy_user_id": session.proxy_user_id,
+        "question_ids": list(question_ids),
+    }
+    cache.set(_meta_key(session.pk), meta, META_TIMEOUT)
+    return meta
+
+
+def get_session_meta(session_id):
+    """
+    Return cached metadata for an open session, loading it on a miss.
+    Returns None when the session does not exist or is already completed.
+    """
+    from apps.quizzes.models import QuizSession
+
+    meta = cache.get(_meta_key(session_id))
+    if meta is not None:
+        return meta
+
+    session = QuizSession.objects.filter(
+        pk=session_id, completed_at__isnull=True
+    ).first()
+    if session is None:
+        return None
+    question_ids = session.session_questions.values_list("pk", flat=True)
+    return cache_session_meta(session, question_ids)
+
+
+def forget_session(session_id):
+    cache.delete(_meta_key(session_id))
@@ -0,0 +1,23 @@
+"""
+Management command to flush buffered autosave drafts to Attempt rows.
+Fallback for deployments that do not run Celery beat.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.quizzes.services import flush_open_session_drafts
+
+
+class Command(BaseCommand):
+    help = "Write buffered autosave answers of open quiz sessions to the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Number of open sessions read per chunk',
+        )
+
+    def handle(self, *args, **options):
+        written = flush_open_session_drafts(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Flushed {written} draft answers."))
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.14 on 2026-10-17 11:40
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, Max
+
+
+def drop_duplicate_open_sessions(apps, schema_editor):
+    """Keep the newest open session per (student, quiz), delete the others."""
+    QuizSession = apps.get_model("quizzes", "QuizSession")
+
+    duplicates = (
+        QuizSession.objects.filter(completed_at__isnull=True)
+        .values("student", "quiz")
+        .annotate(rows=Count("id"), keep_id=Max("id"))
+        .filter(rows__gt=1)
+    )
+    for row in duplicates:
+        QuizSession.objects.filter(
+            student=row["student"], quiz=row["quiz"], completed_at__isnull=True
+        ).exclude(pk=row["keep_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("academic", "0002_backfill"),
+        ("questions", "0002_kompetensidasar_grade_ref_kompetensidasar_topic"),
+        ("quizzes", "0007_quiz_grade_ref_quizsession_grade_ref"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_open_sessions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.14 on 2026-10-17 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Kept apart from 0008: on PostgreSQL the duplicate deletes there leave
+    deferred FK checks pending, and an index cannot be built in the same
+    transaction.
+    """
+
+    dependencies = [
+        ("quizzes", "0008_drop_duplicate_open_sessions"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="quizsession",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("completed_at__isnull", True)),
+                fields=("student", "quiz"),
+                name="uniq_open_session_per_student_quiz",
+            ),
+        ),
+    ]
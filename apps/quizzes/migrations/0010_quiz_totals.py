@@ -0,0 +1,59 @@
+# Generated by Django 5.0.14 on 2026-10-17 11:50
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_totals(apps, schema_editor):
+    """Fill the new aggregates from the existing question M2M rows."""
+    for model_name, m2m_name, owner_field in (
+        ("Quiz", "questions", "quiz_id"),
+        ("QuizSession", "session_questions", "quizsession_id"),
+    ):
+        model = apps.get_model("quizzes", model_name)
+        through = getattr(model, m2m_name).through
+        rows = (
+            through.objects.filter(**{owner_field: OuterRef("pk")})
+            .order_by()
+            .values(owner_field)
+        )
+        model.objects.update(
+            total_questions=Coalesce(
+                Subquery(rows.annotate(n=Count("pk")).values("n")), 0
+            ),
+            max_points=Coalesce(
+                Subquery(rows.annotate(n=Sum("question__points")).values("n")), 0
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quizzes", "0009_open_session_unique"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quiz",
+            name="max_points",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="quiz",
+            name="total_questions",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="quizsession",
+            name="max_points",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="quizsession",
+            name="total_questions",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from apps.questions.models import Question
@@ -69,6 +71,11 @@ class Quiz(models.Model):
     )
     is_active = models.BooleanField(default=True)
     
+    # Maintained aggregates over `questions` (see signals.py), so listings
+    # and the admin never count or sum the M2M per row.
+    total_questions = models.PositiveIntegerField(default=0, editable=False)
+    max_points = models.PositiveIntegerField(default=0, editable=False)
+    
     class Meta:
         verbose_name = _("Quiz")
         verbose_name_plural = _("Quizzes")
@@ -115,14 +122,19 @@ class Quiz(models.Model):
         if self.quiz_type == self.QuizType.SUBJECT_BASED:
             # Return estimated total (assuming 10 points per question as default)
             return (self.question_count or 0) * 10
-        return sum(q.points for q in self.questions.all())
+        return self.max_points
     
     @property
     def get_question_count(self):
         """Get question count regardless of quiz type."""
         if self.quiz_type == self.QuizType.SUBJECT_BASED:
             return self.question_count or 0
-        return self.questions.count()
+        return self.total_questions
+    
+    @classmethod
+    def refresh_totals(cls, quiz_ids):
+        """Recompute `total_questions` and `max_points` in one UPDATE."""
+        _refresh_totals(cls, cls.questions.through, 'quiz_id', quiz_ids)
 
 
 class QuizSession(models.Model):
@@ -192,6 +204,10 @@ class QuizSession(models.Model):
         help_text=_("Questions actually used in this quiz session")
     )
     
+    # Aggregates over `session_questions`, set at bootstrap
+    total_questions = models.PositiveIntegerField(default=0, editable=False)
+    max_points = models.PositiveIntegerField(default=0, editable=False)
+    
     class Meta:
         verbose_name = _("Quiz Session")
         verbose_name_plural = _("Quiz Sessions")
@@ -200,12 +216,45 @@ class QuizSession(models.Model):
             models.Index(fields=['student', 'completed_at']),
             models.Index(fields=['grade']),
         ]
+        constraints = [
+            # At most one open (not completed) session per student per quiz
+            models.UniqueConstraint(
+                fields=['student', 'quiz'],
+                condition=models.Q(completed_at__isnull=True),
+                name='uniq_open_session_per_student_quiz',
+            ),
+        ]
     
     def __str__(self):
         prefix = "[PROXY] " if self.is_proxy_mode else ""
         student_name = self.student.get_full_name() or self.student.username
         return f"{prefix}{student_name} - {self.quiz.title}"
     
+    @classmethod
+    def start(cls, student, quiz, defaults=None):
+        """
+        Return `(session, created)` for the student's open session of `quiz`.
+        
+        Race-safe upsert: the partial unique constraint guarantees a single
+        open session, so a request that loses the race to create it gets an
+        IntegrityError and re-reads the winner's session. Any other
+        IntegrityError (no open session on re-read) is re-raised.
+        """
+        open_sessions = cls.objects.select_related('quiz').filter(
+            student=student, quiz=quiz, completed_at__isnull=True
+        )
+        session = open_sessions.first()
+        if session is not None:
+            return session, False
+        try:
+            with transaction.atomic():
+                return cls.objects.create(student=student, quiz=quiz, **(defaults or {})), True
+        except IntegrityError:
+            session = open_sessions.first()
+            if session is None:
+                raise
+            return session, False
+    
     def save(self, *args, **kwargs):
         # Check if this is a new session
         is_new = self.pk is None
@@ -214,68 +263,107 @@ class QuizSession(models.Model):
         if not self.grade and self.student and self.student.grade:
             self.grade = self.student.grade
         
-        super().save(*args, **kwargs)
-        
-        # After saving, populate session_questions if not already set
-        if is_new and not self.session_questions.exists():
-            self._populate_session_questions()
+        # Insert the session and its questions/attempts together so a session
+        # is never visible half-populated.
+        with transaction.atomic():
+            question_ids = None
+            if is_new:
+                question_ids = self._select_question_ids()
+                self.total_questions = len(question_ids)
+                self.max_points = Question.objects.filter(
+                    pk__in=question_ids
+                ).aggregate(total=Coalesce(Sum('points'), 0))['total']
+            
+            super().save(*args, **kwargs)
+            
+            if is_new:
+                self._populate_session_questions(question_ids)
     
-    def _populate_session_questions(self):
-        """Populate session_questions based on quiz type and pre-generate Attempt records."""
+    def _select_question_ids(self):
+        """Pick the question IDs for this session based on quiz type."""
         from random import sample
+        from apps.questions.sampling import sample_live_question_ids
         
-        selected_questions = []
+        quiz = self.quiz
         
-        if self.quiz.quiz_type == Quiz.QuizType.SUBJECT_BASED:
-            # Subject Quiz: Select random questions from the quiz's subject
-            available_questions = list(
-                Question.objects.filter(
-                    topic__subject=self.quiz.subject,
-                    topic__subject__grade=self.quiz.grade
-                )
+        if quiz.quiz_type == Quiz.QuizType.SUBJECT_BASED:
+            # Subject Quiz: Select random questions from the quiz's subject,
+            # drawn from the cached ID pool (limited to available questions)
+            # and checked against the table, since the pool may be stale
+            return sample_live_question_ids(
+                quiz.subject_id, quiz.grade, quiz.question_count or 10
             )
-            
-            # Get the count, limiting to available questions
-            count = min(self.quiz.question_count or 10, len(available_questions))
-            
-            if available_questions:
-                selected_questions = sample(available_questions, count)
         
-        elif self.quiz.quiz_type == Quiz.QuizType.CUSTOM:
+        if quiz.quiz_type == Quiz.QuizType.CUSTOM:
             # Custom Quiz: Select random from manually selected questions
-            available_questions = list(self.quiz.questions.all())
+            available_ids = list(quiz.questions.values_list('pk', flat=True))
             
-            if self.quiz.question_count:
+            if quiz.question_count:
                 # If question_count is set, select random subset
-                count = min(self.quiz.question_count, len(available_questions))
-                selected_questions = sample(available_questions, count)
-            else:
-                # If no question_count, use all selected questions
-                selected_questions = available_questions
-        
-        # Set the session questions
-        if selected_questions:
-            self.session_questions.set(selected_questions)
+                count = min(quiz.question_count, len(available_ids))
+                return sample(available_ids, count)
             
-            # Pre-generate Attempt records with null answers
-            self._generate_attempts()
+            # If no question_count, use all selected questions
+            return available_ids
+        
+        return []
     
-    def _generate_attempts(self):
+    def _populate_session_questions(self, question_ids=None):
+        """
+        Populate session_questions and pre-generate Attempt records.
+        
+        Uses a fixed number of statements regardless of question count:
+        one SELECT for the question IDs, one bulk INSERT into the M2M table
+        and one bulk INSERT for the placeholder attempts. Conflicting rows are
+        ignored, so re-running the bootstrap for a session never duplicates.
+        The render payload (see payload.py) is cached after commit.
+        """
+        if question_ids is None:
+            question_ids = self._select_question_ids()
+        if not question_ids:
+            return
+        
+        SessionQuestion = QuizSession.session_questions.through
+        SessionQuestion.objects.bulk_create(
+            [
+                SessionQuestion(quizsession_id=self.pk, question_id=question_id)
+                for question_id in question_ids
+            ],
+            ignore_conflicts=True,
+        )
+        
+        self._generate_attempts(question_ids)
+        
+        # Precompile the render payload once the rows are committed
+        from apps.quizzes.payload import warm_session_payload
+        transaction.on_commit(
+            lambda: warm_session_payload(self.pk, question_ids)
+        )
+    
+    def _generate_attempts(self, question_ids=None):
         """Pre-generate Attempt records for all session questions with null answers."""
         from apps.analytics.models import Attempt
         
-        for question in self.session_questions.all():
-            Attempt.objects.get_or_create(
-                student=self.student,
-                question=question,
-                quiz_session=self,
-                defaults={
-                    'answer_given': '',  # Empty answer initially
-                    'is_correct': False,
-                    'time_taken': 0,
-                    'points_earned': 0,
-                }
-            )
+        if question_ids is None:
+            question_ids = list(self.session_questions.values_list('pk', flat=True))
+        
+        # Empty answer initially; relies on the (quiz_session, question)
+        # unique constraint on Attempt to stay idempotent.
+        Attempt.objects.bulk_create(
+            [
+                Attempt(
+                    student_id=self.student_id,
+                    question_id=question_id,
+                    quiz_session=self,
+                    answer_given='',
+                    is_correct=False,
+                    time_taken=0,
+                    points_earned=0,
+                )
+                for question_id in question_ids
+            ],
+            ignore_conflicts=True,
+        )
     
     @property
     def is_completed(self):
@@ -288,6 +376,31 @@ class QuizSession(models.Model):
             delta = self.completed_at - self.started_at
             return int(delta.total_seconds() / 60)
         return None
+    
+    @classmethod
+    def refresh_totals(cls, session_ids):
+        """Recompute `total_questions` and `max_points` in one UPDATE."""
+        _refresh_totals(cls, cls.session_questions.through, 'quizsession_id', session_ids)
+
+
+def _refresh_totals(model, through, owner_field, ids):
+    """Set-based recount of a question M2M into its owner's aggregate fields."""
+    ids = list(ids)
+    if not ids:
+        return
+    rows = (
+        through.objects.filter(**{owner_field: OuterRef('pk')})
+        .order_by()
+        .values(owner_field)
+    )
+    model.objects.filter(pk__in=ids).update(
+        total_questions=Coalesce(
+            Subquery(rows.annotate(n=Count('pk')).values('n')), 0
+        ),
+        max_points=Coalesce(
+            Subquery(rows.annotate(n=Sum('question__points')).values('n')), 0
+        ),
+    )
 
 
 # Note: Responses/Attempts are stored in apps.analytics.models.Attempt
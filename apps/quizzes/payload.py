@@ -0,0 +1,65 @@
+"""
+Precompiled question payload for a quiz session.
+
+A session's question set never changes after bootstrap, so the data needed
+to render it (text, options, media URL, math flag - never answer keys) is
+built once and cached under the session ID. QuizTakeView renders from the
+payload instead of re-reading the questions on every reload.
+
+Invalidated explicitly when the session is graded and when one of its
+questions is edited (see signals.py).
+"""
+from django.core.cache import cache
+
+from apps.questions.models import Question
+
+PAYLOAD_TIMEOUT = 60 * 60 * 6
+
+
+def _payload_key(session_id):
+    return f"quiz_payload:{session_id}"
+
+
+def build_question_payload(question_ids):
+    """Serialize questions for rendering, in session order (one query)."""
+    questions = Question.objects.filter(pk__in=question_ids).only(
+        "id", "topic", "order", "question_text", "question_type",
+        "options", "image", "has_math",
+    )
+    payload = []
+    for position, question in enumerate(questions, start=1):
+        options = []
+        if question.question_type == Question.Type.PILGAN:
+            options = [
+                {"key": chr(65 + index), "text": text}
+                for index, text in enumerate(question.options or [])
+            ]
+        payload.append({
+            "id": question.id,
+            "position": position,
+            "question_text": question.question_text,
+            "question_type": question.question_type,
+            "options": options,
+            "image_url": question.image.url if question.image else "",
+            "has_math": question.has_math,
+        })
+    return payload
+
+
+def warm_session_payload(session_id, question_ids):
+    payload = build_question_payload(question_ids)
+    cache.set(_payload_key(session_id), payload, PAYLOAD_TIMEOUT)
+    return payload
+
+
+def get_session_payload(session):
+    """Return the cached payload, rebuilding it on a miss."""
+    payload = cache.get(_payload_key(session.pk))
+    if payload is None:
+        question_ids = session.session_questions.values_list("pk", flat=True)
+        payload = warm_session_payload(session.pk, question_ids)
+    return payload
+
+
+def invalidate_session_payload(*session_ids):
+    cache.delete_many([_payload_key(session_id) for session_id in session_ids])
@@ -0,0 +1,337 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.analytics import mastery, rollups
+from apps.analytics.metrics_cache import bump_attempt_version
+from apps.analytics.models import Attempt
+from apps.quizzes import drafts
+from apps.quizzes.models import QuizSession
+from apps.quizzes.payload import invalidate_session_payload
+
+logger = logging.getLogger(__name__)
+
+
+def parse_answers(post_data):
+    """
+    Extract `{question_id: answer}` from submitted `question_<id>` fields.
+    Answers are normalised the same way autosave does (stripped, uppercase).
+    """
+    answers = {}
+    for key, value in post_data.items():
+        if not key.startswith("question_"):
+            continue
+        try:
+            question_id = int(key[len("question_"):])
+        except ValueError:
+            continue
+        answers[question_id] = value.strip().upper()
+    return answers
+
+
+def grade_session(session, answers=None):
+    """
+    Grade a quiz session and mark it completed.
+
+    Loads the session questions and attempts with one query each, grades in
+    memory and writes every attempt back with a single bulk_update. The
+    graded attempts are then folded into the student's mastery records
+    and daily activity rollup.
+
+    Args:
+        session: QuizSession to finish
+        answers: Optional `{question_id: answer}` from the submit form.
+            Questions without an entry keep the answer saved by autosave
+            (buffered drafts first, then the Attempt row).
+
+    Returns the final score (0-100).
+    """
+    with transaction.atomic():
+        # Lock the session row so a submit and the expiry sweeper (or two
+        # submits) cannot both grade it; whoever comes second waits here and
+        # then keeps the first result.
+        locked = (
+            QuizSession.objects.select_for_update()
+            .only("score", "passed", "completed_at")
+            .get(pk=session.pk)
+        )
+        if locked.completed_at is not None:
+            session.score = locked.score
+            session.passed = locked.passed
+            session.completed_at = locked.completed_at
+            return session.score
+
+        questions = list(_load_questions(session))
+        attempts = {
+            attempt.question_id: attempt
+            for attempt in Attempt.objects.filter(quiz_session=session)
+        }
+        question_ids = [question.id for question in questions]
+        answers = {**drafts.get_drafts(session.pk, question_ids), **(answers or {})}
+
+        earned_points = 0
+        to_update = []
+        to_create = []
+
+        for question in questions:
+            attempt = attempts.get(question.id)
+            if attempt is None:
+                # Fallback: create attempt if it doesn't exist (shouldn't happen)
+                attempt = Attempt(
+                    student_id=session.student_id,
+                    question_id=question.id,
+                    quiz_session=session,
+                    time_taken=0,
+                )
+                to_create.append(attempt)
+            else:
+                to_update.append(attempt)
+
+            if question.id in answers:
+                attempt.answer_given = answers[question.id]
+
+            _score_attempt(attempt, question)
+            earned_points += attempt.points_earned
+
+        if to_update:
+            Attempt.objects.bulk_update(
+                to_update, ["answer_given", "is_correct", "points_earned"]
+            )
+        if to_create:
+            Attempt.objects.bulk_create(to_create, ignore_conflicts=True)
+
+        mastery.record_attempts(
+            to_update + to_create,
+            topics={question.id: question.topic_id for question in questions},
+        )
+
+        # Maintained at bootstrap and on question edits (see signals.py);
+        # sessions started before the field existed fall back to a sum.
+        max_points = session.max_points or sum(question.points for question in questions)
+        final_score = (earned_points / max_points) * 100 if max_points > 0 else 0
+
+        session.score = final_score
+        session.passed = final_score >= session.quiz.passing_score
+        session.completed_at = timezone.now()
+        # The row is locked and QuizSession.save() only adds a savepoint here
+        QuizSession.objects.filter(pk=session.pk).update(
+            score=session.score, passed=session.passed, completed_at=session.completed_at
+        )
+        rollups.record_daily_activity(
+            session.student_id,
+            timezone.localdate(session.completed_at),
+            to_update + to_create,
+        )
+        transaction.on_commit(lambda: bump_attempt_version(session.student_id))
+
+    drafts.clear_drafts(session.pk, question_ids)
+    drafts.forget_session(session.pk)
+    invalidate_session_payload(session.pk)
+
+    return final_score
+
+
+def save_answers(session, answers):
+    """
+    Upsert many autosaved answers of an open session in bulk.
+
+    The questions are validated against the session's question set by the
+    same query that loads their answer keys. Existing attempts are written
+    with one bulk_update, missing ones with one bulk_create.
+
+    Args:
+        session: open QuizSession
+        answers: `{question_id: answer}` (answers already normalised)
+
+    Returns `(saved_ids, rejected_ids)`.
+    """
+    questions = {
+        question.id: question
+        for question in _load_questions(session).filter(pk__in=answers.keys())
+    }
+    rejected = sorted(qid for qid in answers if qid not in questions)
+    if not questions:
+        return [], rejected
+
+    to_update = []
+    with transaction.atomic():
+        for attempt in Attempt.objects.filter(
+            quiz_session=session, question_id__in=questions.keys()
+        ):
+            attempt.answer_given = answers[attempt.question_id]
+            _score_attempt(attempt, questions[attempt.question_id])
+            to_update.append(attempt)
+
+        existing = {attempt.question_id for attempt in to_update}
+        to_create = []
+        for question_id, question in questions.items():
+            if question_id in existing:
+                continue
+            attempt = Attempt(
+                student_id=session.student_id,
+                question_id=question_id,
+                quiz_session=session,
+                answer_given=answers[question_id],
+            )
+            _score_attempt(attempt, question)
+            to_create.append(attempt)
+
+        if to_update:
+            Attempt.objects.bulk_update(
+                to_update, ["answer_given", "is_correct", "points_earned"]
+            )
+        if to_create:
+            Attempt.objects.bulk_create(to_create, ignore_conflicts=True)
+        transaction.on_commit(lambda: bump_attempt_version(session.student_id))
+
+    return sorted(questions), rejected
+
+
+def flush_session_drafts(session):
+    """
+    Persist buffered autosave drafts of an open session to its Attempt rows.
+
+    Uses one cache round trip plus, only when drafts exist, one query each
+    for questions and attempts and a single bulk_update. Drafts stay in the
+    cache until the session is graded: deleting them here could drop an
+    answer saved while the flush was running.
+    Returns the number of attempts written.
+    """
+    question_ids = list(session.session_questions.values_list("pk", flat=True))
+    pending = drafts.get_drafts(session.pk, question_ids)
+    if not pending:
+        return 0
+
+    questions = {
+        question.id: question
+        for question in _load_questions(session).filter(pk__in=pending.keys())
+    }
+    changed = []
+    for attempt in Attempt.objects.filter(
+        quiz_session=session, question_id__in=pending.keys()
+    ):
+        answer = pending[attempt.question_id]
+        if attempt.answer_given == answer:
+            continue
+        attempt.answer_given = answer
+        _score_attempt(attempt, questions[attempt.question_id])
+        changed.append(attempt)
+
+    if changed:
+        Attempt.objects.bulk_update(
+            changed, ["answer_given", "is_correct", "points_earned"]
+        )
+        bump_attempt_version(session.student_id)
+    return len(changed)
+
+
+def flush_open_session_drafts(batch_size=200):
+    """Periodic flush: write buffered drafts of every open session."""
+    written = 0
+    open_sessions = QuizSession.objects.filter(completed_at__isnull=True).only("pk")
+    for session in open_sessions.iterator(chunk_size=batch_size):
+        written += flush_session_drafts(session)
+    return written
+
+
+def _load_questions(session):
+    return session.session_questions.only(
+        "id", "topic", "question_type", "answer_key", "points"
+    )
+
+
+def _score_attempt(attempt, question):
+    attempt.is_correct = (
+        question.question_type == "pilgan"
+        and attempt.answer_given == question.answer_key
+    )
+    # Mirrors Attempt.save(), which bulk writes bypass
+    attempt.points_earned = question.points if attempt.is_correct else 0
+
+
+SWEEPER_LOCK_KEY = "quiz_sweeper:lock"
+
+
+def expired_sessions(now=None, grace_seconds=120):
+    """
+    Open timed sessions whose time limit (plus grace) has run out.
+
+    Builds one OR-ed condition per distinct time limit, which keeps the
+    filter portable (no interval arithmetic in SQL) and able to use the
+    started_at column directly.
+    """
+    now = now or timezone.now()
+    open_sessions = QuizSession.objects.filter(
+        completed_at__isnull=True, quiz__time_limit_minutes__gt=0
+    )
+    limits = (
+        open_sessions.values_list("quiz__time_limit_minutes", flat=True)
+        .order_by()
+        .distinct()
+    )
+
+    overdue = Q(pk__in=[])
+    for minutes in limits:
+        deadline = now - timedelta(minutes=minutes, seconds=grace_seconds)
+        overdue |= Q(quiz__time_limit_minutes=minutes, started_at__lt=deadline)
+    return open_sessions.filter(overdue)
+
+
+def finalize_expired_sessions(batch_size=100, max_seconds=50, grace_seconds=120):
+    """
+    Grade abandoned timed sessions with whatever answers were saved.
+
+    Works in batches until nothing is left or `max_seconds` have passed.
+    A cache lock keeps two sweeper runs from overlapping, and each session
+    is claimed with SELECT ... FOR UPDATE SKIP LOCKED so a concurrent
+    submit of the same session is never graded twice.
+
+    Returns the number of sessions finalized.
+    """
+    if not cache.add(SWEEPER_LOCK_KEY, 1, timeout=max_seconds + 60):
+        return 0
+
+    finalized = 0
+    skipped = set()
+    started = time.monotonic()
+    try:
+        while time.monotonic() - started < max_seconds:
+            batch = list(
+                expired_sessions(grace_seconds=grace_seconds)
+                .exclude(pk__in=skipped)
+                .order_by("started_at")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+
+            for session_id in batch:
+                if time.monotonic() - started >= max_seconds:
+                    break
+                try:
+                    with transaction.atomic():
+                        session = (
+                            # of=("self",): leave the joined quiz row unlocked
+                            QuizSession.objects.select_for_update(skip_locked=True, of=("self",))
+                            .select_related("quiz")
+                            .filter(pk=session_id, completed_at__isnull=True)
+                            .first()
+                        )
+                        if session is None:
+                            # Being graded elsewhere right now
+                            skipped.add(session_id)
+                            continue
+                        grade_session(session)
+                        finalized += 1
+                except Exception:
+                    logger.exception("Could not finalize quiz session %s", session_id)
+                    skipped.add(session_id)
+    finally:
+        cache.delete(SWEEPER_LOCK_KEY)
+
+    return finalized
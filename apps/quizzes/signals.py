@@ -0,0 +1,76 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.questions.models import Question
+from apps.quizzes.models import Quiz, QuizSession
+from apps.quizzes.payload import invalidate_session_payload
+
+
+@receiver(post_save, sender=Question)
+# pre_delete: the session M2M rows are already gone by post_delete
+@receiver(pre_delete, sender=Question)
+def invalidate_payloads_on_question_change(sender, instance, **kwargs):
+    """Edited questions must not render from a stale session payload."""
+    session_ids = QuizSession.session_questions.through.objects.filter(
+        question_id=instance.pk,
+        quizsession__completed_at__isnull=True,
+    ).values_list("quizsession_id", flat=True)
+    session_ids = list(session_ids)
+    if session_ids:
+        invalidate_session_payload(*session_ids)
+
+
+@receiver(m2m_changed, sender=Quiz.questions.through)
+@receiver(m2m_changed, sender=QuizSession.session_questions.through)
+def refresh_totals_on_questions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep `total_questions`/`max_points` in step with the question M2M."""
+    owner = Quiz if sender is Quiz.questions.through else QuizSession
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            owner.refresh_totals([instance.pk])
+            # The caller's instance must not keep reporting the old totals
+            instance.refresh_from_db(fields=["total_questions", "max_points"])
+        return
+
+    # Reverse side (question.quizzes.add/remove/clear): the owners are in
+    # pk_set, except for clear, where they must be read before the rows go.
+    if action == "pre_clear":
+        field = "quiz_id" if owner is Quiz else "quizsession_id"
+        instance._cleared_owner_ids = list(
+            sender.objects.filter(question_id=instance.pk).values_list(field, flat=True)
+        )
+    elif action == "post_clear":
+        owner.refresh_totals(instance.__dict__.pop("_cleared_owner_ids", []))
+    elif action in ("post_add", "post_remove"):
+        owner.refresh_totals(pk_set)
+
+
+def _owner_ids(question):
+    quiz_ids = list(
+        Quiz.questions.through.objects.filter(question_id=question.pk)
+        .values_list("quiz_id", flat=True)
+    )
+    session_ids = list(
+        QuizSession.session_questions.through.objects.filter(
+            question_id=question.pk, quizsession__completed_at__isnull=True
+        ).values_list("quizsession_id", flat=True)
+    )
+    return quiz_ids, session_ids
+
+
+@receiver(pre_delete, sender=Question)
+def remember_question_owners(sender, instance, **kwargs):
+    """The M2M rows are cascaded away before post_delete; note the owners now."""
+    instance._owner_ids = _owner_ids(instance)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def refresh_totals_on_question_change(sender, instance, created=False, **kwargs):
+    """A question's points, or its removal, change the totals of its owners."""
+    if created:
+        return
+    quiz_ids, session_ids = getattr(instance, "_owner_ids", None) or _owner_ids(instance)
+    Quiz.refresh_totals(quiz_ids)
+    # Completed sessions keep the totals they were graded with
+    QuizSession.refresh_totals(session_ids)
@@ -0,0 +1,15 @@
+from celery import shared_task
+
+from apps.quizzes.services import finalize_expired_sessions, flush_open_session_drafts
+
+
+@shared_task
+def flush_quiz_drafts():
+    """Periodic flush of buffered autosave answers (see CELERY_BEAT_SCHEDULE)."""
+    return flush_open_session_drafts()
+
+
+@shared_task
+def finalize_expired_quiz_sessions():
+    """Grade abandoned timed sessions (see CELERY_BEAT_SCHEDULE)."""
+    return finalize_expired_sessions()
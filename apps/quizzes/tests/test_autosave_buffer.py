@@ -0,0 +1,103 @@
+"""
+Tests for write-behind autosave (drafts buffered in the cache).
+"""
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from apps.quizzes.models import QuizSession
+from apps.quizzes.services import flush_open_session_drafts
+from apps.analytics.models import Attempt
+from apps.accounts.models import User
+
+
+@pytest.fixture(autouse=True)
+def write_behind():
+    cache.clear()
+    with override_settings(QUIZ_AUTOSAVE_WRITE_BEHIND=True):
+        yield
+    cache.clear()
+
+
+@pytest.fixture
+def open_session(student, custom_quiz_all_questions):
+    return QuizSession.objects.create(student=student, quiz=custom_quiz_all_questions, grade=6)
+
+
+def _save(client, session, question_id, answer):
+    return client.post(reverse('quizzes:save_answer'), {
+        'session_id': session.pk,
+        'question_id': question_id,
+        'answer': answer,
+    })
+
+
+@pytest.mark.django_db
+class TestWriteBehindAutosave:
+    """Autosave buffers drafts instead of writing Attempt rows."""
+
+    def test_autosave_does_not_touch_attempts(self, student_client, open_session):
+        question = open_session.session_questions.first()
+
+        response = _save(student_client, open_session, question.pk, 'b')
+
+        assert response.status_code == 200
+        assert response.json()['answer_saved'] == 'B'
+        attempt = Attempt.objects.get(quiz_session=open_session, question=question)
+        assert attempt.answer_given == ''
+
+    def test_warm_autosave_skips_quiz_queries(self, student_client, open_session, django_assert_max_num_queries):
+        question = open_session.session_questions.first()
+        _save(student_client, open_session, question.pk, 'A')
+
+        # Only the session/user lookups done by the auth middleware remain
+        with django_assert_max_num_queries(2):
+            _save(student_client, open_session, question.pk, 'C')
+
+    def test_rejects_question_outside_session(self, student_client, open_session, topic):
+        from apps.questions.models import Question
+        other = Question.objects.create(
+            topic=topic, question_text='Lain', question_type='essay',
+            difficulty='mudah', answer_key='x'
+        )
+        assert _save(student_client, open_session, other.pk, 'A').status_code == 400
+
+    def test_rejects_other_student(self, client, open_session):
+        intruder = User.objects.create_user(
+            username='intruder', password='password123', role=User.Role.STUDENT, grade=6
+        )
+        client.force_login(intruder)
+        question = open_session.session_questions.first()
+        assert _save(client, open_session, question.pk, 'A').status_code == 403
+
+    def test_reload_shows_drafts(self, student_client, open_session):
+        question = open_session.session_questions.first()
+        _save(student_client, open_session, question.pk, 'D')
+
+        response = student_client.get(reverse('quizzes:take_quiz', args=[open_session.quiz.pk]))
+
+        assert response.context['saved_answers'][question.pk] == 'D'
+
+    def test_submit_grades_drafts_in_one_batch(self, student_client, open_session):
+        for question in open_session.session_questions.all():
+            _save(student_client, open_session, question.pk, question.answer_key)
+
+        student_client.post(reverse('quizzes:take_quiz', args=[open_session.quiz.pk]))
+
+        open_session.refresh_from_db()
+        assert open_session.score == 100
+        assert all(
+            a.answer_given == 'A' for a in Attempt.objects.filter(quiz_session=open_session)
+        )
+
+    def test_periodic_flush_writes_drafts(self, student_client, open_session):
+        question = open_session.session_questions.first()
+        _save(student_client, open_session, question.pk, 'A')
+
+        assert flush_open_session_drafts() == 1
+        attempt = Attempt.objects.get(quiz_session=open_session, question=question)
+        assert attempt.answer_given == 'A'
+        assert attempt.is_correct is True
+        # Unchanged drafts are not rewritten
+        assert flush_open_session_drafts() == 0
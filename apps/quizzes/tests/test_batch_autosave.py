@@ -0,0 +1,85 @@
+"""
+Tests for the multi-answer autosave endpoint.
+"""
+import json
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.quizzes.models import QuizSession
+from apps.quizzes import drafts
+from apps.analytics.models import Attempt
+
+
+@pytest.fixture
+def open_session(student, custom_quiz_all_questions):
+    return QuizSession.objects.create(student=student, quiz=custom_quiz_all_questions, grade=6)
+
+
+def _save_batch(client, session, answers):
+    return client.post(
+        reverse('quizzes:save_answers'),
+        data=json.dumps({'session_id': session.pk, 'answers': answers}),
+        content_type='application/json',
+    )
+
+
+@pytest.mark.django_db
+class TestSaveAnswersBatchView:
+    """Test batch autosave."""
+
+    def test_saves_all_answers(self, student_client, open_session):
+        ids = list(open_session.session_questions.values_list('pk', flat=True))
+
+        response = _save_batch(student_client, open_session, {str(qid): 'a' for qid in ids})
+
+        assert response.status_code == 200
+        assert response.json()['saved'] == sorted(ids)
+        attempts = Attempt.objects.filter(quiz_session=open_session)
+        assert all(a.answer_given == 'A' and a.is_correct for a in attempts)
+        assert all(a.points_earned == 10 for a in attempts)
+
+    def test_reports_questions_outside_session(self, student_client, open_session):
+        qid = open_session.session_questions.first().pk
+
+        response = _save_batch(student_client, open_session, {str(qid): 'B', '999999': 'A'})
+
+        assert response.json()['saved'] == [qid]
+        assert response.json()['rejected'] == [999999]
+
+    def test_rejects_malformed_payload(self, student_client, open_session):
+        response = student_client.post(
+            reverse('quizzes:save_answers'), data='not json', content_type='application/json'
+        )
+        assert response.status_code == 400
+
+    def test_rejects_completed_session(self, student_client, open_session):
+        open_session.completed_at = open_session.started_at
+        open_session.save()
+        qid = open_session.session_questions.first().pk
+
+        assert _save_batch(student_client, open_session, {str(qid): 'A'}).status_code == 404
+
+    def test_query_count_independent_of_batch_size(self, student_client, open_session):
+        ids = list(open_session.session_questions.values_list('pk', flat=True))
+        counts = []
+        for batch in (ids[:1], ids):
+            with CaptureQueriesContext(connection) as ctx:
+                _save_batch(student_client, open_session, {str(qid): 'C' for qid in batch})
+            counts.append(len(ctx.captured_queries))
+
+        assert counts[0] == counts[1]
+
+    def test_write_behind_buffers_batch(self, student_client, open_session):
+        cache.clear()
+        ids = list(open_session.session_questions.values_list('pk', flat=True))
+        with override_settings(QUIZ_AUTOSAVE_WRITE_BEHIND=True):
+            _save_batch(student_client, open_session, {str(qid): 'D' for qid in ids})
+
+        assert drafts.get_drafts(open_session.pk, ids) == {qid: 'D' for qid in ids}
+        assert not Attempt.objects.filter(quiz_session=open_session, answer_given='D').exists()
+        cache.clear()
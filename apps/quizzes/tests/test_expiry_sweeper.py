@@ -0,0 +1,84 @@
+"""
+Tests for the expired timed session sweeper.
+"""
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.quizzes.models import QuizSession
+from apps.quizzes.services import SWEEPER_LOCK_KEY, finalize_expired_sessions
+from apps.analytics.models import Attempt
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _start(student, quiz, minutes_ago):
+    session = QuizSession.objects.create(student=student, quiz=quiz, grade=6)
+    QuizSession.objects.filter(pk=session.pk).update(
+        started_at=timezone.now() - timedelta(minutes=minutes_ago)
+    )
+    return session
+
+
+@pytest.mark.django_db
+class TestFinalizeExpiredSessions:
+    """Test the sweeper picks only overdue open sessions."""
+
+    def test_grades_overdue_session_with_saved_answers(self, student, custom_quiz_all_questions):
+        session = _start(student, custom_quiz_all_questions, minutes_ago=45)
+        Attempt.objects.filter(quiz_session=session).update(answer_given='A')
+
+        assert finalize_expired_sessions() == 1
+
+        session.refresh_from_db()
+        assert session.completed_at is not None
+        assert session.score == 100
+        assert session.passed is True
+
+    def test_leaves_running_and_untimed_sessions_open(self, student, custom_quiz_all_questions, custom_quiz_with_count):
+        running = _start(student, custom_quiz_all_questions, minutes_ago=10)
+        custom_quiz_with_count.time_limit_minutes = 0
+        custom_quiz_with_count.save()
+        untimed = _start(student, custom_quiz_with_count, minutes_ago=600)
+
+        assert finalize_expired_sessions() == 0
+
+        running.refresh_from_db()
+        untimed.refresh_from_db()
+        assert running.completed_at is None
+        assert untimed.completed_at is None
+
+    def test_respects_grace_period(self, student, custom_quiz_all_questions):
+        _start(student, custom_quiz_all_questions, minutes_ago=31)
+
+        assert finalize_expired_sessions(grace_seconds=120) == 0
+        assert finalize_expired_sessions(grace_seconds=0) == 1
+
+    def test_skips_when_another_run_holds_the_lock(self, student, custom_quiz_all_questions):
+        _start(student, custom_quiz_all_questions, minutes_ago=45)
+        cache.add(SWEEPER_LOCK_KEY, 1)
+
+        assert finalize_expired_sessions() == 0
+
+    def test_already_completed_session_is_not_regraded(self, student, custom_quiz_all_questions):
+        from apps.quizzes.services import grade_session
+        session = _start(student, custom_quiz_all_questions, minutes_ago=45)
+        grade_session(session)
+        Attempt.objects.filter(quiz_session=session).update(answer_given='A')
+
+        assert grade_session(QuizSession.objects.get(pk=session.pk)) == 0
+
+    def test_management_command(self, student, custom_quiz_all_questions, capsys):
+        _start(student, custom_quiz_all_questions, minutes_ago=45)
+
+        call_command('finalize_expired_sessions', '--batch-size', '10')
+
+        assert 'Finalized 1 expired sessions.' in capsys.readouterr().out
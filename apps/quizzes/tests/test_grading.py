@@ -0,0 +1,142 @@
+"""
+Tests for bulk session grading (apps.quizzes.services).
+"""
+import threading
+import time
+
+import pytest
+from django.db import OperationalError, connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.quizzes.models import Quiz, QuizSession
+from apps.quizzes.services import grade_session, parse_answers
+from apps.questions.models import Question
+from apps.analytics.models import Attempt, DailyActivity, MasteryRecord
+
+
+def _make_session(subject, topic, admin_user, student, size):
+    questions = Question.objects.bulk_create([
+        Question(
+            topic=topic,
+            question_text=f'Tryout {i+1}',
+            question_type='pilgan',
+            difficulty='mudah',
+            options=['A', 'B', 'C', 'D'],
+            answer_key='A',
+            points=10
+        )
+        for i in range(size)
+    ])
+    quiz = Quiz.objects.create(
+        title=f'Tryout {size}',
+        subject=subject,
+        grade=6,
+        quiz_type=Quiz.QuizType.CUSTOM,
+        passing_score=70,
+        created_by=admin_user
+    )
+    quiz.questions.set(questions)
+    return QuizSession.objects.select_related('quiz').get(
+        pk=QuizSession.objects.create(student=student, quiz=quiz, grade=6).pk
+    )
+
+
+@pytest.mark.django_db
+class TestGradeSession:
+    """Test single-pass grading."""
+
+    def test_parse_answers_normalises_and_skips_other_fields(self):
+        answers = parse_answers({
+            'question_3': ' b ',
+            'question_x': 'A',
+            'csrfmiddlewaretoken': 'abc',
+        })
+        assert answers == {3: 'B'}
+
+    def test_scores_and_updates_attempts(self, subject, topic, admin_user, student):
+        session = _make_session(subject, topic, admin_user, student, 4)
+        ids = list(session.session_questions.values_list('pk', flat=True))
+        answers = {ids[0]: 'A', ids[1]: 'A', ids[2]: 'A', ids[3]: 'C'}
+
+        score = grade_session(session, answers)
+
+        session.refresh_from_db()
+        assert score == 75
+        assert session.passed is True
+        assert session.completed_at is not None
+        attempts = Attempt.objects.filter(quiz_session=session)
+        assert sum(a.points_earned for a in attempts) == 30
+        assert attempts.get(question_id=ids[3]).answer_given == 'C'
+
+    def test_without_answers_uses_saved_attempts(self, subject, topic, admin_user, student):
+        session = _make_session(subject, topic, admin_user, student, 2)
+        Attempt.objects.filter(quiz_session=session).update(answer_given='A')
+
+        score = grade_session(session)
+
+        assert score == 100
+
+    def test_query_count_independent_of_question_count(self, subject, topic, admin_user, student):
+        counts = []
+        for size in (5, 100):
+            session = _make_session(subject, topic, admin_user, student, size)
+            answers = {
+                qid: 'A' for qid in session.session_questions.values_list('pk', flat=True)
+            }
+            with CaptureQueriesContext(connection) as ctx:
+                grade_session(session, answers)
+            counts.append(len(ctx.captured_queries))
+
+        # Savepoint + release (the test runs inside a transaction), then:
+        #  1 lock the session row     2 load questions    3 load attempts
+        #  4 bulk_update attempts
+        #  5-6 question -> KD and tag links (mastery targets)
+        #  7-9 mastery records: insert missing, lock, bulk_update (user-014)
+        #  10 mark the session completed
+        #  11-12 daily activity row: insert missing, increment (user-017)
+        assert counts == [14, 14]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_grading_counts_once(subject, topic, admin_user, student):
+    """
+    Simultaneous submits (or a submit racing the sweeper) grade the session
+    once. The row lock is what is tested on PostgreSQL; SQLite serialises
+    the writers itself.
+    """
+    session = _make_session(subject, topic, admin_user, student, 5)
+    answers = {qid: 'A' for qid in session.session_questions.values_list('pk', flat=True)}
+    threads_count = 4
+    barrier = threading.Barrier(threads_count)
+    scores = []
+    errors = []
+
+    def submit():
+        try:
+            barrier.wait()
+            while True:
+                try:
+                    own = QuizSession.objects.select_related('quiz').get(pk=session.pk)
+                    scores.append(grade_session(own, answers))
+                    break
+                except OperationalError as exc:
+                    # The in-memory SQLite test database fails fast on table
+                    # locks where a server database would block; wait and retry.
+                    if 'locked' not in str(exc):
+                        raise
+                    time.sleep(0.01)
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=submit) for _ in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert scores == [100] * threads_count
+    assert DailyActivity.objects.get(student=student).attempts == 5
+    assert MasteryRecord.objects.get(student=student, scope=MasteryRecord.Scope.TOPIC).total == 5
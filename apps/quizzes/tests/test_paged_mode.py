@@ -0,0 +1,81 @@
+"""
+Tests for paged (one question at a time) quiz mode.
+"""
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from apps.quizzes.models import QuizSession
+from apps.accounts.models import User
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def open_session(student, custom_quiz_all_questions):
+    return QuizSession.objects.create(student=student, quiz=custom_quiz_all_questions, grade=6)
+
+
+def _partial_url(session, position):
+    return reverse('quizzes:take_quiz_question', args=[session.quiz.pk, session.pk, position])
+
+
+@pytest.mark.django_db
+class TestPagedQuizMode:
+    """Test HTMX question partials."""
+
+    def test_paged_page_renders_first_question_only(self, student_client, open_session):
+        url = reverse('quizzes:take_quiz', args=[open_session.quiz.pk])
+
+        response = student_client.get(url, {'mode': 'paged'})
+
+        assert response.context['paged'] is True
+        assert response.context['question']['position'] == 1
+        assert response.content.decode().count('class="quiz-answer') == 4
+        assert _partial_url(open_session, 2) in response.content.decode()
+
+    def test_full_page_is_default_for_short_quizzes(self, student_client, open_session):
+        url = reverse('quizzes:take_quiz', args=[open_session.quiz.pk])
+
+        response = student_client.get(url)
+
+        assert response.context['paged'] is False
+        assert response.content.decode().count('class="quiz-answer') == 20
+
+    def test_partial_is_cacheable_and_links_neighbours(self, student_client, open_session):
+        response = student_client.get(_partial_url(open_session, 2), HTTP_HX_REQUEST='true')
+
+        assert response.status_code == 200
+        assert 'private' in response['Cache-Control']
+        assert 'max-age=300' in response['Cache-Control']
+        content = response.content.decode()
+        assert _partial_url(open_session, 1) in content
+        assert _partial_url(open_session, 3) in content
+
+    def test_partial_out_of_range_returns_404(self, student_client, open_session):
+        assert student_client.get(_partial_url(open_session, 6)).status_code == 404
+
+    def test_partial_hidden_from_other_students(self, client, open_session):
+        intruder = User.objects.create_user(
+            username='intruder', password='password123', role=User.Role.STUDENT, grade=6
+        )
+        client.force_login(intruder)
+        assert client.get(_partial_url(open_session, 1)).status_code == 404
+
+    def test_submit_with_partial_form_keeps_autosaved_answers(self, student_client, open_session):
+        from apps.analytics.models import Attempt
+        Attempt.objects.filter(quiz_session=open_session).update(answer_given='A')
+        first = open_session.session_questions.first()
+
+        student_client.post(
+            reverse('quizzes:take_quiz', args=[open_session.quiz.pk]),
+            {f'question_{first.pk}': 'A'}
+        )
+
+        open_session.refresh_from_db()
+        assert open_session.score == 100
@@ -0,0 +1,83 @@
+"""
+Tests for the maintained question count / max points on Quiz and QuizSession.
+"""
+import pytest
+from django.contrib.admin.sites import site
+
+from apps.quizzes.models import Quiz, QuizSession
+from apps.quizzes.services import grade_session
+from apps.questions.models import Question
+
+
+@pytest.mark.django_db
+class TestQuizTotals:
+
+    def test_set_add_remove_clear(self, custom_quiz_all_questions, multiple_questions):
+        quiz = custom_quiz_all_questions
+        assert (quiz.total_questions, quiz.max_points) == (5, 50)
+
+        quiz.questions.remove(multiple_questions[0])
+        assert (quiz.total_questions, quiz.max_points) == (4, 40)
+
+        quiz.questions.clear()
+        quiz.refresh_from_db()
+        assert (quiz.total_questions, quiz.max_points) == (0, 0)
+
+    def test_reverse_side_changes(self, custom_quiz_all_questions, multiple_questions):
+        question = multiple_questions[0]
+
+        question.quizzes.clear()
+        custom_quiz_all_questions.refresh_from_db()
+        assert custom_quiz_all_questions.total_questions == 4
+
+        question.quizzes.add(custom_quiz_all_questions)
+        custom_quiz_all_questions.refresh_from_db()
+        assert custom_quiz_all_questions.total_questions == 5
+
+    def test_question_points_and_delete(self, custom_quiz_all_questions, multiple_questions):
+        question = multiple_questions[0]
+        question.points = 30
+        question.save()
+        custom_quiz_all_questions.refresh_from_db()
+        assert custom_quiz_all_questions.max_points == 70
+
+        question.delete()
+        custom_quiz_all_questions.refresh_from_db()
+        assert (custom_quiz_all_questions.total_questions, custom_quiz_all_questions.max_points) == (4, 40)
+
+    def test_properties_read_without_queries(self, custom_quiz_all_questions, django_assert_num_queries):
+        quiz = Quiz.objects.get(pk=custom_quiz_all_questions.pk)
+        admin = site._registry[Quiz]
+
+        with django_assert_num_queries(0):
+            assert quiz.total_points == 50
+            assert quiz.get_question_count == 5
+            assert admin.question_count_display(quiz) == 5
+
+
+@pytest.mark.django_db
+class TestSessionTotals:
+
+    def test_bootstrap_sets_totals(self, custom_quiz_with_count, student):
+        session = QuizSession.objects.create(student=student, quiz=custom_quiz_with_count, grade=6)
+        session.refresh_from_db()
+
+        assert (session.total_questions, session.max_points) == (3, 30)
+
+    def test_grading_uses_session_max_points(self, subject_quiz, student):
+        session = QuizSession.objects.create(student=student, quiz=subject_quiz, grade=6)
+        question_ids = list(session.session_questions.values_list('pk', flat=True))
+
+        score = grade_session(session, {question_ids[0]: 'A'})
+
+        assert score == pytest.approx(100 / 3)
+
+    def test_open_session_follows_question_points(self, subject_quiz, student):
+        session = QuizSession.objects.create(student=student, quiz=subject_quiz, grade=6)
+        question = Question.objects.get(pk=session.session_questions.values_list('pk', flat=True)[0])
+
+        question.points = 40
+        question.save()
+        session.refresh_from_db()
+
+        assert session.max_points == 60
@@ -0,0 +1,95 @@
+"""
+Benchmark tests for QuizSession bootstrap (question selection + attempts).
+"""
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.quizzes.models import Quiz, QuizSession
+from apps.questions.models import Question
+from apps.questions.sampling import _pool_cache_key, get_question_id_pool
+from apps.analytics.models import Attempt
+
+
+@pytest.fixture
+def question_bank(topic):
+    """Create 100 questions in one statement."""
+    return Question.objects.bulk_create([
+        Question(
+            topic=topic,
+            question_text=f'Bank question {i+1}',
+            question_type='pilgan',
+            difficulty='mudah',
+            options=['A', 'B', 'C', 'D'],
+            answer_key='A',
+            points=10
+        )
+        for i in range(100)
+    ])
+
+
+def _count_bootstrap_queries(quiz, student):
+    # Start cold so the subject ID pool lookup is counted every time
+    cache.clear()
+    with CaptureQueriesContext(connection) as ctx:
+        session = QuizSession.objects.create(student=student, quiz=quiz, grade=6)
+    return session, len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+class TestSessionBootstrapQueryCount:
+    """Session start must cost a fixed number of queries."""
+
+    @pytest.mark.parametrize('quiz_type', [Quiz.QuizType.SUBJECT_BASED, Quiz.QuizType.CUSTOM])
+    def test_query_count_flat_up_to_100_questions(self, subject, admin_user, student, question_bank, quiz_type):
+        """Query count for 5, 20 and 100 questions is identical."""
+        counts = []
+        for question_count in (5, 20, 100):
+            quiz = Quiz.objects.create(
+                title=f'Benchmark {question_count}',
+                subject=subject,
+                grade=6,
+                quiz_type=quiz_type,
+                question_count=question_count,
+                created_by=admin_user
+            )
+            if quiz_type == Quiz.QuizType.CUSTOM:
+                quiz.questions.set(question_bank)
+
+            session, queries = _count_bootstrap_queries(quiz, student)
+            counts.append(queries)
+
+            assert session.session_questions.count() == question_count
+            assert Attempt.objects.filter(quiz_session=session).count() == question_count
+
+        assert counts[0] == counts[1] == counts[2]
+
+    def test_rerunning_bootstrap_does_not_duplicate(self, subject_quiz, student):
+        """Populating an existing session again is a no-op for its rows."""
+        session = QuizSession.objects.create(student=student, quiz=subject_quiz, grade=6)
+        question_ids = list(session.session_questions.values_list('pk', flat=True))
+
+        session._generate_attempts(question_ids)
+
+        assert Attempt.objects.filter(quiz_session=session).count() == len(question_ids)
+
+    def test_stale_pool_never_yields_deleted_questions(self, subject, admin_user, student, question_bank):
+        """A pool cached elsewhere may still list deleted questions; they are skipped."""
+        cache.clear()
+        stale = get_question_id_pool(subject.pk, 6)
+        deleted = question_bank[:10]
+        Question.objects.filter(pk__in=[q.pk for q in deleted]).delete()
+        # Another process's cache never saw the invalidation
+        cache.set(_pool_cache_key(subject.pk, 6), stale)
+        quiz = Quiz.objects.create(
+            title='Stale pool', subject=subject, grade=6,
+            quiz_type=Quiz.QuizType.SUBJECT_BASED, question_count=95,
+            created_by=admin_user,
+        )
+
+        session = QuizSession.objects.create(student=student, quiz=quiz, grade=6)
+
+        ids = set(session.session_questions.values_list('pk', flat=True))
+        assert len(ids) == 90
+        assert not ids & {q.pk for q in deleted}
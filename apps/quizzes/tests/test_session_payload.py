@@ -0,0 +1,71 @@
+"""
+Tests for the cached per-session question payload.
+"""
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from apps.quizzes.models import QuizSession
+from apps.quizzes.payload import get_session_payload
+from apps.quizzes.services import grade_session
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def open_session(student, custom_quiz_all_questions):
+    return QuizSession.objects.create(student=student, quiz=custom_quiz_all_questions, grade=6)
+
+
+@pytest.mark.django_db
+class TestSessionPayload:
+    """Test payload contents, caching and invalidation."""
+
+    def test_payload_has_no_answer_keys(self, open_session):
+        payload = get_session_payload(open_session)
+
+        assert len(payload) == 5
+        assert [item['position'] for item in payload] == [1, 2, 3, 4, 5]
+        assert payload[0]['options'][0] == {'key': 'A', 'text': 'A'}
+        assert all('answer_key' not in item and 'explanation' not in item for item in payload)
+
+    def test_payload_built_at_session_start(self, student, custom_quiz_all_questions,
+                                            django_capture_on_commit_callbacks,
+                                            django_assert_num_queries):
+        with django_capture_on_commit_callbacks(execute=True):
+            session = QuizSession.objects.create(student=student, quiz=custom_quiz_all_questions, grade=6)
+
+        with django_assert_num_queries(0):
+            assert len(get_session_payload(session)) == 5
+
+    def test_reload_renders_with_two_quiz_queries(self, student_client, open_session, django_assert_max_num_queries):
+        url = reverse('quizzes:take_quiz', args=[open_session.quiz.pk])
+        student_client.get(url)
+
+        # auth session + user, then open session (with quiz) + saved answers
+        with django_assert_max_num_queries(4):
+            response = student_client.get(url)
+
+        assert response.status_code == 200
+        assert len(response.context['questions']) == 5
+
+    def test_editing_a_question_invalidates_payload(self, open_session):
+        get_session_payload(open_session)
+        question = open_session.session_questions.first()
+        question.question_text = 'Soal yang diperbaiki'
+        question.save()
+
+        texts = [item['question_text'] for item in get_session_payload(open_session)]
+        assert 'Soal yang diperbaiki' in texts
+
+    def test_grading_invalidates_payload(self, open_session, django_assert_num_queries):
+        get_session_payload(open_session)
+        grade_session(open_session)
+
+        with django_assert_num_queries(1):
+            get_session_payload(open_session)
@@ -0,0 +1,89 @@
+"""
+Tests for the one-open-session-per-(student, quiz) guarantee.
+"""
+import threading
+import time
+
+import pytest
+from django.db import IntegrityError, OperationalError, connection, transaction
+
+from apps.analytics.models import Attempt
+from apps.quizzes.models import QuizSession
+
+
+@pytest.mark.django_db
+class TestOpenSessionConstraint:
+
+    def test_duplicate_open_session_rejected(self, subject_quiz, student):
+        QuizSession.objects.create(student=student, quiz=subject_quiz, grade=6)
+
+        with pytest.raises(IntegrityError), transaction.atomic():
+            QuizSession.objects.create(student=student, quiz=subject_quiz, grade=6)
+
+    def test_completed_sessions_do_not_count(self, subject_quiz, student):
+        first, created = QuizSession.start(student, subject_quiz, defaults={'grade': 6})
+        first.completed_at = first.started_at
+        first.save()
+
+        second, created = QuizSession.start(student, subject_quiz, defaults={'grade': 6})
+
+        assert created is True
+        assert second.pk != first.pk
+
+    def test_start_resumes_open_session(self, subject_quiz, student):
+        first, created = QuizSession.start(student, subject_quiz, defaults={'grade': 6})
+        again, created_again = QuizSession.start(student, subject_quiz, defaults={'grade': 6})
+
+        assert created is True
+        assert created_again is False
+        assert again.pk == first.pk
+
+    def test_start_reraises_integrity_errors_that_are_not_races(self, subject_quiz, student, monkeypatch):
+        def create(**kwargs):
+            raise IntegrityError("FOREIGN KEY constraint failed")
+
+        monkeypatch.setattr(QuizSession.objects, 'create', create)
+
+        with pytest.raises(IntegrityError, match="FOREIGN KEY"):
+            QuizSession.start(student, subject_quiz, defaults={'grade': 6})
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_start_creates_one_session(subject_quiz, student):
+    """Many simultaneous starts all end up on the same open session."""
+    threads_count = 8
+    barrier = threading.Barrier(threads_count)
+    results = []
+    errors = []
+
+    def start():
+        try:
+            barrier.wait()
+            while True:
+                try:
+                    session, _ = QuizSession.start(student, subject_quiz, defaults={'grade': 6})
+                    break
+                except OperationalError as exc:
+                    # The in-memory SQLite test database fails fast on table
+                    # locks where a server database would block; wait and retry.
+                    if 'locked' not in str(exc):
+                        raise
+                    time.sleep(0.01)
+            results.append(session.pk)
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=start) for _ in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(set(results)) == 1
+    assert QuizSession.objects.filter(
+        student=student, quiz=subject_quiz, completed_at__isnull=True
+    ).count() == 1
+    assert Attempt.objects.filter(student=student).count() == subject_quiz.question_count
@@ -3,6 +3,7 @@ from .views import (
     # Student/Proxy Quiz Taking
     StudentQuizListView,
     QuizTakeView,
+    QuizQuestionPartialView,
     QuizResultView,
     ProxyQuizSelectStudentView,
 
@@ -10,7 +11,7 @@ from .views import (
     SubjectQuizCreateView,
     CustomQuizCreateView,
 )
-from .views_ajax import SaveAnswerView
+from .views_ajax import SaveAnswerView, SaveAnswersBatchView
 
 app_name = "quizzes"
 
@@ -30,9 +31,19 @@ urlpatterns = [
     # Take a quiz (supports ?student_id=X&proxy=1 for parent proxy mode)
     path("<int:pk>/take/", QuizTakeView.as_view(), name="take_quiz"),
 
+    # Paged mode (HTMX): one question partial per position in the session
+    path(
+        "<int:pk>/take/<int:session_id>/q/<int:position>/",
+        QuizQuestionPartialView.as_view(),
+        name="take_quiz_question",
+    ),
+
     # AJAX: Save individual answer (auto-save)
     path("save-answer/", SaveAnswerView.as_view(), name="save_answer"),
 
+    # AJAX: Save many answers at once (debounced auto-save)
+    path("save-answers/", SaveAnswersBatchView.as_view(), name="save_answers"),
+
     # View quiz result (supports ?student_id=X&proxy=1 for parent proxy mode)
     path("<int:pk>/result/", QuizResultView.as_view(), name="result"),
 
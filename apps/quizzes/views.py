@@ -6,6 +6,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models import Q
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
 from django.http import Http404, HttpResponseRedirect, JsonResponse
 
 from apps.analytics.models import Attempt
@@ -13,7 +14,11 @@ from apps.accounts.mixins import ParentOrAdminMixin, StudentRequiredMixin, Paren
 from apps.accounts.models import ParentStudent
 from .models import Quiz, QuizSession
 from .forms import SubjectQuizForm
+from .services import grade_session, parse_answers
+from . import drafts
+from .payload import get_session_payload
 from apps.questions.models import Question
+from apps.questions.search import search_questions
 
 User = get_user_model()
 
@@ -71,7 +76,7 @@ class StudentQuizListView(LoginRequiredMixin, ListView):
         return Quiz.objects.filter(
             grade=student.grade, 
             is_active=True
-        ).order_by('-created_at')
+        ).select_related('subject').order_by('-created_at')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -91,6 +96,7 @@ class QuizTakeView(LoginRequiredMixin, DetailView):
     model = Quiz
     template_name = "quizzes/take_quiz.html"
     context_object_name = "quiz"
+    PAGED_MIN_QUESTIONS = 50
 
     def get_student(self):
         """Get the student and determine proxy mode."""
@@ -117,22 +123,57 @@ class QuizTakeView(LoginRequiredMixin, DetailView):
         
         raise Http404("Akses tidak valid.")
 
-    def get(self, request, *args, **kwargs):
-        self.object = self.get_object()
-        student, is_proxy, proxy_user = self.get_student()
-        
-        # Check for existing active session
-        session, created = QuizSession.objects.get_or_create(
-            student=student, 
-            quiz=self.object,
+    def get_session(self, student, is_proxy, proxy_user):
+        """
+        Return (session, created) for the student's open session.
+        
+        Resuming loads the session together with its quiz in one query; the
+        quiz is only fetched separately when a new session has to be started.
+        """
+        session = QuizSession.objects.select_related('quiz').filter(
+            student=student,
+            quiz_id=self.kwargs['pk'],
             completed_at__isnull=True,
+        ).first()
+        if session is not None:
+            return session, False
+        
+        quiz = self.get_object()
+        return QuizSession.start(
+            student,
+            quiz,
             defaults={
                 'score': 0,
-                'grade': student.grade or self.object.grade,
+                'grade': student.grade or quiz.grade,
                 'is_proxy_mode': is_proxy,
                 'proxy_user': proxy_user if is_proxy else None,
             }
         )
+
+    def is_paged(self, total_questions):
+        """Paged (one question at a time) for long quizzes, or on request via ?mode=."""
+        mode = self.request.GET.get('mode')
+        if mode in ('paged', 'all'):
+            return mode == 'paged'
+        return total_questions >= self.PAGED_MIN_QUESTIONS
+
+    def get_page_context(self, questions, position, student, is_proxy):
+        """Context for the question at `position` (1-based) in paged mode."""
+        total = len(questions)
+        return {
+            'question': questions[position - 1],
+            'total_questions': total,
+            'prev_position': position - 1 if position > 1 else None,
+            'next_position': position + 1 if position < total else None,
+            'proxy_query': f'?student_id={student.pk}&proxy=1' if is_proxy else '',
+        }
+
+    def get(self, request, *args, **kwargs):
+        student, is_proxy, proxy_user = self.get_student()
+        
+        # Check for existing active session
+        session, created = self.get_session(student, is_proxy, proxy_user)
+        self.object = session.quiz
         
         # Update proxy info if existing session
         if not created and is_proxy and not session.is_proxy_mode:
@@ -149,19 +190,31 @@ class QuizTakeView(LoginRequiredMixin, DetailView):
                 messages.warning(request, "Waktu habis!")
                 return self.finish_quiz(session)
 
+        # Question set is fixed per session: render from the cached payload
+        questions = get_session_payload(session)
+        question_ids = [question['id'] for question in questions]
+
         context = self.get_context_data(object=self.object)
         context['session'] = session
+        context['questions'] = questions
+        context['paged'] = self.is_paged(len(questions))
+        if context['paged'] and questions:
+            context.update(self.get_page_context(questions, 1, student, is_proxy))
         context['remaining_seconds'] = remaining_seconds
         context['student'] = student
         context['is_proxy'] = is_proxy
         context['student_id'] = student.pk
         
-        # Load saved answers from attempts
-        saved_answers = {}
-        attempts = Attempt.objects.filter(quiz_session=session).select_related('question')
-        for attempt in attempts:
-            if attempt.answer_given:
-                saved_answers[attempt.question.id] = attempt.answer_given
+        # Load saved answers from attempts, overlaid with buffered drafts
+        saved_answers = dict(
+            Attempt.objects.filter(quiz_session=session)
+            .exclude(answer_given='')
+            .values_list('question_id', 'answer_given')
+        )
+        
+        if drafts.write_behind_enabled():
+            saved_answers.update(drafts.get_drafts(session.pk, question_ids))
+            drafts.cache_session_meta(session, question_ids)
         context['saved_answers'] = saved_answers
         
         return self.render_to_response(context)
@@ -170,7 +223,7 @@ class QuizTakeView(LoginRequiredMixin, DetailView):
         self.object = self.get_object()
         student, is_proxy, proxy_user = self.get_student()
         session = get_object_or_404(
-            QuizSession, 
+            QuizSession.objects.select_related('quiz', 'student'),
             student=student, 
             quiz=self.object, 
             completed_at__isnull=True
@@ -179,64 +232,10 @@ class QuizTakeView(LoginRequiredMixin, DetailView):
         return self.finish_quiz(session, request.POST)
 
     def finish_quiz(self, session, post_data=None):
-        """Finish quiz by updating existing Attempt records with student answers."""
+        """Grade the session's pre-generated Attempt records and complete it."""
         quiz = session.quiz
-        earned_points = 0
-        
-        if post_data:
-            # Update existing Attempt records with student answers
-            for question in session.session_questions.all():
-                answer_key = "question_" + str(question.id)
-                answer_given = post_data.get(answer_key, "").strip().upper()
-                
-                # Find the pre-generated Attempt record
-                try:
-                    attempt = Attempt.objects.get(
-                        student=session.student,
-                        question=question,
-                        quiz_session=session
-                    )
-                    
-                    # Update with student's answer
-                    attempt.answer_given = answer_given
-                    
-                    # Check if correct
-                    is_correct = False
-                    if question.question_type == 'pilgan':
-                        if answer_given == question.answer_key:
-                            is_correct = True
-                    
-                    attempt.is_correct = is_correct
-                    # time_taken will be calculated later or left as 0 for now
-                    attempt.save()  # save() method will auto-calculate points_earned
-                    
-                    if is_correct:
-                        earned_points += question.points
-                        
-                except Attempt.DoesNotExist:
-                    # Fallback: create attempt if it doesn't exist (shouldn't happen)
-                    Attempt.objects.create(
-                        student=session.student,
-                        question=question,
-                        quiz_session=session,
-                        answer_given=answer_given,
-                        is_correct=is_correct,
-                        time_taken=0
-                    )
-                    if is_correct:
-                        earned_points += question.points
-        
-        # Calculate final score based on session questions
-        max_points = sum(q.points for q in session.session_questions.all())
-        if max_points > 0:
-            final_score = (earned_points / max_points) * 100
-        else:
-            final_score = 0
-            
-        session.score = final_score
-        session.passed = final_score >= quiz.passing_score
-        session.completed_at = timezone.now()
-        session.save()
+        answers = parse_answers(post_data) if post_data else None
+        final_score = grade_session(session, answers)
         
         student_name = session.student.get_full_name() or session.student.username
         
@@ -252,6 +251,44 @@ class QuizTakeView(LoginRequiredMixin, DetailView):
             return redirect('quizzes:result', pk=quiz.pk)
 
 
+class QuizQuestionPartialView(QuizTakeView):
+    """
+    Single question partial for paged quiz mode (HTMX).
+    
+    Keyed by session and position, and free of answer state (the page keeps
+    answers client-side), so the browser may cache it and prefetch the next one.
+    The lifetime is kept short so an edited question reaches the page within
+    minutes; grading always uses the current answer key.
+    """
+    template_name = "quizzes/partials/question_page.html"
+    http_method_names = ['get']
+    PARTIAL_MAX_AGE = 5 * 60
+
+    def get(self, request, *args, **kwargs):
+        student, is_proxy, proxy_user = self.get_student()
+        session = get_object_or_404(
+            QuizSession.objects.select_related('quiz'),
+            pk=kwargs['session_id'],
+            quiz_id=kwargs['pk'],
+            student=student,
+            completed_at__isnull=True
+        )
+        
+        questions = get_session_payload(session)
+        position = kwargs['position']
+        if not 1 <= position <= len(questions):
+            raise Http404("Soal tidak ditemukan.")
+        
+        context = {
+            'quiz': session.quiz,
+            'session': session,
+            **self.get_page_context(questions, position, student, is_proxy),
+        }
+        response = render(request, self.template_name, context)
+        patch_cache_control(response, private=True, max_age=self.PARTIAL_MAX_AGE)
+        return response
+
+
 class QuizResultView(LoginRequiredMixin, DetailView):
     """
     View quiz results.
@@ -405,7 +442,7 @@ class CustomQuizCreateView(ParentOrAdminMixin, ListView):
         # Search
         search = self.request.GET.get('search')
         if search:
-            queryset = queryset.filter(question_text__icontains=search)
+            queryset = search_questions(queryset, search)
         
         return queryset.order_by('-created_at')
     
@@ -1,3 +1,5 @@
+import json
+
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth import get_user_model
 from django.http import JsonResponse
@@ -5,7 +7,10 @@ from django.views import View
 
 from apps.quizzes.models import QuizSession
 from apps.questions.models import Question
+from apps.analytics.metrics_cache import bump_attempt_version
 from apps.analytics.models import Attempt
+from apps.quizzes import drafts
+from apps.quizzes.services import save_answers
 
 User = get_user_model()
 
@@ -18,6 +23,9 @@ class SaveAnswerView(LoginRequiredMixin, View):
     """Save individual answer via AJAX for auto-save functionality."""
     
     def post(self, request, *args, **kwargs):
+        if drafts.write_behind_enabled():
+            return self.save_draft(request)
+        
         try:
             session_id = request.POST.get('session_id')
             question_id = request.POST.get('question_id')
@@ -58,6 +66,7 @@ class SaveAnswerView(LoginRequiredMixin, View):
                 attempt.is_correct = (answer_given == question.answer_key)
             
             attempt.save()
+            bump_attempt_version(session.student_id)
             
             return JsonResponse({
                 'success': True,
@@ -71,3 +80,104 @@ class SaveAnswerView(LoginRequiredMixin, View):
             return JsonResponse({'success': False, 'error': 'Question not found'}, status=404)
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    
+    def save_draft(self, request):
+        """Write-behind mode: buffer the answer in the cache, no DB writes."""
+        try:
+            session_id = int(request.POST.get('session_id'))
+            question_id = int(request.POST.get('question_id'))
+        except (TypeError, ValueError):
+            return JsonResponse({'success': False, 'error': 'Invalid session or question'}, status=400)
+        answer_given = request.POST.get('answer', '').strip().upper()
+        
+        meta = drafts.get_session_meta(session_id)
+        if meta is None:
+            return JsonResponse({'success': False, 'error': 'Session not found or completed'}, status=404)
+        
+        if not can_autosave(request.user, meta):
+            return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+        
+        if question_id not in meta['question_ids']:
+            return JsonResponse({'success': False, 'error': 'Question not in session'}, status=400)
+        
+        drafts.save_draft(session_id, question_id, answer_given)
+        
+        return JsonResponse({
+            'success': True,
+            'answer_saved': answer_given,
+            'question_id': question_id
+        })
+
+
+class SaveAnswersBatchView(LoginRequiredMixin, View):
+    """
+    Save many answers in one AJAX request.
+    
+    Expects a JSON body: {"session_id": 1, "answers": {"<question_id>": "A", ...}}.
+    The quiz page debounces radio changes and sends them here in batches.
+    """
+    
+    MAX_ANSWERS = 200
+    
+    def post(self, request, *args, **kwargs):
+        try:
+            payload = json.loads(request.body or b'{}')
+            session_id = int(payload.get('session_id'))
+            answers = {
+                int(question_id): str(answer).strip().upper()
+                for question_id, answer in (payload.get('answers') or {}).items()
+            }
+        except (TypeError, ValueError, AttributeError):
+            return JsonResponse({'success': False, 'error': 'Invalid payload'}, status=400)
+        
+        if not answers:
+            return JsonResponse({'success': False, 'error': 'No answers given'}, status=400)
+        if len(answers) > self.MAX_ANSWERS:
+            return JsonResponse({'success': False, 'error': 'Too many answers'}, status=400)
+        
+        if drafts.write_behind_enabled():
+            return self.save_drafts(request, session_id, answers)
+        
+        session = QuizSession.objects.filter(pk=session_id, completed_at__isnull=True).first()
+        if session is None:
+            return JsonResponse({'success': False, 'error': 'Session not found or completed'}, status=404)
+        
+        meta = {
+            'student_id': session.student_id,
+            'is_proxy_mode': session.is_proxy_mode,
+            'proxy_user_id': session.proxy_user_id,
+        }
+        if not can_autosave(request.user, meta):
+            return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+        
+        saved, rejected = save_answers(session, answers)
+        return JsonResponse({'success': True, 'saved': saved, 'rejected': rejected})
+    
+    def save_drafts(self, request, session_id, answers):
+        """Write-behind mode: validate against cached meta and buffer all answers."""
+        meta = drafts.get_session_meta(session_id)
+        if meta is None:
+            return JsonResponse({'success': False, 'error': 'Session not found or completed'}, status=404)
+        
+        if not can_autosave(request.user, meta):
+            return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+        
+        allowed = set(meta['question_ids'])
+        valid = {qid: answer for qid, answer in answers.items() if qid in allowed}
+        if valid:
+            drafts.save_drafts(session_id, valid)
+        
+        return JsonResponse({
+            'success': True,
+            'saved': sorted(valid),
+            'rejected': sorted(set(answers) - allowed),
+        })
+
+
+def can_autosave(user, meta):
+    """Same ownership rules as SaveAnswerView, checked against cached meta."""
+    if user.role == User.Role.STUDENT:
+        return meta['student_id'] == user.pk
+    if user.role == User.Role.PARENT:
+        return meta['is_proxy_mode'] and meta['proxy_user_id'] == user.pk
+    return True
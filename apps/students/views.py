@@ -66,8 +66,8 @@ class StudentDashboardView(StudentRequiredMixin, TemplateView):
         context['student'] = student
         
         # Get dashboard metrics
-        from apps.analytics.metrics import StudentMetrics
-        metrics = StudentMetrics(student)
+        from apps.analytics.metrics_cache import CachedStudentMetrics
+        metrics = CachedStudentMetrics(student)
         
         context['total_attempts'] = metrics.get_total_attempts()
         context['accuracy'] = metrics.get_accuracy()
@@ -294,8 +294,8 @@ class ParentStudentDetailView(ParentRequiredMixin, DetailView):
         student = self.get_object()
         
         # Get analytics for this student
-        from apps.analytics.metrics import StudentMetrics
-        metrics = StudentMetrics(student)
+        from apps.analytics.metrics_cache import CachedStudentMetrics
+        metrics = CachedStudentMetrics(student)
         
         context['total_attempts'] = metrics.get_total_attempts()
         context['accuracy'] = metrics.get_accuracy()
@@ -156,4 +156,33 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Jakarta'
-CELERY_BEAT_SCHEDULE = {}  # Will be populated by analytics/subscriptions apps
+CELERY_BEAT_SCHEDULE = {
+    'flush-quiz-drafts': {
+        'task': 'apps.quizzes.tasks.flush_quiz_drafts',
+        'schedule': 60 * 5,
+    },
+    'finalize-expired-quiz-sessions': {
+        'task': 'apps.quizzes.tasks.finalize_expired_quiz_sessions',
+        'schedule': 60,
+    },
+    # Idempotent (rewrites last week's rows), so running daily is safe and a
+    # failed run does not leave a gap.
+    'generate-progress-snapshots': {
+        'task': 'apps.analytics.tasks.generate_progress_snapshots',
+        'schedule': 60 * 60 * 24,
+    },
+}
+
+
+# Quiz autosave
+# When enabled, autosaved answers are buffered in the cache and written to
+# Attempt rows in one batch on submit (or by the flush-quiz-drafts job).
+# Needs a cache shared by all workers (Redis), see production.py.
+QUIZ_AUTOSAVE_WRITE_BEHIND = env.bool("QUIZ_AUTOSAVE_WRITE_BEHIND", default=False)
+
+
+# Question import
+# Worker processes the import_questions command uses to pre-validate large
+# question files; 0 uses the CPU count. Admin uploads always validate
+# in-process, as do files of a single validation chunk.
+QUESTION_IMPORT_WORKERS = env.int("QUESTION_IMPORT_WORKERS", default=0)
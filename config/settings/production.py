@@ -96,6 +96,8 @@ if env('REDIS_URL', default=''):
             }
         }
     }
+    # Shared cache available: buffer quiz autosaves in Redis
+    QUIZ_AUTOSAVE_WRITE_BEHIND = env.bool('QUIZ_AUTOSAVE_WRITE_BEHIND', default=True)
 
 # Sentry for error tracking (optional)
 if env('SENTRY_DSN', default=''):